@@ -155,6 +155,44 @@ derive_system_state() {
     return 0
 }
 
+# Function to derive states for many issues from one snapshot
+derive_states() {
+    # One for-each-ref call and one paginated PR/issue listing however many
+    # issues are asked for; derive_state.py does the rest in memory and
+    # prints JSON. The listings are paginated in full so older issues and
+    # their PRs are not cut off on large repositories.
+    local snapshot_dir
+    snapshot_dir=$(mktemp -d)
+
+    git for-each-ref --format='%(refname:short)' 'refs/remotes/*/gitaiteams/*' \
+        > "${snapshot_dir}/refs" 2>/dev/null || true
+
+    if ! gh api --paginate "repos/{owner}/{repo}/pulls?state=all&per_page=100" \
+        --jq '[.[] | {number, state, merged_at, head: {ref: .head.ref}, base: {ref: .base.ref}}]' \
+        > "${snapshot_dir}/prs.json" 2>/dev/null; then
+        echo "[]" > "${snapshot_dir}/prs.json"
+    fi
+
+    # Without a complete issue listing the issue check is skipped rather than
+    # reporting issues missing from a partial one as ISSUE_NOT_FOUND
+    local issue_args=()
+    if gh api --paginate "repos/{owner}/{repo}/issues?state=all&per_page=100" \
+        --jq '[.[] | select(.pull_request == null) | {number, state}]' \
+        > "${snapshot_dir}/issues.json" 2>/dev/null; then
+        issue_args=(--issue-list "${snapshot_dir}/issues.json")
+    fi
+
+    local status=0
+    python3 "$(dirname "${BASH_SOURCE[0]}")/../python/derive_state.py" \
+        --refs "${snapshot_dir}/refs" \
+        --prs "${snapshot_dir}/prs.json" \
+        ${issue_args[@]+"${issue_args[@]}"} \
+        "$@" || status=$?
+
+    rm -rf "${snapshot_dir}"
+    return "$status"
+}
+
 # Function to get workflow run status
 get_workflow_status() {
     local issue_number=${1:?Issue number required}
@@ -194,6 +232,10 @@ main() {
             fi
             get_child_pr_status "$issue_number"
             ;;
+        states)
+            # Any number of issues (default: all with gitaiteams branches)
+            derive_states "${@:2}"
+            ;;
         workflows)
             if [[ -z "$issue_number" ]]; then
                 echo "Usage: $0 workflows <issue_number>"
@@ -202,7 +244,7 @@ main() {
             get_workflow_status "$issue_number"
             ;;
         *)
-            echo "Commands: state, children, prs, workflows"
+            echo "Commands: state, states, children, prs, workflows"
             echo "Usage: $0 <command> <issue_number>"
             exit 1
             ;;
@@ -46,11 +46,49 @@ spawn_child() {
     fi
 }
 
+# Spawn every child of an issue at once
+spawn_children() {
+    local issue_number=${1:?Issue number required}
+    local subtasks_file=${2:?Subtasks JSON file required}
+    local parent_branch=${3:-"gitaiteams/issue-${issue_number}"}
+
+    # Children whose branch already exists are skipped, so a rerun only
+    # dispatches the missing ones; spawn_children.py sends the rest concurrently
+    local refs_file
+    refs_file=$(mktemp)
+
+    git fetch --quiet origin '+refs/heads/gitaiteams/*:refs/remotes/origin/gitaiteams/*' 2>/dev/null || true
+    git for-each-ref --format='%(refname:short)' 'refs/remotes/*/gitaiteams/*' \
+        > "${refs_file}" 2>/dev/null || true
+
+    local comment_args=()
+    if [[ -n "${STATUS_COMMENT_ID:-}" ]]; then
+        comment_args=(--status-comment-id "${STATUS_COMMENT_ID}")
+    fi
+
+    # ${arr[@]+...} keeps an empty array from tripping set -u on bash < 4.4
+    local status=0
+    python3 "$(dirname "${BASH_SOURCE[0]}")/../python/spawn_children.py" "$issue_number" \
+        --subtasks "$subtasks_file" \
+        --parent-branch "$parent_branch" \
+        --refs "${refs_file}" \
+        ${comment_args[@]+"${comment_args[@]}"} || status=$?
+
+    rm -f "${refs_file}"
+    return "${status}"
+}
+
 # Main execution
 main() {
-    if [[ $# -lt 3 ]]; then
+    local batch=0
+    if [[ "${1:-}" == "--batch" ]] && [[ $# -ge 3 ]]; then
+        batch=1
+        shift
+    elif [[ $# -lt 3 ]]; then
         echo "Usage: $0 <issue_number> <child_number> <task> [parent_branch]"
+        echo "       $0 --batch <issue_number> <subtasks.json> [parent_branch]"
         echo "Example: $0 42 1 'Research FastAPI' 'gitaiteams/issue-42'"
+        echo "Example: $0 --batch 42 subtasks.json   # [\"Research FastAPI\", \"Research Flask\"]"
         exit 1
     fi
 
@@ -67,7 +105,11 @@ main() {
         export GITHUB_REPOSITORY
     fi
 
-    spawn_child "$@"
+    if [[ "$batch" -eq 1 ]]; then
+        spawn_children "$@"
+    else
+        spawn_child "$@"
+    fi
 }
 
 # Run if not sourced
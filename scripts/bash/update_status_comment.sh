@@ -54,86 +54,11 @@ update_comment() {
     local status="$3"
     local message="${4:-Processing...}"
     local branch="${5:-}"
-    local repo="${GITHUB_REPOSITORY:-}"
-
-    # Get existing comment to preserve start time
-    local existing_body
-    existing_body=$(gh api "/repos/${repo}/issues/comments/${comment_id}" \
-        --jq '.body' 2>/dev/null) || true
-
-    # Extract start time from existing comment
-    local start_time
-    start_time=$(echo "$existing_body" | grep -oE '\*\*Started:\*\* [0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}:[0-9]{2} UTC' | sed 's/\*\*Started:\*\* //') || true
-
-    # If no start time found, use current time
-    if [[ -z "$start_time" ]]; then
-        start_time="$(date -u +"%Y-%m-%d %H:%M:%S UTC")"
-    fi
-
-    # Format status emoji
-    local status_emoji
-    case "$status" in
-        initializing) status_emoji="🔄" ;;
-        analyzing) status_emoji="🔍" ;;
-        spawning) status_emoji="🚀" ;;
-        processing) status_emoji="⚙️" ;;
-        completed) status_emoji="✅" ;;
-        error) status_emoji="❌" ;;
-        *) status_emoji="ℹ️" ;;
-    esac
-
-    # Build new body
-    local new_body="${STATUS_MARKER}
-## ⏳ GitAI Teams Status
 
-**Status:** ${status_emoji} ${status}
-**Started:** ${start_time}
-**Message:** ${message}"
-
-    # Add branch info if provided
-    if [[ -n "$branch" ]]; then
-        new_body="${new_body}
-**Branch:** \`${branch}\`"
-    fi
-
-    # Add child status table if we have child branches
-    if [[ -n "$branch" ]] && command -v derive_state.sh &>/dev/null; then
-        # Source derive_state to get child status
-        source "$(dirname "$0")/../derive_state.sh" 2>/dev/null || true
-
-        if command -v get_child_branches &>/dev/null; then
-            local child_branches=($(get_child_branches "$branch" 2>/dev/null || true))
-            if [[ ${#child_branches[@]} -gt 0 ]]; then
-                new_body="${new_body}
-
-### 📊 Child Task Status
-
-| Child | Branch | Status |
-|-------|--------|--------|"
-
-                for child_branch in "${child_branches[@]}"; do
-                    local child_id="${child_branch##*-child-}"
-                    local child_status="🔄 Running"
-
-                    # Check if PR exists for this child
-                    local pr_state=$(gh pr list --head="$child_branch" --json state --jq '.[0].state' 2>/dev/null || echo "")
-                    if [[ "$pr_state" == "MERGED" ]]; then
-                        child_status="✅ Complete"
-                    elif [[ "$pr_state" == "OPEN" ]]; then
-                        child_status="📝 PR Open"
-                    fi
-
-                    new_body="${new_body}
-| C${child_id} | \`${child_branch}\` | ${child_status} |"
-                done
-            fi
-        fi
-    fi
-
-    # Update the comment
-    gh api "/repos/${repo}/issues/comments/${comment_id}" \
-        --method PATCH \
-        --field body="${new_body}" || {
+    # Fetch the comment, child branches and child PRs in one batch, and PATCH
+    # only when the rendered body changed
+    python3 "$(dirname "${BASH_SOURCE[0]}")/../python/status_comment.py" "$issue_number" "$status" "$message" \
+        --comment-id "$comment_id" ${branch:+--branch "$branch"} >&2 || {
         echo "ERROR: Failed to update status comment" >&2
         return 1
     }
@@ -8,15 +8,67 @@ import argparse
 import json
 import re
 import logging
-from typing import Dict, Any, Optional
+from array import array
+from collections import Counter
+from typing import Dict, Any, Iterable, Mapping, Optional, Tuple
+
+try:
+    import numpy
+except ImportError:  # optional; classify_batch falls back to array('B')
+    numpy = None
+
+from classification_cache import DEFAULT_MAXSIZE, ClassificationCache, resolve_disk_dir, thaw
+from log_utils import configure_logging, fields, item_tracer, timed
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+# Part of every classification cache key; bump when the classification rules change
+CLASSIFIER_VERSION = "1"
+
+_cache: Optional[ClassificationCache] = None
+
+# Child status keywords (detect_status_type)
+FAILURE_KEYWORDS = ('fail', 'error', 'block', 'cannot', '❌')
+PARTIAL_KEYWORDS = ('partial', 'mostly')
+SUCCESS_KEYWORDS = ('complet', 'success', 'done', 'finish', 'merg', 'pass', '✅')
+PROGRESS_KEYWORDS = ('in progress', 'working on')
+
+# Claude response keywords (parse_claude_response)
+RESPONSE_UNKNOWN_KEYWORDS = ('unclear', 'ambiguous')
+RESPONSE_PARTIAL_KEYWORDS = ('partial', 'mostly', 'some')
+RESPONSE_FAILURE_KEYWORDS = ('fail', 'error', 'problem')
+RESPONSE_SUCCESS_KEYWORDS = ('success', 'complete', 'done', 'safe to merge')
+CONFIDENCE_LEVELS = (('high', 0.9), ('medium', 0.6), ('low', 0.3))
+
+PERCENTAGE_RE = re.compile(r'(\d+)%')
+
+# Status codes used by classify_batch: STATUS_TYPES[code] is the status type
+STATUS_TYPES = ("success", "failure", "partial", "unknown")
+STATUS_CODES = {status: code for code, status in enumerate(STATUS_TYPES)}
+
+
+def enable_classification_cache(maxsize: int = DEFAULT_MAXSIZE,
+                                disk_dir: Optional[str] = None) -> ClassificationCache:
+    """
+    Memoize detect_status_type and parse_claude_response for this process.
+
+    Args:
+        maxsize: Entries kept in the in-process LRU
+        disk_dir: Also persist results in this directory (opt-in)
+
+    Returns:
+        The active cache, whose stats() go into the JSON output
+    """
+    global _cache
+    _cache = ClassificationCache(CLASSIFIER_VERSION, maxsize=maxsize, disk_dir=disk_dir)
+    return _cache
+
+
+def disable_classification_cache() -> None:
+    """Classify every text again on each call."""
+    global _cache
+    _cache = None
+
 
 def detect_status_type(child_status: str) -> str:
     """
@@ -32,109 +84,152 @@ def detect_status_type(child_status: str) -> str:
         logger.debug("No child status provided")
         return "unknown"
 
-    logger.debug(f"Detecting status type for: {child_status[:100]}...")
+    if _cache is not None:
+        return _cache.get_or_compute("status", child_status, _classify_status_text)
+    return _classify_status_text(child_status)
+
+
+def contains_any(text_lower: str, keywords: Tuple[str, ...]) -> bool:
+    """True if any of the (lowercase) keywords occurs in the lowercased text."""
+    return any(map(text_lower.__contains__, keywords))
+
+
+def _classify_status_text(child_status: str) -> str:
+    logger.debug("Detecting status type for: %.100s...", child_status)
 
     status_lower = child_status.lower()
 
     # Check for partial completion first (special cases)
     if "some tests failing" in status_lower:
-        logger.info(f"Detected partial status: some tests failing")
+        logger.debug("Detected partial status: some tests failing")
         return "partial"
     if "completed but" in status_lower and "failed" in status_lower:
-        logger.info(f"Detected partial status: completed but failed")
+        logger.debug("Detected partial status: completed but failed")
         return "partial"
 
     # Check for failure (high precedence)
-    failure_keywords = ['fail', 'error', 'block', 'cannot', '❌']
-    if any(keyword in status_lower for keyword in failure_keywords):
-        logger.info(f"Detected failure status based on keywords")
+    if contains_any(status_lower, FAILURE_KEYWORDS):
+        logger.debug("Detected failure status based on keywords")
         return "failure"
 
-    # Check for partial completion
-    partial_keywords = ['partial', 'mostly', '%']
-    if any(keyword in status_lower for keyword in partial_keywords):
-        # Special case: percentage values
-        if '%' in status_lower and not '100%' in status_lower:
-            return "partial"
-        elif any(kw in status_lower for kw in partial_keywords[:-1]):
-            return "partial"
+    # Check for partial completion; percentages other than 100% count too
+    if "%" in status_lower and "100%" not in status_lower:
+        return "partial"
+    if contains_any(status_lower, PARTIAL_KEYWORDS):
+        return "partial"
 
     # Check for success
-    success_keywords = ['complet', 'success', 'done', 'finish', 'merg', 'pass', '✅']
-    if any(keyword in status_lower for keyword in success_keywords):
+    if contains_any(status_lower, SUCCESS_KEYWORDS):
         # But if it says "failed" along with completed, it's partial
-        if 'fail' in status_lower:
-            logger.info(f"Detected partial status: completed but has 'fail' keyword")
+        if "fail" in status_lower:
+            logger.debug("Detected partial status: completed but has 'fail' keyword")
             return "partial"
-        logger.info(f"Detected success status based on keywords")
+        logger.debug("Detected success status based on keywords")
         return "success"
 
     # Check for in-progress or unknown
-    progress_keywords = ['in progress', 'working on']
-    if any(keyword in status_lower for keyword in progress_keywords):
-        logger.info(f"Detected in-progress status")
+    if contains_any(status_lower, PROGRESS_KEYWORDS):
+        logger.debug("Detected in-progress status")
         return "unknown"
 
-    logger.warning(f"Could not determine status type, defaulting to unknown")
+    logger.debug("Could not determine status type, defaulting to unknown")
     return "unknown"
 
 
-def determine_merge_strategy(statuses: list) -> Dict[str, Any]:
+def classify_batch(texts: Iterable[str]):
     """
-    Determine the merge strategy based on child statuses.
+    Classify many child status texts into a compact array of status codes.
 
     Args:
-        statuses: List of child status types
+        texts: Status texts from child agents
 
     Returns:
-        Dictionary with merge strategy and confidence
+        One code per text (see STATUS_TYPES): a numpy uint8 array when numpy
+        is installed, otherwise an array('B')
+    """
+    tracer = item_tracer(logger)
+    codes = array('B')
+    append = codes.append
+    for text in texts:
+        status = detect_status_type(text)
+        append(STATUS_CODES[status])
+        if tracer:
+            tracer.log("Classified child status %d as %s", len(codes), status)
+    if numpy is not None:
+        return numpy.frombuffer(codes, dtype=numpy.uint8)
+    return codes
+
+
+def count_status_codes(codes) -> Dict[str, int]:
+    """
+    Count each status type in an array of status codes in one pass.
+
+    Args:
+        codes: Status codes from classify_batch
+
+    Returns:
+        Count per status type, in STATUS_TYPES order
+    """
+    if numpy is not None and isinstance(codes, numpy.ndarray):
+        totals = numpy.bincount(codes, minlength=len(STATUS_TYPES)).tolist()
+    else:
+        tally = Counter(codes)
+        totals = [tally[code] for code in range(len(STATUS_TYPES))]
+    return dict(zip(STATUS_TYPES, totals))
+
+
+def merge_strategy_from_counts(counts: Mapping[str, int], total: Optional[int] = None) -> Dict[str, Any]:
     """
-    logger.info(f"Determining merge strategy for statuses: {statuses}")
+    Determine the merge strategy from per-status counts.
 
-    if not statuses:
+    Args:
+        counts: Count per status type (missing types count as 0)
+        total: Number of statuses; defaults to the sum of the counts
+
+    Returns:
+        Dictionary with merge strategy and confidence
+    """
+    if total is None:
+        total = sum(counts.values())
+    success = counts.get("success", 0)
+    failure = counts.get("failure", 0)
+    partial = counts.get("partial", 0)
+    unknown = counts.get("unknown", 0)
+
+    if not total:
         logger.warning("No statuses provided")
         return {
             "strategy": "manual_review",
             "confidence": 0
         }
 
-    # Count status types
-    counts = {
-        "success": statuses.count("success"),
-        "failure": statuses.count("failure"),
-        "partial": statuses.count("partial"),
-        "unknown": statuses.count("unknown")
-    }
-
-    total = len(statuses)
-
     # All success - high confidence merge
-    if counts["success"] == total:
+    if success == total:
         return {
             "strategy": "merge",
             "confidence": 0.95 if total > 1 else 0.7
         }
 
     # All failure - high confidence no merge
-    if counts["failure"] == total:
+    if failure == total:
         return {
             "strategy": "no_merge",
             "confidence": 0.95 if total > 1 else 0.7
         }
 
     # All unknown - manual review with low confidence
-    if counts["unknown"] == total:
+    if unknown == total:
         return {
             "strategy": "manual_review",
             "confidence": 0.2
         }
 
     # Mixed statuses - calculate based on majority
-    success_ratio = counts["success"] / total
-    failure_ratio = counts["failure"] / total
+    success_ratio = success / total
+    failure_ratio = failure / total
 
     # If we have partials, reduce confidence
-    confidence_penalty = 0.2 if counts["partial"] > 0 else 0
+    confidence_penalty = 0.2 if partial > 0 else 0
 
     if success_ratio > 0.5:
         # Majority success
@@ -158,7 +253,24 @@ def determine_merge_strategy(statuses: list) -> Dict[str, Any]:
         }
 
 
-def parse_claude_response(response_text: str) -> Dict[str, Any]:
+def determine_merge_strategy(statuses: list) -> Dict[str, Any]:
+    """
+    Determine the merge strategy based on child statuses.
+
+    Args:
+        statuses: List of child status types
+
+    Returns:
+        Dictionary with merge strategy and confidence
+    """
+    logger.info("Determining merge strategy for %d statuses", len(statuses))
+    logger.debug("Statuses: %s", statuses)
+
+    # Count status types in one pass
+    return merge_strategy_from_counts(Counter(statuses), total=len(statuses))
+
+
+def parse_claude_response(response_text: str) -> Mapping[str, Any]:
     """
     Parse Claude's response to extract completion analysis.
 
@@ -166,7 +278,8 @@ def parse_claude_response(response_text: str) -> Dict[str, Any]:
         response_text: Claude's response text
 
     Returns:
-        Parsed analysis with status and recommendations
+        Parsed analysis with status and recommendations (read-only when
+        the classification cache is enabled; see classification_cache.thaw)
     """
     if not response_text:
         logger.debug("No response text provided")
@@ -175,7 +288,13 @@ def parse_claude_response(response_text: str) -> Dict[str, Any]:
             "confidence": 0
         }
 
-    logger.debug(f"Parsing Claude response: {response_text[:200]}...")
+    if _cache is not None:
+        return _cache.get_or_compute("claude_response", response_text, _parse_response_text)
+    return _parse_response_text(response_text)
+
+
+def _parse_response_text(response_text: str) -> Dict[str, Any]:
+    logger.debug("Parsing Claude response: %.200s...", response_text)
 
     result = {
         "status": "unknown",
@@ -192,55 +311,55 @@ def parse_claude_response(response_text: str) -> Dict[str, Any]:
                 result["summary"] = data["summary"]
             if "details" in data:
                 result["details"] = data["details"]
-            logger.info(f"Successfully parsed JSON response: status={result['status']}, confidence={result['confidence']}")
+            logger.info("Successfully parsed JSON response",
+                        extra=fields(status=result['status'], confidence=result['confidence']))
             return result
     except (json.JSONDecodeError, ValueError):
         # Not JSON, parse as text
         logger.debug("Response is not JSON, parsing as text")
         pass
 
+    response_lower = response_text.lower()
+
     # Check for error
-    if "ERROR:" in response_text.upper():
+    if "error:" in response_lower:
         result["status"] = "error"
         result["confidence"] = 0
         logger.warning("Detected error in Claude response")
         return result
 
-    response_lower = response_text.lower()
-
     # Extract status from text
     # Check for ambiguous or unclear first
-    if "unclear" in response_lower or "ambiguous" in response_lower:
+    if contains_any(response_lower, RESPONSE_UNKNOWN_KEYWORDS):
         result["status"] = "unknown"
-    elif any(word in response_lower for word in ["partial", "mostly", "some"]):
+    elif contains_any(response_lower, RESPONSE_PARTIAL_KEYWORDS):
         result["status"] = "partial"
-    elif any(word in response_lower for word in ["fail", "error", "problem"]):
+    elif contains_any(response_lower, RESPONSE_FAILURE_KEYWORDS):
         result["status"] = "failure"
-    elif any(word in response_lower for word in ["success", "complete", "done", "safe to merge"]):
+    elif contains_any(response_lower, RESPONSE_SUCCESS_KEYWORDS):
         result["status"] = "success"
     else:
         result["status"] = "unknown"
 
     # Extract confidence level
-    if "high" in response_lower and "confidence" in response_lower:
-        result["confidence"] = 0.9
-    elif "medium" in response_lower and "confidence" in response_lower:
-        result["confidence"] = 0.6
-    elif "low" in response_lower and "confidence" in response_lower:
-        result["confidence"] = 0.3
+    if "confidence" in response_lower:
+        for level, confidence in CONFIDENCE_LEVELS:
+            if level in response_lower:
+                result["confidence"] = confidence
+                break
 
     # Extract percentage if present
-    percentage_match = re.search(r'(\d+)%', response_text)
-    if percentage_match:
-        percentage = int(percentage_match.group(1))
-        result["completion_percentage"] = percentage
-        if result["confidence"] == 0:  # Use percentage as confidence if not set
-            result["confidence"] = percentage / 100.0
+    if "%" in response_lower:
+        percentage_match = PERCENTAGE_RE.search(response_text)
+        if percentage_match:
+            percentage = int(percentage_match.group(1))
+            result["completion_percentage"] = percentage
+            if result["confidence"] == 0:  # Use percentage as confidence if not set
+                result["confidence"] = percentage / 100.0
 
     # Extract children from markdown
-    if '✅' in response_text:
-        children_count = response_text.count('✅')
-        result["children"] = [f"Child {i+1}" for i in range(children_count)]
+    if "✅" in response_lower:
+        result["children"] = [f"Child {i+1}" for i in range(response_lower.count("✅"))]
 
     # Add recommendation if present
     if "recommendation:" in response_lower:
@@ -261,41 +380,50 @@ def main():
     parser.add_argument('--claude-response', type=str, help='Claude response text')
     parser.add_argument('--child-statuses', type=str, help='JSON array of child statuses')
     parser.add_argument('--issue-number', type=int, help='Parent issue number')
-    parser.add_argument('--debug', action='store_true', help='Enable debug logging')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAXSIZE,
+                        help='Classification results kept in the in-process cache')
+    parser.add_argument('--disk-cache', action='store_true',
+                        help='Also cache classifications under $RUNNER_TOOL_CACHE across runs')
+    parser.add_argument('--debug', action='store_true', help='Enable debug logging (per-status logs sampled)')
+    parser.add_argument('--trace', action='store_true', help='Enable trace logging (every per-status log)')
 
     args = parser.parse_args()
 
-    # Set debug level if requested
-    if args.debug:
-        logger.setLevel(logging.DEBUG)
-        logging.getLogger().setLevel(logging.DEBUG)
+    configure_logging(debug=args.debug, trace=args.trace)
+    cache = enable_classification_cache(args.cache_size, resolve_disk_dir(args.disk_cache))
 
     # Parse Claude response if provided
     claude_analysis = {}
     if args.claude_response:
-        claude_analysis = parse_claude_response(args.claude_response)
+        with timed(logger, "parse_claude_response"):
+            claude_analysis = thaw(parse_claude_response(args.claude_response))
 
     # Parse and analyze child statuses if provided
     merge_strategy = {"strategy": "unknown", "confidence": 0}
     if args.child_statuses:
         try:
             statuses_data = json.loads(args.child_statuses)
-            logger.debug(f"Parsed {len(statuses_data)} child statuses")
-            # Extract status types from the data
-            status_types = []
-
+            logger.debug("Parsed %d child statuses", len(statuses_data))
+            # Extract status texts from the data
+            texts = []
             if isinstance(statuses_data, list):
                 for status in statuses_data:
                     if isinstance(status, str):
-                        status_types.append(detect_status_type(status))
+                        texts.append(status)
                     elif isinstance(status, dict) and 'status' in status:
-                        status_types.append(detect_status_type(status['status']))
+                        texts.append(status['status'])
                     elif isinstance(status, dict) and 'body' in status:
-                        status_types.append(detect_status_type(status['body']))
+                        texts.append(status['body'])
+
+            with timed(logger, "classify_statuses") as stage:
+                codes = classify_batch(texts)
+                stage["statuses"] = len(codes)
 
             # Determine merge strategy based on statuses
-            if status_types:
-                merge_strategy = determine_merge_strategy(status_types)
+            if len(codes):
+                counts = count_status_codes(codes)
+                logger.info("Determining merge strategy for %d statuses", len(codes), extra=fields(**counts))
+                merge_strategy = merge_strategy_from_counts(counts)
 
         except json.JSONDecodeError as e:
             print(json.dumps({
@@ -320,6 +448,8 @@ def main():
     if "status" in claude_analysis:
         result["claude_status"] = claude_analysis["status"]
 
+    result["classification_cache"] = cache.stats()
+
     print(json.dumps(result, indent=2))
     return 0
 
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+bench_analyze_completions.py - Micro-benchmark for the status classifiers
+
+Compares the lowercase-once classifiers in analyze_completions.py against
+the previous implementations on large (100KB+) child status and Claude
+response bodies.
+
+For detect_status_type it also times a single-pass keyword matcher: one
+compiled alternation over every status keyword that yields the set of
+keywords present (a hit vector), with the classifier driven from that set.
+The standard library has no Aho-Corasick automaton; a pure Python one is far
+slower still, and the sre alternation tries every keyword at every position
+(overlapping, so no hit hides inside a longer one), so it loses to the
+per-keyword `in` scans, which run in C. Three runs on 100KB bodies
+(current / single-pass ms):
+  status: early failure   0.74-0.87 / 6.56-8.07  0.10-0.11x
+  status: late success    1.36-1.53 / 7.74-7.88  0.17-0.20x
+  status: no keywords     1.30-1.33 / 7.42-7.69  0.17x
+which is why the classifiers keep the per-keyword scans.
+
+Usage: python bench_analyze_completions.py [--size 100000] [--repeat 20]
+"""
+
+import argparse
+import json
+import logging
+import re
+import timeit
+from typing import Any, Dict
+
+import analyze_completions
+
+# Previous implementations, kept here only as the benchmark baseline
+
+
+def legacy_detect_status_type(child_status: str) -> str:
+    if not child_status:
+        return "unknown"
+    status_lower = child_status.lower()
+    if "some tests failing" in status_lower:
+        return "partial"
+    if "completed but" in status_lower and "failed" in status_lower:
+        return "partial"
+    failure_keywords = ['fail', 'error', 'block', 'cannot', '❌']
+    if any(keyword in status_lower for keyword in failure_keywords):
+        return "failure"
+    partial_keywords = ['partial', 'mostly', '%']
+    if any(keyword in status_lower for keyword in partial_keywords):
+        if '%' in status_lower and not '100%' in status_lower:
+            return "partial"
+        elif any(kw in status_lower for kw in partial_keywords[:-1]):
+            return "partial"
+    success_keywords = ['complet', 'success', 'done', 'finish', 'merg', 'pass', '✅']
+    if any(keyword in status_lower for keyword in success_keywords):
+        if 'fail' in status_lower:
+            return "partial"
+        return "success"
+    progress_keywords = ['in progress', 'working on']
+    if any(keyword in status_lower for keyword in progress_keywords):
+        return "unknown"
+    return "unknown"
+
+
+# Every keyword detect_status_type looks for; the lookahead finds
+# overlapping occurrences, so no hit hides inside a longer one
+STATUS_HIT_RE = re.compile('(?=(' + '|'.join(map(re.escape, sorted(
+    set(analyze_completions.FAILURE_KEYWORDS + analyze_completions.PARTIAL_KEYWORDS
+        + analyze_completions.SUCCESS_KEYWORDS + analyze_completions.PROGRESS_KEYWORDS
+        + ('some tests failing', 'completed but', 'failed', '100%', '%')),
+    key=len, reverse=True))) + '))')
+
+
+def single_pass_detect_status_type(child_status: str) -> str:
+    if not child_status:
+        return "unknown"
+    hits = set(STATUS_HIT_RE.findall(child_status.lower()))
+    if "some tests failing" in hits or ("completed but" in hits and "failed" in hits):
+        return "partial"
+    if hits.intersection(analyze_completions.FAILURE_KEYWORDS):
+        return "failure"
+    if "%" in hits and "100%" not in hits:
+        return "partial"
+    if hits.intersection(analyze_completions.PARTIAL_KEYWORDS):
+        return "partial"
+    if hits.intersection(analyze_completions.SUCCESS_KEYWORDS):
+        return "partial" if "fail" in hits else "success"
+    return "unknown"
+
+
+def legacy_parse_claude_response(response_text: str) -> Dict[str, Any]:
+    if not response_text:
+        return {"status": "unknown", "confidence": 0}
+    result = {"status": "unknown", "confidence": 0}
+    try:
+        data = json.loads(response_text)
+        if isinstance(data, dict):
+            result["status"] = data.get("status", "unknown")
+            result["confidence"] = data.get("confidence", 0)
+            return result
+    except (json.JSONDecodeError, ValueError):
+        pass
+    if "ERROR:" in response_text.upper():
+        result["status"] = "error"
+        return result
+    response_lower = response_text.lower()
+    if "unclear" in response_lower or "ambiguous" in response_lower:
+        result["status"] = "unknown"
+    elif any(word in response_lower for word in ["partial", "mostly", "some"]):
+        result["status"] = "partial"
+    elif any(word in response_lower for word in ["fail", "error", "problem"]):
+        result["status"] = "failure"
+    elif any(word in response_lower for word in ["success", "complete", "done", "safe to merge"]):
+        result["status"] = "success"
+    if "high" in response_lower and "confidence" in response_lower:
+        result["confidence"] = 0.9
+    elif "medium" in response_lower and "confidence" in response_lower:
+        result["confidence"] = 0.6
+    elif "low" in response_lower and "confidence" in response_lower:
+        result["confidence"] = 0.3
+    percentage_match = re.search(r'(\d+)%', response_text)
+    if percentage_match:
+        percentage = int(percentage_match.group(1))
+        result["completion_percentage"] = percentage
+        if result["confidence"] == 0:
+            result["confidence"] = percentage / 100.0
+    if '✅' in response_text:
+        result["children"] = [f"Child {i+1}" for i in range(response_text.count('✅'))]
+    if "recommendation:" in response_lower:
+        result["recommendation"] = True
+    if result["status"] == "success" and result["confidence"] == 0:
+        result["confidence"] = 0.7
+    elif result["status"] == "unknown" and result["confidence"] > 0.5:
+        result["confidence"] = 0.4
+    return result
+
+
+def build_bodies(size: int) -> Dict[str, str]:
+    """Large status and response bodies with keywords early, late and absent."""
+    line = "Ran step 42 of the build; output attached for reference.\n"
+    filler = line * (size // len(line) + 1)
+    return {
+        "status: early failure": "❌ Error in setup\n" + filler,
+        "status: late success": filler + "All tasks completed ✅",
+        "status: no keywords": filler,
+        "response: markdown report": (
+            "## Analysis\n" + filler
+            + "- ✅ Child 1\n- ✅ Child 2\n- ✅ Child 3\n"
+            + "Safe to merge with high confidence.\nRecommendation: merge\n"
+        ),
+        "response: no keywords": filler,
+    }
+
+
+def bench(func, arg, repeat: int) -> float:
+    """Return the best-of-5 mean time per call in milliseconds."""
+    return min(timeit.repeat(lambda: func(arg), number=repeat, repeat=5)) / repeat * 1000
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description='Benchmark status classifiers')
+    parser.add_argument('--size', type=int, default=100000, help='Approximate body size in characters')
+    parser.add_argument('--repeat', type=int, default=20, help='Timing repetitions')
+    args = parser.parse_args()
+
+    # Keep logging out of the measurement
+    logging.disable(logging.CRITICAL)
+
+    bodies = build_bodies(args.size)
+    print(f"{'case':<32} {'legacy ms':>10} {'current ms':>11} {'speedup':>8}")
+    for name, body in bodies.items():
+        if name.startswith("status"):
+            legacy, current = legacy_detect_status_type, analyze_completions.detect_status_type
+        else:
+            legacy, current = legacy_parse_claude_response, analyze_completions.parse_claude_response
+        assert legacy(body) == current(body), name
+        legacy_ms = bench(legacy, body, args.repeat)
+        current_ms = bench(current, body, args.repeat)
+        print(f"{name:<32} {legacy_ms:>10.4f} {current_ms:>11.4f} {legacy_ms / current_ms:>7.2f}x")
+
+    print()
+    print(f"{'case':<32} {'current ms':>10} {'1-pass ms':>11} {'speedup':>8}")
+    for name, body in bodies.items():
+        if not name.startswith("status"):
+            continue
+        current = analyze_completions.detect_status_type
+        assert single_pass_detect_status_type(body) == current(body), name
+        current_ms = bench(current, body, args.repeat)
+        single_ms = bench(single_pass_detect_status_type, body, args.repeat)
+        print(f"{name:<32} {current_ms:>10.4f} {single_ms:>11.4f} {current_ms / single_ms:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
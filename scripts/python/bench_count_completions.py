@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+bench_count_completions.py - Micro-benchmark for the completion matchers
+
+Compares the precompiled matchers in count_completions.py against the
+previous per-pattern implementation on synthetic comment fixtures.
+
+EXPECTED_COUNT_RE trades a fixed cost for a single scan. Three runs, best
+of 15 interleaved rounds, 2KB issue bodies (legacy / compiled ms):
+  count_child_markers (10k)    1.65-2.08 / 1.16-1.45    1.32-1.44x
+  [expected_children]          0.0011-0.0017 / 0.0017-0.0025  0.63-0.68x
+  [evaluate_different]         0.28-0.37 / 0.17-0.21    1.67-1.78x
+  [execute_these]              0.15-0.18 / 0.15-0.21    0.88-0.94x
+  [no_match]                   0.27-0.38 / 0.15-0.18    1.82-2.51x
+When the top rule matches on the first line the legacy search returns
+after one short match, and the compiled path loses about 0.6us of
+per-call overhead. When a body has a late hit or no hit, it saves
+100-200us, because the legacy code scans the whole body once per rule.
+Searching the top rule first to win back the early case cost 35-60us on
+every other body.
+
+Usage: python bench_count_completions.py [--comments 10000] [--repeat 20]
+"""
+
+import argparse
+import logging
+import re
+import timeit
+from typing import Any, Dict, List, Optional
+
+import count_completions
+
+logger = logging.getLogger(__name__)
+
+# Previous implementations, kept here only as the benchmark baseline
+LEGACY_PATTERNS = [
+    r'expected\s+children:\s*(\d+)',
+    r'child\s+count:\s*(\d+)',
+    r'(\d+)\s+child\s+agents?',
+    r'(\d+)\s+tasks?\s+in\s+child',
+    r'these\s+(\w+)\s+tasks?\s+in\s+child',
+    r'(\d+)\s+(?:different|parallel)\s+.*\s+in\s+parallel',
+    r'Execute\s+these\s+(\w+)\s+tasks?',
+    r'(\d+)\s+different\s+\w+',
+    r'Evaluate\s+(\d+)\s+different',
+]
+
+
+def legacy_count_child_markers(comments: list) -> int:
+    count = 0
+    for comment in comments:
+        if isinstance(comment, dict) and 'body' in comment:
+            body = comment['body']
+            if '🤖' in body and 'Child' in body:
+                if '🤖 Child' in body or '🤖  Child' in body or '🤖Child' in body:
+                    count += 1
+                    logger.debug(f"Found child marker in comment: {body[:50]}...")
+    return count
+
+
+def legacy_extract_expected_count(issue_body: str) -> Optional[int]:
+    for pattern in LEGACY_PATTERNS:
+        match = re.search(pattern, issue_body, re.IGNORECASE)
+        if match:
+            count_str = match.group(1)
+            try:
+                count = int(count_str)
+            except ValueError:
+                count = count_completions.word_to_number(count_str)
+                if count is None:
+                    continue
+            if count >= 0:
+                return count
+    return None
+
+
+def build_comments(total: int) -> List[Dict[str, Any]]:
+    """Build a comment fixture with a realistic mix of marker comments."""
+    comments = []
+    for i in range(total):
+        kind = i % 10
+        if kind == 0:
+            body = f"🤖 Child C{i % 5 + 1}: Task completed successfully. PR #{i} is ready for review."
+        elif kind == 1:
+            body = "🤖 Completion Analysis\n\nAll children reported. " + "Details follow. " * 10
+        else:
+            body = f"Progress update {i}: " + "working through the remaining items, " * 8
+        comments.append({"id": i + 1, "body": body})
+    return comments
+
+
+def build_issue_bodies() -> Dict[str, str]:
+    """Issue bodies exercising early, late and missing expected-count rules."""
+    filler = "Background context for the task with plenty of prose. " * 40
+    return {
+        "expected_children": "Expected children: 3\n" + filler,
+        "evaluate_different": filler + "Please Evaluate 3 different frameworks.",
+        "execute_these": filler + "Execute these two tasks in child agents.",
+        "no_match": filler,
+    }
+
+
+def bench_pair(legacy, compiled, arg, repeat: int, rounds: int = 15):
+    """
+    Time both versions alternately and keep the best round of each.
+
+    Sub-microsecond cases get enough calls per round (at least repeat) for
+    a round to last about 20ms, and interleaving keeps machine noise from
+    landing on one side only.
+
+    Returns:
+        (legacy_ms, compiled_ms) mean time per call in milliseconds
+    """
+    loops, elapsed = timeit.Timer(lambda: legacy(arg)).autorange()
+    number = max(repeat, int(loops * 0.02 / elapsed))
+    legacy_best = compiled_best = float("inf")
+    for _ in range(rounds):
+        legacy_best = min(legacy_best, timeit.timeit(lambda: legacy(arg), number=number))
+        compiled_best = min(compiled_best, timeit.timeit(lambda: compiled(arg), number=number))
+    return legacy_best / number * 1000, compiled_best / number * 1000
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description='Benchmark completion matchers')
+    parser.add_argument('--comments', type=int, default=10000, help='Number of comments in the fixture')
+    parser.add_argument('--repeat', type=int, default=20, help='Timing repetitions')
+    args = parser.parse_args()
+
+    # Keep logging out of the measurement
+    logging.disable(logging.CRITICAL)
+
+    comments = build_comments(args.comments)
+    assert legacy_count_child_markers(comments) == count_completions.count_child_markers(comments)
+
+    print(f"{'case':<44} {'legacy ms':>10} {'compiled ms':>12} {'speedup':>8}")
+    rows = [(f"count_child_markers ({args.comments} comments)",
+             legacy_count_child_markers, count_completions.count_child_markers, comments)]
+    # The expected count is extracted once per comment event, so time it
+    # over as many calls as there are comments in the fixture
+    for name, body in build_issue_bodies().items():
+        assert legacy_extract_expected_count(body) == count_completions.extract_expected_count(body)
+        rows.append((f"extract_expected_count [{name}]",
+                     legacy_extract_expected_count, count_completions.extract_expected_count, body))
+
+    for label, legacy, compiled, arg in rows:
+        legacy_ms, compiled_ms = bench_pair(legacy, compiled, arg, args.repeat)
+        print(f"{label:<44} {legacy_ms:>10.4f} {compiled_ms:>12.4f} {legacy_ms / compiled_ms:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+bench_generate_comparison.py - Benchmark for the columnar comparison table
+
+Compares generate_comparison_table (one flatten pass into a ColumnarTable,
+lazily formatted rows) with the previous implementation (two flatten passes,
+every cell formatted up front) on items with dozens of nested metrics, and
+reports time and peak memory for flattening items (iterative flatten_dict
+with cached key paths versus the previous recursive one), building and
+rendering the table.
+It also compares loading a large JSON array and rendering it in memory with
+streaming the same items from JSONL via write_jsonl_comparison.
+
+Usage: python bench_generate_comparison.py [--items 500] [--metrics 48] [--repeat 5]
+                                           [--stream-items 20000]
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import tempfile
+import timeit
+import tracemalloc
+from typing import Any, Dict, List
+
+import generate_comparison
+from bench_markdown_writer import legacy_flatten_dict, legacy_generate_comparison_table
+
+
+def build_items(items: int, metrics: int) -> List[Dict[str, Any]]:
+    """Comparison items with nested metric groups and a few sparse columns."""
+    groups = max(1, metrics // 12)
+    data = []
+    for i in range(items):
+        item: Dict[str, Any] = {"Name": f"config-{i}"}
+        for g in range(groups):
+            item[f"group{g}"] = {f"metric{m}": (i * m) % 97 / 3 for m in range(12)}
+        item["tags"] = ["fast", "small", f"build-{i}"]
+        if i % 7 == 0:
+            item[f"extra{i % 5}"] = "sparse value"
+        data.append(item)
+    return data
+
+
+def render(table) -> str:
+    """Render a ComparisonTable the way the CLI does."""
+    return generate_comparison.format_as_markdown_table(table.headers, table.rows)
+
+
+def render_json_file(path: str) -> str:
+    """Load a JSON array and render it in memory, as the default CLI mode does."""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return "## Comparison\n\n" + render(generate_comparison.generate_comparison_table(data)) + "\n"
+
+
+def stream_jsonl_file(path: str) -> str:
+    """Stream a JSONL file into a buffer (the sink is not counted as streamed memory)."""
+    out = io.StringIO()
+    with open(path, encoding='utf-8') as f:
+        generate_comparison.write_jsonl_comparison(f, out)
+    return out.getvalue()
+
+
+def stream_jsonl_devnull(path: str) -> None:
+    """Stream a JSONL file to /dev/null, as when piping to another process."""
+    with open(path, encoding='utf-8') as f, open(os.devnull, 'w') as out:
+        generate_comparison.write_jsonl_comparison(f, out)
+
+
+def peak_kib(func, arg) -> float:
+    """Peak traced allocation while running func(arg), in KiB."""
+    tracemalloc.start()
+    try:
+        result = func(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak / 1024
+
+
+def bench(func, arg, repeat: int) -> float:
+    """Return the best-of-5 mean time per call in milliseconds."""
+    return min(timeit.repeat(lambda: func(arg), number=repeat, repeat=5)) / repeat * 1000
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description='Benchmark comparison table generation')
+    parser.add_argument('--items', type=int, default=500, help='Items to compare')
+    parser.add_argument('--metrics', type=int, default=48, help='Nested metrics per item')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions')
+    parser.add_argument('--stream-items', type=int, default=20000, help='Items for the streaming case')
+    args = parser.parse_args()
+
+    # Keep logging out of the measurement
+    logging.disable(logging.CRITICAL)
+
+    data = build_items(args.items, args.metrics)
+    legacy_table = legacy_generate_comparison_table(data)
+    table = generate_comparison.generate_comparison_table(data)
+    assert legacy_table.headers == table.headers
+    assert legacy_table.rows == list(table.rows)
+    assert render(legacy_table) == render(table)
+
+    cases = [
+        ("flatten items",
+         lambda d: [legacy_flatten_dict(item) for item in d],
+         lambda d: [generate_comparison.flatten_dict(item) for item in d]),
+        ("build table", legacy_generate_comparison_table, generate_comparison.generate_comparison_table),
+        ("build + render",
+         lambda d: render(legacy_generate_comparison_table(d)),
+         lambda d: render(generate_comparison.generate_comparison_table(d))),
+    ]
+
+    print(f"{args.items} items x {len(table.headers)} columns")
+    print(f"{'case':<16} {'legacy ms':>10} {'columnar ms':>12} {'speedup':>8} "
+          f"{'legacy KiB':>11} {'columnar KiB':>13}")
+    for name, legacy, current in cases:
+        legacy_ms = bench(legacy, data, args.repeat)
+        current_ms = bench(current, data, args.repeat)
+        legacy_kib = peak_kib(legacy, data)
+        current_kib = peak_kib(current, data)
+        print(f"{name:<16} {legacy_ms:>10.2f} {current_ms:>12.2f} {legacy_ms / current_ms:>7.2f}x "
+              f"{legacy_kib:>11.0f} {current_kib:>13.0f}")
+
+    stream_data = build_items(args.stream_items, args.metrics)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "items.json")
+        jsonl_path = os.path.join(tmp, "items.jsonl")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(stream_data, f)
+        with open(jsonl_path, 'w', encoding='utf-8') as f:
+            for item in stream_data:
+                f.write(json.dumps(item) + "\n")
+        del stream_data
+        assert render_json_file(json_path) == stream_jsonl_file(jsonl_path)
+
+        in_memory_ms = bench(render_json_file, json_path, 1)
+        streamed_ms = bench(stream_jsonl_devnull, jsonl_path, 1)
+        in_memory_kib = peak_kib(render_json_file, json_path)
+        streamed_kib = peak_kib(stream_jsonl_devnull, jsonl_path)
+
+    print()
+    print(f"{args.stream_items} items from disk")
+    print(f"{'mode':<16} {'ms':>10} {'peak KiB':>10}")
+    print(f"{'in memory':<16} {in_memory_ms:>10.1f} {in_memory_kib:>10.0f}")
+    print(f"{'jsonl stream':<16} {streamed_ms:>10.1f} {streamed_kib:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
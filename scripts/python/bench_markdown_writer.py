@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+bench_markdown_writer.py - Micro-benchmark for the markdown formatters
+
+Compares the current formatters in combine_results.py and
+generate_comparison.py against the previous list-and-join implementations
+on 1k-row tables, and checks that both produce identical output. The table
+formatters render through MarkdownWriter; format_as_list and
+format_as_markdown stay on plain list-append/join, because the writer and
+per-line generator overhead made them 0.55-0.85x of the baseline.
+
+Best of 15 interleaved rounds, three runs, 1000 rows (legacy / current ms):
+  combine format_as_table     4.00-4.28 / 3.47-3.61  1.15-1.22x
+  combine format_as_list      2.42-2.56 / 2.47-2.61  0.98-1.02x
+  combine format_as_markdown  2.29-2.60 / 2.25-2.54  0.99-1.02x
+  generate_comparison_table   8.74-9.84 / 4.54-5.21  1.89-2.01x
+  format_as_markdown_table    2.80-4.64 / 2.07-3.58  1.30-1.35x
+
+Usage: python bench_markdown_writer.py [--rows 1000] [--repeat 20]
+"""
+
+import argparse
+import json
+import logging
+import timeit
+from typing import Any, Dict, List
+
+import combine_results
+import generate_comparison
+
+# Previous implementations, kept here only as the benchmark baseline
+
+
+def legacy_format_as_table(results: List[Dict[str, Any]]) -> str:
+    if not results:
+        return ""
+
+    # Extract all unique keys for headers
+    all_keys = set()
+    for result in results:
+        if "results" in result and isinstance(result["results"], dict):
+            all_keys.update(result["results"].keys())
+
+    if not all_keys:
+        return legacy_format_as_list(results)
+
+    # Build table
+    headers = ["Task/Item"] + sorted(all_keys)
+    lines = []
+
+    # Header row
+    lines.append("| " + " | ".join(headers) + " |")
+    lines.append("|" + "|".join(["---" for _ in headers]) + "|")
+
+    # Data rows
+    for result in results:
+        task = result.get("task", result.get("child_id", "Unknown"))
+        row = [task]
+
+        result_data = result.get("results", {})
+        for key in sorted(all_keys):
+            value = result_data.get(key, "-")
+            if isinstance(value, (list, dict)):
+                value = str(value)[:50] + "..." if len(str(value)) > 50 else str(value)
+            row.append(str(value))
+
+        lines.append("| " + " | ".join(row) + " |")
+
+    return "\n".join(lines)
+
+
+def legacy_format_as_list(results: List[Dict[str, Any]]) -> str:
+    lines = []
+
+    for i, result in enumerate(results, 1):
+        child_id = result.get("child_id", i)
+        task = result.get("task", "Task")
+
+        lines.append(f"### {i}. {task} (Child {child_id})")
+        lines.append("")
+
+        result_data = result.get("results", {})
+        if isinstance(result_data, dict):
+            for key, value in result_data.items():
+                lines.append(f"- **{key}**: {value}")
+        else:
+            lines.append(str(result_data))
+
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def legacy_format_as_markdown(results: List[Dict[str, Any]]) -> str:
+    lines = []
+
+    for result in results:
+        child_id = result.get("child_id", "unknown")
+        task = result.get("task", "")
+
+        if task:
+            lines.append(f"## Child {child_id}: {task}")
+        else:
+            lines.append(f"## Child {child_id} Results")
+
+        lines.append("")
+
+        result_data = result.get("results", {})
+        if isinstance(result_data, dict):
+            for key, value in result_data.items():
+                lines.append(f"### {key}")
+                if isinstance(value, list):
+                    for item in value:
+                        lines.append(f"- {item}")
+                else:
+                    lines.append(str(value))
+                lines.append("")
+        else:
+            lines.append(str(result_data))
+
+        lines.append("---")
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def legacy_format_as_markdown_table(headers: List[str], rows: List[List[str]]) -> str:
+    if not headers:
+        return ""
+
+    lines = []
+
+    # Escape pipe characters in content
+    safe_headers = [h.replace("|", "\\|") for h in headers]
+    safe_rows = []
+    for row in rows:
+        safe_row = [cell.replace("|", "\\|") for cell in row]
+        safe_rows.append(safe_row)
+
+    # Calculate column widths for better formatting
+    col_widths = [len(h) for h in safe_headers]
+    for row in safe_rows:
+        for i, cell in enumerate(row):
+            if i < len(col_widths):
+                col_widths[i] = max(col_widths[i], len(cell))
+
+    # Limit column width to prevent extremely wide tables
+    max_width = 50
+    col_widths = [min(w, max_width) for w in col_widths]
+
+    # Build header row
+    header_row = "| " + " | ".join(
+        h.ljust(w)[:w] for h, w in zip(safe_headers, col_widths)
+    ) + " |"
+    lines.append(header_row)
+
+    # Build separator row
+    separator = "|" + "|".join("-" * (w + 2) for w in col_widths) + "|"
+    lines.append(separator)
+
+    # Build data rows
+    for row in safe_rows:
+        padded_row = []
+        for i, cell in enumerate(row):
+            if i < len(col_widths):
+                # Truncate if necessary
+                if len(cell) > col_widths[i]:
+                    cell = cell[:col_widths[i]-3] + "..."
+                padded_row.append(cell.ljust(col_widths[i]))
+            else:
+                padded_row.append(cell)
+
+        row_str = "| " + " | ".join(padded_row) + " |"
+        lines.append(row_str)
+
+    return "\n".join(lines)
+
+
+def legacy_flatten_dict(d: Dict[str, Any], parent_key: str = "", sep: str = "_") -> Dict[str, Any]:
+    items = []
+    for k, v in d.items():
+        new_key = f"{parent_key}{sep}{k}" if parent_key else k
+
+        if isinstance(v, dict):
+            # Don't flatten too deep
+            if parent_key:
+                items.append((new_key, str(v)))
+            else:
+                items.extend(legacy_flatten_dict(v, new_key, sep=sep).items())
+        elif isinstance(v, list):
+            # Convert lists to comma-separated strings
+            if all(isinstance(item, (str, int, float)) for item in v):
+                items.append((new_key, ", ".join(str(item) for item in v)))
+            else:
+                items.append((new_key, str(v)))
+        else:
+            items.append((new_key, v))
+
+    return dict(items)
+
+
+def legacy_generate_comparison_table(data: List[Dict[str, Any]], title: str = "Comparison") -> generate_comparison.ComparisonTable:
+    if not data:
+        return generate_comparison.ComparisonTable(
+            headers=[],
+            rows=[],
+            title=title
+        )
+
+    # Extract all unique keys for headers
+    all_keys = set()
+    for item in data:
+        all_keys.update(legacy_flatten_dict(item).keys())
+
+    # Sort headers for consistency
+    headers = sorted(all_keys)
+
+    # Build rows
+    rows = []
+    for item in data:
+        flat_item = legacy_flatten_dict(item)
+        row = []
+        for header in headers:
+            value = flat_item.get(header, "-")
+            # Format value for display
+            if isinstance(value, list):
+                value = ", ".join(str(v) for v in value[:3])
+                if len(value) > 3:
+                    value += "..."
+            elif isinstance(value, dict):
+                value = json.dumps(value)[:50] + "..." if len(json.dumps(value)) > 50 else json.dumps(value)
+            elif len(str(value)) > 100:
+                value = str(value)[:97] + "..."
+            row.append(str(value))
+        rows.append(row)
+
+    return generate_comparison.ComparisonTable(
+        headers=headers,
+        rows=rows,
+        title=title
+    )
+
+
+def build_child_results(rows: int) -> List[Dict[str, Any]]:
+    """Child results with scalar, list and nested values."""
+    return [
+        {
+            "child_id": i,
+            "task": f"Evaluate configuration {i}",
+            "results": {
+                "status": "Good" if i % 3 else "Excellent",
+                "latency_ms": i * 1.5,
+                "notes": "Stable under load; no regressions observed in the nightly run",
+                "tags": ["fast", "small", f"build-{i}"],
+                "details": {"p50": i, "p99": i * 4, "samples": 1000},
+            },
+        }
+        for i in range(rows)
+    ]
+
+
+def build_comparison_items(rows: int) -> List[Dict[str, Any]]:
+    """Comparison items with nested metrics."""
+    return [
+        {
+            "Name": f"framework-{i}",
+            "performance": {"score": i % 10, "note": "measured"},
+            "ecosystem": "Mature" if i % 2 else "Growing",
+            "languages": ["python", "go", "rust", "java"],
+            "summary": "A fairly long description of the framework " * 3,
+        }
+        for i in range(rows)
+    ]
+
+
+def bench_pair(legacy, current, arg, repeat: int, rounds: int = 15):
+    """
+    Time legacy and current alternately and keep the best round of each.
+
+    Interleaving keeps machine noise from landing on one side only.
+
+    Returns:
+        (legacy_ms, current_ms) mean time per call in milliseconds
+    """
+    legacy_best = current_best = float("inf")
+    for _ in range(rounds):
+        legacy_best = min(legacy_best, timeit.timeit(lambda: legacy(arg), number=repeat))
+        current_best = min(current_best, timeit.timeit(lambda: current(arg), number=repeat))
+    return legacy_best / repeat * 1000, current_best / repeat * 1000
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description='Benchmark markdown formatters')
+    parser.add_argument('--rows', type=int, default=1000, help='Rows per table')
+    parser.add_argument('--repeat', type=int, default=20, help='Timing repetitions')
+    args = parser.parse_args()
+
+    # Keep logging out of the measurement
+    logging.disable(logging.CRITICAL)
+
+    results = build_child_results(args.rows)
+    items = build_comparison_items(args.rows)
+    table = generate_comparison.generate_comparison_table(items)
+
+    cases = [
+        ("combine format_as_table", legacy_format_as_table, combine_results.format_as_table, results),
+        ("combine format_as_list", legacy_format_as_list, combine_results.format_as_list, results),
+        ("combine format_as_markdown", legacy_format_as_markdown, combine_results.format_as_markdown, results),
+        ("generate_comparison_table",
+         lambda d: legacy_generate_comparison_table(d).rows,
+         lambda d: list(generate_comparison.generate_comparison_table(d).rows), items),
+        ("format_as_markdown_table",
+         lambda t: legacy_format_as_markdown_table(t.headers, t.rows),
+         lambda t: generate_comparison.format_as_markdown_table(t.headers, t.rows), table),
+    ]
+
+    print(f"{'case (' + str(args.rows) + ' rows)':<32} {'legacy ms':>10} {'writer ms':>10} {'speedup':>8}")
+    for name, legacy, current, arg in cases:
+        assert legacy(arg) == current(arg), name
+        legacy_ms, current_ms = bench_pair(legacy, current, arg, args.repeat)
+        print(f"{name:<32} {legacy_ms:>10.3f} {current_ms:>10.3f} {legacy_ms / current_ms:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+branch_index.py - Index of gitaiteams/issue-N[-child-M] branches
+
+Counting children or looking for grandchildren by grepping `git branch -r`
+is linear in every gitaiteams branch of every issue, and repositories keep
+thousands of stale ones. A BranchIndex parses a ref listing once into
+issue -> parent branch -> child branches, so lookups are dict hits, and
+records constitution violations (grandchildren, more than MAX_CHILDREN
+children) while it is built.
+
+The listing comes from `git for-each-ref`, run by bash.
+"""
+
+import sys
+import argparse
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from io_utils import read_lines
+from log_utils import configure_logging, timed
+
+logger = logging.getLogger(__name__)
+
+BRANCH_PREFIX = "gitaiteams/issue-"
+MAX_CHILDREN = 5
+
+# gitaiteams/issue-N, gitaiteams/issue-N-child-M and (forbidden) deeper nesting
+BRANCH_RE = re.compile(r'gitaiteams/issue-(?P<issue>\d+)(?P<children>(?:-child-\d+)*)$')
+CHILD_SEGMENT = "-child-"
+
+
+def parent_branch(issue_number: int) -> str:
+    """Parent branch name for an issue."""
+    return f"{BRANCH_PREFIX}{issue_number}"
+
+
+def normalize_ref(ref: str) -> Optional[str]:
+    """
+    Branch name of a gitaiteams ref, without refs/remotes/<remote>/ or origin/.
+
+    Args:
+        ref: Ref as printed by git for-each-ref or git branch -r
+
+    Returns:
+        e.g. "gitaiteams/issue-3-child-1", or None for other refs
+    """
+    start = ref.find(BRANCH_PREFIX)
+    if start < 0:
+        return None
+    return ref[start:].strip()
+
+
+@dataclass
+class IssueBranches:
+    """Branches of one issue."""
+    parent: Optional[str] = None
+    children: Dict[int, str] = field(default_factory=dict)
+    grandchildren: List[str] = field(default_factory=list)
+
+
+class BranchIndex:
+    """
+    issue number -> parent branch -> child branches, with O(1) lookups.
+
+    Args:
+        refs: Ref names; anything that is not a gitaiteams branch is ignored
+    """
+
+    def __init__(self, refs: Iterable[str] = ()):
+        self.issues: Dict[int, IssueBranches] = {}
+        self.violations: List[Dict[str, Any]] = []
+        self._issue_violations: Dict[int, List[Dict[str, Any]]] = {}
+        for ref in refs:
+            self._add(ref)
+        self._check_violations()
+
+    def _add(self, ref: str) -> None:
+        branch = normalize_ref(ref)
+        match = BRANCH_RE.fullmatch(branch) if branch else None
+        if not match:
+            return
+        issue = int(match.group("issue"))
+        entry = self.issues.get(issue)
+        if entry is None:
+            entry = self.issues[issue] = IssueBranches()
+        nested = match.group("children")
+        if not nested:
+            entry.parent = branch
+        elif nested.count(CHILD_SEGMENT) == 1:
+            entry.children[int(nested[len(CHILD_SEGMENT):])] = branch
+        else:
+            entry.grandchildren.append(branch)
+
+    def _check_violations(self) -> None:
+        self.violations = []
+        self._issue_violations = {}
+        for issue in sorted(self.issues):
+            entry = self.issues[issue]
+            found = []
+            if entry.grandchildren:
+                entry.grandchildren.sort()
+                found.append({"type": "grandchildren", "branches": list(entry.grandchildren)})
+            if len(entry.children) > MAX_CHILDREN:
+                found.append({"type": "too_many_children", "count": len(entry.children),
+                              "limit": MAX_CHILDREN})
+            if found:
+                self._issue_violations[issue] = found
+                self.violations.extend({"issue": issue, **violation} for violation in found)
+
+    def has_parent(self, issue_number: int) -> bool:
+        """True when the issue's parent branch exists."""
+        entry = self.issues.get(issue_number)
+        return entry is not None and entry.parent is not None
+
+    def child_count(self, issue_number: int) -> int:
+        """Number of child branches of an issue (grandchildren excluded)."""
+        entry = self.issues.get(issue_number)
+        return len(entry.children) if entry else 0
+
+    def child_branch(self, issue_number: int, child_number: int) -> Optional[str]:
+        """Branch of one child, or None if it does not exist."""
+        entry = self.issues.get(issue_number)
+        return entry.children.get(child_number) if entry else None
+
+    def child_branches(self, issue_number: int) -> List[str]:
+        """Child branches of an issue, ordered by child number."""
+        entry = self.issues.get(issue_number)
+        if not entry:
+            return []
+        return [entry.children[number] for number in sorted(entry.children)]
+
+    def grandchildren(self, issue_number: int) -> List[str]:
+        """Forbidden grandchild branches of an issue."""
+        entry = self.issues.get(issue_number)
+        return list(entry.grandchildren) if entry else []
+
+    def violations_for(self, issue_number: int) -> List[Dict[str, Any]]:
+        """Constitution violations of one issue, without the issue key."""
+        return list(self._issue_violations.get(issue_number, []))
+
+    def issue_numbers(self) -> List[int]:
+        """Issues with at least one gitaiteams branch."""
+        return sorted(self.issues)
+
+    def lookup(self, branch: str) -> Optional[Tuple[int, Optional[int]]]:
+        """
+        Issue and child number of an indexed branch.
+
+        Returns:
+            (issue, child) with child None for a parent branch, or None when
+            the branch is not indexed (grandchildren are not looked up)
+        """
+        name = normalize_ref(branch)
+        match = BRANCH_RE.fullmatch(name) if name else None
+        if not match:
+            return None
+        issue = int(match.group("issue"))
+        nested = match.group("children")
+        entry = self.issues.get(issue)
+        if entry is None:
+            return None
+        if not nested:
+            return (issue, None) if entry.parent else None
+        if nested.count(CHILD_SEGMENT) != 1:
+            return None
+        child = int(nested[len(CHILD_SEGMENT):])
+        return (issue, child) if child in entry.children else None
+
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description='Index gitaiteams issue/child branches')
+    parser.add_argument('issues', type=int, nargs='*',
+                        help='Issue numbers to report (default: every indexed issue)')
+    parser.add_argument('--refs', type=str, required=True,
+                        help="File of `git for-each-ref --format='%%(refname:short)'` output ('-' for stdin)")
+    parser.add_argument('--debug', action='store_true', help='Enable debug logging')
+
+    args = parser.parse_args()
+
+    configure_logging(debug=args.debug)
+
+    try:
+        refs = read_lines(args.refs)
+    except OSError as e:
+        logger.error("Failed to read refs: %s", e)
+        print(json.dumps({"error": f"Failed to read refs: {e}", "issues": {}}))
+        return 1
+
+    with timed(logger, "build_index") as stage:
+        index = BranchIndex(refs)
+        stage["issues"] = len(index.issues)
+
+    numbers = args.issues or index.issue_numbers()
+    print(json.dumps({
+        "issues": {
+            str(number): {
+                "parent_exists": index.has_parent(number),
+                "children": index.child_count(number),
+                "child_branches": index.child_branches(number),
+            }
+            for number in numbers
+        },
+        "violations": index.violations,
+    }))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+classification_cache.py - Memoized status classification keyed by content hash
+
+Child status bodies are re-classified on every router event and analyzer
+retry. A ClassificationCache keeps results in a bounded in-process LRU and,
+when opted in, in a directory under the runner's tool cache so later runs on
+the same runner can reuse them.
+
+In memory, entries are keyed by the classifier kind and the text itself;
+the disk cache names its files by sha256 of the classifier version, the
+kind and the text, so changing the rules (and bumping the version) never
+serves stale results. Cached results are frozen (dicts become read-only
+mappings, lists become tuples) and handed out as they are, so a hit costs
+a dict lookup rather than a hash of the text and a deep copy.
+
+The disk cache is a disk_cache.DiskCacheDir holding at most
+disk_max_entries files.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional
+
+import disk_cache
+from disk_cache import DiskCacheDir
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAXSIZE = 1024
+DEFAULT_DISK_MAX_ENTRIES = 10000
+DISK_CACHE_NAME = 'classification'
+ENTRY_SUFFIX = '.json'
+
+
+def freeze(value: Any) -> Any:
+    """Read-only copy of a JSON-like value: dicts become mappingproxies, lists tuples."""
+    if isinstance(value, (dict, MappingProxyType)):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Plain (mutable, JSON serializable) copy of a frozen value."""
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+def default_disk_dir() -> Optional[str]:
+    """The classification cache directory under the runner's tool cache, if set."""
+    return disk_cache.default_disk_dir(DISK_CACHE_NAME)
+
+
+def resolve_disk_dir(requested: bool) -> Optional[str]:
+    """
+    Classification cache directory for a script run, if the disk cache is opted in.
+
+    Args:
+        requested: True when the script was asked for the disk cache
+            (GITAI_CLASSIFY_DISK_CACHE=1 also opts in)
+
+    Returns:
+        The directory path, or None to use the in-process cache only
+    """
+    return disk_cache.resolve_disk_dir(DISK_CACHE_NAME, requested, 'GITAI_CLASSIFY_DISK_CACHE')
+
+
+class ClassificationCache:
+    """
+    Bounded LRU cache for classifier results with an optional disk layer.
+
+    Values must be JSON serializable. They are frozen when cached and
+    returned without copying, so callers cannot change a cached result.
+
+    Args:
+        version: Classifier version, part of every disk key
+        maxsize: Entries kept in the in-process LRU
+        disk_dir: Also persist results in this directory (opt-in)
+        disk_max_entries: Evict least recently used disk entries beyond this count
+    """
+
+    def __init__(self, version: str, maxsize: int = DEFAULT_MAXSIZE, disk_dir: Optional[str] = None,
+                 disk_max_entries: int = DEFAULT_DISK_MAX_ENTRIES):
+        self.version = version
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self.disk_max_entries = disk_max_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self.store = DiskCacheDir(disk_dir, ENTRY_SUFFIX, disk_max_entries) if disk_dir else None
+        # Classifiers may run from worker threads; guards the LRU and counters
+        self._lock = threading.Lock()
+
+    @property
+    def evictions(self) -> int:
+        return self.store.evictions if self.store else 0
+
+    def key(self, kind: str, text: str) -> str:
+        """Content hash naming a text's disk entry for one classifier version."""
+        digest = hashlib.sha256(f"{self.version}\0{kind}\0".encode('utf-8'))
+        digest.update(text.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def get_or_compute(self, kind: str, text: str, compute: Callable[[str], Any]) -> Any:
+        """
+        Return the cached result for a text, computing and storing it on a miss.
+
+        Args:
+            kind: Classifier name, part of the key
+            text: Text to classify
+            compute: Classifier called with the text on a miss
+
+        Returns:
+            The classifier result, frozen (see freeze)
+        """
+        entries = self._entries
+        memory_key = (kind, text)
+        with self._lock:
+            value = entries.get(memory_key)
+            if value is not None:
+                entries.move_to_end(memory_key)
+                self.hits += 1
+                return value
+
+        disk_key = self.key(kind, text) if self.store else None
+        value = self._read_disk(disk_key) if disk_key else None
+        if value is not None:
+            hit = True
+        else:
+            hit = False
+            value = compute(text)
+            if disk_key:
+                self._write_disk(disk_key, value)
+
+        value = freeze(value)
+        with self._lock:
+            if hit:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+            entries[memory_key] = value
+            if len(entries) > self.maxsize:
+                entries.popitem(last=False)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the JSON output."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "disk": self.disk_dir is not None
+            }
+
+    def evict(self) -> int:
+        """Remove least recently used disk entries beyond disk_max_entries; returns the count removed."""
+        return self.store.evict() if self.store else 0
+
+    def _read_disk(self, key: str) -> Any:
+        path = self.store.path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                value = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug("Ignoring unreadable cache entry %s: %s", key, e)
+            return None
+        self.store.touch(path)
+        return value
+
+    def _write_disk(self, key: str, value: Any) -> None:
+        try:
+            data = json.dumps(value).encode('utf-8')
+        except (TypeError, ValueError) as e:
+            logger.debug("Could not encode cache entry %s: %s", key, e)
+            return
+        self.store.write(key, data)
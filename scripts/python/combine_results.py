@@ -4,10 +4,36 @@ T024: Result combiner for merging child agent outputs
 Combines results from multiple child agents into a unified response
 """
 
+import glob
+import io
 import json
+import logging
+import os
+import re
+import shutil
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, asdict
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterable, Iterator, Optional, TextIO, Tuple
+
+from log_utils import configure_logging, timed
+from markdown_writer import MarkdownWriter, cell_text, escape_cell
+
+logger = logging.getLogger(__name__)
+
+# GitHub issue/comment body limit
+MAX_CONTENT_SIZE = 65536
+# Room kept for the truncation notice when content is cut
+TRUNCATION_MARGIN = 100
+TRUNCATION_NOTICE = "\n\n[Content truncated due to size limit]"
+# Ends a child's section when it is trimmed to its fair share of the budget
+CHILD_TRUNCATION_NOTICE = "\n\n[Child output truncated to fit the size limit]\n"
+NO_RESULTS_MESSAGE = "No successful results to combine."
+# Artifact reads are I/O bound; at most 5 children, plus headroom for retries
+MAX_LOAD_WORKERS = 8
+
+NATURAL_SPLIT_RE = re.compile(r'(\d+)')
 
 
 @dataclass
@@ -18,35 +44,172 @@ class CombinedResult:
     metadata: Dict[str, Any]
 
 
-def combine_child_results(child_results: List[Dict[str, Any]]) -> CombinedResult:
+class BudgetedWriter:
     """
-    Combine results from multiple child agents.
+    Writes text to a stream until a size budget is exhausted.
+
+    Output is identical to formatting everything and then cutting it to
+    ``max_size - margin`` characters plus the notice: text past the cut
+    point is held back until it is known whether the total fits in
+    max_size. Once the budget is exceeded, write() returns False and the
+    caller can stop formatting.
+    """
+
+    def __init__(self, out: TextIO, max_size: int = MAX_CONTENT_SIZE,
+                 margin: int = TRUNCATION_MARGIN, notice: str = TRUNCATION_NOTICE):
+        self.out = out
+        self.max_size = max_size
+        self.cut = max_size - margin
+        self.notice = notice
+        self.size = 0
+        self.truncated = False
+        self._held: List[str] = []
+
+    def write(self, text: str) -> bool:
+        """Write text; returns False once the budget has been exceeded."""
+        if self.truncated:
+            return False
+        start = self.size
+        self.size += len(text)
+        if self.size <= self.cut:
+            self.out.write(text)
+            return True
+        if start < self.cut:
+            self.out.write(text[:self.cut - start])
+            text = text[self.cut - start:]
+        if self.size > self.max_size:
+            self.out.write(self.notice)
+            self.truncated = True
+            self._held = []
+            return False
+        self._held.append(text)
+        return True
+
+    def close(self) -> None:
+        """Flush held-back text if the content fit in the budget."""
+        if not self.truncated:
+            self.out.write("".join(self._held))
+            self._held = []
+
+
+def is_successful(result: Dict[str, Any]) -> bool:
+    """Whether a child result contributes a section to the combined output"""
+    # If no status is provided, treat as success (for backward compatibility)
+    status = result.get("status", "success" if "results" in result else "unknown")
+    return status == "success" or (status == "unknown" and "results" in result)
+
+
+def result_section(result: Dict[str, Any]) -> Dict[str, Any]:
+    """The part of a child result that is formatted into its section"""
+    return {
+        "child_id": result.get("child_id", "unknown"),
+        "task": result.get("task", ""),
+        "results": result.get("results", {})
+    }
+
+
+def measure_section(section: Dict[str, Any]) -> int:
+    """
+    Size of a section's markdown without building it.
+
+    Lines are generated one at a time and only their lengths are kept.
+    """
+    size = -1
+    for line in iter_markdown_lines(section):
+        size += len(line) + 1
+    return max(size, 0)
+
+
+def allocate_fair_share(sizes: List[int], budget: int) -> List[int]:
+    """
+    Split a size budget across sections by water-filling.
+
+    Sections smaller than an equal share keep their full size and the
+    budget they leave unused is shared among the larger ones, so a verbose
+    child can no longer starve the children after it.
 
     Args:
-        child_results: List of result dictionaries from child agents
+        sizes: Formatted size of each section
+        budget: Characters available for all sections
 
     Returns:
-        CombinedResult with merged content and metadata
+        Characters allocated to each section, in input order
     """
-    if not child_results:
-        return CombinedResult(
-            content="",
-            format_type="empty",
-            metadata={"children_count": 0}
-        )
+    if sum(sizes) <= budget:
+        return list(sizes)
+
+    allocations = [0] * len(sizes)
+    remaining = max(budget, 0)
+    left = len(sizes)
+    for i in sorted(range(len(sizes)), key=sizes.__getitem__):
+        allocations[i] = min(sizes[i], remaining // left)
+        remaining -= allocations[i]
+        left -= 1
+    return allocations
+
 
-    # Initialize metadata
+def plan_fair_share(child_results: Iterable[Dict[str, Any]],
+                    max_size: int = MAX_CONTENT_SIZE) -> List[Optional[int]]:
+    """
+    Measure every child's section and allocate the size budget fairly.
+
+    Args:
+        child_results: Result dictionaries from child agents
+        max_size: Maximum content size in characters
+
+    Returns:
+        Allocation per child in input order (None for children without a
+        section), to pass to stream_child_results
+    """
+    sizes: List[Optional[int]] = [
+        measure_section(result_section(result)) if is_successful(result) else None
+        for result in child_results
+    ]
+    measured = [size for size in sizes if size is not None]
+    # Sections are joined by one newline each
+    budget = max_size - max(len(measured) - 1, 0)
+    allocations = iter(allocate_fair_share(measured, budget))
+    return [None if size is None else next(allocations) for size in sizes]
+
+
+def stream_child_results(child_results: Iterable[Dict[str, Any]],
+                         out: TextIO,
+                         max_size: int = MAX_CONTENT_SIZE,
+                         allocations: Optional[List[Optional[int]]] = None) -> Dict[str, Any]:
+    """
+    Combine child results into markdown written incrementally to a stream.
+
+    Each successful child is formatted and written as it arrives. With
+    allocations (from plan_fair_share), each section is trimmed to its own
+    share of the budget. Without them the results are read in a single
+    pass and the content is cut once the overall budget is reached. Either
+    way, content past a budget is never formatted, and every child is still
+    recorded in the metadata.
+
+    Args:
+        child_results: Result dictionaries from child agents (any iterable,
+            e.g. iter_jsonl_results over a file)
+        out: Stream receiving the markdown
+        max_size: Maximum content size in characters
+        allocations: Per-child allocations from plan_fair_share for the
+            same results, in the same order
+
+    Returns:
+        Metadata as produced by combine_child_results (only
+        children_count when there were no results)
+    """
     metadata = {
-        "children_count": len(child_results),
+        "children_count": 0,
         "children": [],
         "successful_children": 0,
         "failed_children": 0,
         "warnings": []
     }
 
-    # Process each child result
-    combined_content = []
-    for result in child_results:
+    writer = BudgetedWriter(out, max_size)
+    separator = ""
+    for position, result in enumerate(child_results):
+        metadata["children_count"] += 1
         child_id = result.get("child_id", "unknown")
         # If no status is provided, treat as success (for backward compatibility)
         status = result.get("status", "success" if "results" in result else "unknown")
@@ -56,19 +219,40 @@ def combine_child_results(child_results: List[Dict[str, Any]]) -> CombinedResult
             "child_id": child_id,
             "status": status,
             "branch": result.get("branch", ""),
-            "execution_time_ms": result.get("execution_time_ms", 0)
+            "execution_time_ms": result.get("execution_time_ms", 0),
+            "truncated": False
         }
         metadata["children"].append(child_meta)
 
         # Handle different statuses
-        if status == "success" or (status == "unknown" and "results" in result):
+        if is_successful(result):
             metadata["successful_children"] += 1
-            child_content = result.get("results", {})
-            combined_content.append({
-                "child_id": child_id,
-                "task": result.get("task", ""),
-                "results": child_content
-            })
+            if writer.truncated:
+                child_meta["truncated"] = True
+                continue
+            section_out = writer
+            if allocations is not None:
+                allowed = allocations[position]
+                notice = CHILD_TRUNCATION_NOTICE if allowed >= len(CHILD_TRUNCATION_NOTICE) else ""
+                section_out = BudgetedWriter(writer, allowed, margin=len(notice), notice=notice)
+            if separator:
+                writer.write(separator)
+            separator = "\n"
+            first = True
+            lines = iter_markdown_lines(result_section(result))
+            for line in lines:
+                if not section_out.write(line if first else "\n" + line):
+                    logger.debug("Size budget reached at child %s", child_id)
+                    child_meta["truncated"] = True
+                    break
+                first = False
+            if section_out is not writer:
+                section_out.close()
+                if child_meta["truncated"]:
+                    child_meta["shown_chars"] = allowed
+                    # The writer counted everything up to the cut; finish
+                    # measuring from there instead of formatting it again
+                    child_meta["output_chars"] = section_out.size + sum(len(line) + 1 for line in lines)
         elif status == "failed":
             metadata["failed_children"] += 1
             error_msg = result.get("error", "Unknown error")
@@ -77,22 +261,134 @@ def combine_child_results(child_results: List[Dict[str, Any]]) -> CombinedResult
             metadata["failed_children"] += 1
             metadata["warnings"].append(f"Child {child_id} timed out after 8 minutes")
 
-    # Format the combined content
-    if combined_content:
-        formatted = format_combined_output(combined_content, "markdown")
-    else:
-        formatted = "No successful results to combine."
+    if metadata["children_count"] == 0:
+        return {"children_count": 0}
+    if metadata["successful_children"] == 0:
+        writer.write(NO_RESULTS_MESSAGE)
+    writer.close()
+    metadata["truncated"] = writer.truncated or any(child["truncated"] for child in metadata["children"])
+    return metadata
+
+
+def iter_jsonl_results(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    """
+    Yield child results from a JSONL stream, one JSON object per line.
+
+    Blank lines are skipped.
+
+    Raises:
+        json.JSONDecodeError: If a line is not valid JSON
+    """
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
 
-    # Check for truncation need
-    max_size = 65536
-    if len(formatted) > max_size:
-        formatted = formatted[:max_size - 100] + "\n\n[Content truncated due to size limit]"
-        metadata["truncated"] = True
-    else:
-        metadata["truncated"] = False
+
+def child_sort_key(child_id: Any) -> Tuple:
+    """
+    Natural sort key for child ids, so 2 sorts before 10 and C2 before C10.
+    """
+    parts = NATURAL_SPLIT_RE.split(str(child_id))
+    return tuple((0, int(part), "") if part.isdigit() else (1, 0, part) for part in parts if part)
+
+
+def _child_id_from_path(path: str) -> str:
+    """Best-effort child id from an artifact name, e.g. child-3.json -> 3"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    numbers = NATURAL_SPLIT_RE.findall(stem)
+    return numbers[-1] if numbers else stem
+
+
+def load_child_result(path: str) -> Dict[str, Any]:
+    """
+    Load and validate one child's result artifact.
+
+    A file that cannot be read or is not a JSON object becomes a failed
+    child, so one corrupt artifact does not abort the whole combination.
+
+    Args:
+        path: Path to the child's JSON result
+
+    Returns:
+        The child result, with child_id taken from the file name if missing
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            result = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Could not load child result %s: %s", path, e)
+        return {
+            "child_id": _child_id_from_path(path),
+            "status": "failed",
+            "error": f"Could not load {os.path.basename(path)}: {e}"
+        }
+
+    if not isinstance(result, dict):
+        logger.warning("Child result %s is not a JSON object", path)
+        return {
+            "child_id": _child_id_from_path(path),
+            "status": "failed",
+            "error": f"Invalid result in {os.path.basename(path)}: expected a JSON object"
+        }
+
+    result.setdefault("child_id", _child_id_from_path(path))
+    return result
+
+
+def find_result_files(directory: Optional[str] = None, pattern: Optional[str] = None) -> List[str]:
+    """
+    List child result artifacts from a directory (*.json) or a glob pattern.
+
+    Returns:
+        Matching file paths, sorted
+    """
+    if directory is not None:
+        pattern = os.path.join(directory, "*.json")
+    return sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+
+def load_child_results(paths: List[str], workers: int = MAX_LOAD_WORKERS) -> List[Dict[str, Any]]:
+    """
+    Load child result artifacts concurrently.
+
+    Args:
+        paths: Artifact paths, one per child
+        workers: Maximum concurrent reads
+
+    Returns:
+        Child results in natural child-id order (file path breaks ties)
+    """
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(paths)))) as executor:
+        results = list(executor.map(load_child_result, paths))
+    order = sorted(range(len(paths)), key=lambda i: (child_sort_key(results[i]["child_id"]), paths[i]))
+    return [results[i] for i in order]
+
+
+def combine_child_results(child_results: List[Dict[str, Any]]) -> CombinedResult:
+    """
+    Combine results from multiple child agents.
+
+    Args:
+        child_results: List of result dictionaries from child agents
+
+    Returns:
+        CombinedResult with merged content and metadata
+    """
+    if not child_results:
+        return CombinedResult(
+            content="",
+            format_type="empty",
+            metadata={"children_count": 0}
+        )
+
+    out = io.StringIO()
+    allocations = plan_fair_share(child_results)
+    metadata = stream_child_results(child_results, out, allocations=allocations)
 
     return CombinedResult(
-        content=formatted,
+        content=out.getvalue(),
         format_type="markdown",
         metadata=metadata
     )
@@ -153,28 +449,29 @@ def format_as_table(results: List[Dict[str, Any]]) -> str:
         return format_as_list(results)
 
     # Build table
-    headers = ["Task/Item"] + sorted(all_keys)
-    lines = []
+    keys = sorted(all_keys)
+    headers = ["Task/Item"] + keys
+    writer = MarkdownWriter()
 
     # Header row
-    lines.append("| " + " | ".join(headers) + " |")
-    lines.append("|" + "|".join(["---" for _ in headers]) + "|")
+    writer.table_row(escape_cell(cell_text(header)) for header in headers)
+    writer.line("|" + "|".join("---" for _ in headers) + "|")
 
     # Data rows
     for result in results:
-        task = result.get("task", result.get("child_id", "Unknown"))
-        row = [task]
+        row = [escape_cell(cell_text(result.get("task", result.get("child_id", "Unknown"))))]
 
         result_data = result.get("results", {})
-        for key in sorted(all_keys):
+        if not isinstance(result_data, dict):
+            result_data = {}
+        for key in keys:
             value = result_data.get(key, "-")
-            if isinstance(value, (list, dict)):
-                value = str(value)[:50] + "..." if len(str(value)) > 50 else str(value)
-            row.append(str(value))
+            text = cell_text(value, 50) if isinstance(value, (list, dict)) else cell_text(value)
+            row.append(escape_cell(text))
 
-        lines.append("| " + " | ".join(row) + " |")
+        writer.table_row(row)
 
-    return "\n".join(lines)
+    return writer.getvalue()
 
 
 def format_as_list(results: List[Dict[str, Any]]) -> str:
@@ -202,6 +499,8 @@ def format_as_list(results: List[Dict[str, Any]]) -> str:
 
 def format_as_markdown(results: List[Dict[str, Any]]) -> str:
     """Format results as structured markdown"""
+    # Same lines as iter_markdown_lines, appended directly: generator
+    # dispatch per line costs about a third more on large result sets
     lines = []
 
     for result in results:
@@ -234,26 +533,96 @@ def format_as_markdown(results: List[Dict[str, Any]]) -> str:
     return "\n".join(lines)
 
 
+def iter_markdown_lines(result: Dict[str, Any]) -> Iterator[str]:
+    """Yield the structured markdown lines for one result (streaming form of format_as_markdown)"""
+    child_id = result.get("child_id", "unknown")
+    task = result.get("task", "")
+
+    if task:
+        yield f"## Child {child_id}: {task}"
+    else:
+        yield f"## Child {child_id} Results"
+
+    yield ""
+
+    result_data = result.get("results", {})
+    if isinstance(result_data, dict):
+        for key, value in result_data.items():
+            yield f"### {key}"
+            if isinstance(value, list):
+                for item in value:
+                    yield f"- {item}"
+            else:
+                yield str(value)
+            yield ""
+    else:
+        yield str(result_data)
+
+    yield "---"
+    yield ""
+
+
 def main():
     """Main entry point for CLI usage"""
-    if len(sys.argv) < 2:
+    if len(sys.argv) < 2 or (sys.argv[1] in ("--jsonl", "--dir", "--glob") and len(sys.argv) < 3):
         print("Usage: python combine_results.py <results.json>")
         print("   or: python combine_results.py --stdin")
+        print("   or: python combine_results.py --jsonl <results.jsonl|->")
+        print("   or: python combine_results.py --dir <artifacts-dir>")
+        print("   or: python combine_results.py --glob '<pattern>'")
         sys.exit(1)
 
+    # Metadata goes to stderr, so stay quiet unless GITAI_LOG_LEVEL/GITAI_TRACE ask otherwise
+    configure_logging(level=logging.WARNING)
+
+    if sys.argv[1] == "--jsonl":
+        # Two passes over the file: measure and allocate the budget, then
+        # stream each section; only one child result is in memory at a time
+        source = sys.argv[2]
+        if source == "-":
+            # stdin cannot be re-read, so spool it to a temporary file
+            stream = tempfile.TemporaryFile('w+', encoding='utf-8')
+            shutil.copyfileobj(sys.stdin, stream)
+        else:
+            stream = open(source, 'r', encoding='utf-8')
+        try:
+            with timed(logger, "plan_budget") as stage:
+                stream.seek(0)
+                allocations = plan_fair_share(iter_jsonl_results(stream))
+                stage["children"] = len(allocations)
+            with timed(logger, "stream_combine"):
+                stream.seek(0)
+                metadata = stream_child_results(iter_jsonl_results(stream), sys.stdout,
+                                                allocations=allocations)
+        finally:
+            stream.close()
+        print()
+        print(json.dumps(metadata), file=sys.stderr)
+        return
+
     # Read input
-    if sys.argv[1] == "--stdin":
-        data = json.load(sys.stdin)
-    else:
-        with open(sys.argv[1], 'r') as f:
-            data = json.load(f)
+    with timed(logger, "load_results"):
+        if sys.argv[1] in ("--dir", "--glob"):
+            # One artifact per child, read concurrently
+            if sys.argv[1] == "--dir":
+                paths = find_result_files(directory=sys.argv[2])
+            else:
+                paths = find_result_files(pattern=sys.argv[2])
+            data = load_child_results(paths)
+        elif sys.argv[1] == "--stdin":
+            data = json.load(sys.stdin)
+        else:
+            with open(sys.argv[1], 'r') as f:
+                data = json.load(f)
 
     # Ensure data is a list
     if not isinstance(data, list):
         data = [data]
 
     # Combine results
-    result = combine_child_results(data)
+    with timed(logger, "combine", children=len(data)) as stage:
+        result = combine_child_results(data)
+        stage["chars"] = len(result.content)
 
     # Output combined result
     print(result.content)
@@ -263,4 +632,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
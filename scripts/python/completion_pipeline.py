@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+completion_pipeline.py - Count, classify and decide on child completions in one process
+
+Runs the steps the router and analyzer otherwise spread across separate
+processes: count child markers, classify each child's latest report, compute
+the merge strategy, and flag whether a Claude analysis is needed. High
+confidence decisions (e.g. every child succeeded and opened a PR) can be
+acted on directly, skipping the LLM run.
+
+PR numbers come from free-text child comments, so before they are handed
+to `gh pr merge` each one is resolved through the API: it must be an open
+PR from a gitaiteams/issue-N-child-M branch of this repository into the
+issue's parent branch. Anything else sends the decision to Claude.
+"""
+
+import sys
+import argparse
+import json
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+from analyze_completions import detect_status_type, determine_merge_strategy, enable_classification_cache
+from branch_index import CHILD_SEGMENT, parent_branch
+from classification_cache import DEFAULT_MAXSIZE, resolve_disk_dir
+from count_completions import index_child_markers, match_expected_count
+from github_client import GitHubAPIError, GitHubClient, Request
+from io_utils import iter_json_array, open_source
+from log_utils import configure_logging, fields, item_tracer, timed
+
+logger = logging.getLogger(__name__)
+
+# Decisions below this confidence are handed to Claude
+DEFAULT_CONFIDENCE_THRESHOLD = 0.9
+
+STATUS_ICONS = {
+    "success": "✅",
+    "failure": "❌",
+    "partial": "⚠️",
+    "unknown": "❔"
+}
+
+
+def classify_children(index) -> List[Dict[str, Any]]:
+    """
+    Classify the latest report of each child in a ChildCompletionIndex.
+
+    The index must have been built with keep_bodies=True.
+
+    Returns:
+        One entry per child (id order, then markers without an id) with
+        child_id, status, pr_number and comment_id
+    """
+    tracer = item_tracer(logger)
+    entries = [(child_id, index.children[child_id]) for child_id in index.child_ids()]
+    entries.extend((None, entry) for entry in index.anonymous)
+
+    children = []
+    for child_id, entry in entries:
+        status = detect_status_type(entry.get("body", ""))
+        if tracer:
+            tracer.log("Child %s classified as %s", child_id, status)
+        children.append({
+            "child_id": child_id,
+            "status": status,
+            "pr_number": entry.get("pr_number"),
+            "comment_id": entry.get("comment_id")
+        })
+    return children
+
+
+def decide_llm(threshold_met: bool,
+               children: List[Dict[str, Any]],
+               merge_strategy: Dict[str, Any],
+               confidence_threshold: float) -> Optional[str]:
+    """
+    Decide whether the merge decision needs a Claude analysis.
+
+    Returns:
+        The reason Claude is needed, or None if the decision can be acted on
+    """
+    if not threshold_met:
+        return None
+    if merge_strategy["strategy"] == "manual_review":
+        return "statuses have no clear majority"
+    if merge_strategy["confidence"] < confidence_threshold:
+        return (f"confidence {merge_strategy['confidence']:.2f} is below "
+                f"{confidence_threshold:.2f}")
+    if merge_strategy["strategy"] == "merge":
+        if any(child["pr_number"] is None for child in children if child["status"] == "success"):
+            return "a successful child did not report a PR number"
+    return None
+
+
+def run_completion_pipeline(comments: Iterable[Any],
+                            issue_body: Optional[str] = None,
+                            threshold: int = 3,
+                            confidence_threshold: float = DEFAULT_CONFIDENCE_THRESHOLD) -> Dict[str, Any]:
+    """
+    Count child markers, classify each child and compute the merge decision.
+
+    Args:
+        comments: GitHub issue comments (any iterable, e.g. a stream)
+        issue_body: Parent issue body used to extract the expected count
+        threshold: Completion threshold
+        confidence_threshold: Minimum confidence to act without Claude
+
+    Returns:
+        Pipeline result with counts, per-child statuses, merge strategy,
+        PR numbers to merge and the needs_llm flag
+    """
+    with timed(logger, "count_markers") as stage:
+        index = index_child_markers(comments, keep_bodies=True)
+        child_count = index.unique_count
+        stage["child_count"] = child_count
+
+    expected_count = None
+    if issue_body:
+        match = match_expected_count(issue_body)
+        if match is not None:
+            expected_count = match[0]
+
+    threshold_met = child_count >= threshold
+    if expected_count is not None:
+        threshold_met = threshold_met or child_count >= expected_count
+
+    with timed(logger, "classify") as stage:
+        children = classify_children(index)
+        status_counts = {status: 0 for status in STATUS_ICONS}
+        for child in children:
+            status_counts[child["status"]] += 1
+        stage.update(status_counts)
+
+    if children:
+        merge_strategy = determine_merge_strategy([child["status"] for child in children])
+    else:
+        merge_strategy = {"strategy": "manual_review", "confidence": 0}
+
+    llm_reason = decide_llm(threshold_met, children, merge_strategy, confidence_threshold)
+    if not threshold_met:
+        decision = "wait"
+    elif llm_reason is not None:
+        decision = "llm_analysis"
+    else:
+        decision = merge_strategy["strategy"]
+
+    pr_numbers = []
+    if decision == "merge":
+        pr_numbers = sorted({child["pr_number"] for child in children
+                             if child["status"] == "success" and child["pr_number"] is not None})
+
+    result = {
+        "child_count": child_count,
+        "expected_count": expected_count,
+        "threshold_met": threshold_met,
+        "threshold": threshold,
+        "duplicates": index.duplicates,
+        "children": children,
+        "status_counts": status_counts,
+        "merge_strategy": merge_strategy["strategy"],
+        "confidence": merge_strategy["confidence"],
+        "decision": decision,
+        "needs_llm": llm_reason is not None,
+        "needs_llm_reason": llm_reason,
+        "pr_numbers": pr_numbers
+    }
+    logger.info("Pipeline decision", extra=fields(decision=decision, child_count=child_count,
+                                                  confidence=merge_strategy["confidence"],
+                                                  needs_llm=result["needs_llm"]))
+    return result
+
+
+def pull_request_problem(pr: Dict[str, Any], repo: str, issue_number: int) -> Optional[str]:
+    """
+    Why a pull request may not be merged as a child PR of an issue.
+
+    Args:
+        pr: Pull request from the REST API (pulls/{number})
+        repo: owner/name the PR must come from
+        issue_number: Parent issue
+
+    Returns:
+        The reason, or None when the PR is an open (or already merged) PR
+        from one of the issue's child branches into its parent branch
+    """
+    head = pr.get("head") or {}
+    base = (pr.get("base") or {}).get("ref")
+    head_ref = head.get("ref") or ""
+    head_repo = (head.get("repo") or {}).get("full_name")
+    parent = parent_branch(issue_number)
+    child_prefix = f"{parent}{CHILD_SEGMENT}"
+
+    if head_repo != repo:
+        return f"head is in {head_repo or 'an unknown repository'}, not {repo}"
+    if not (head_ref.startswith(child_prefix) and head_ref[len(child_prefix):].isdigit()):
+        return f"head {head_ref} is not a child branch of issue #{issue_number}"
+    if base != parent:
+        return f"base {base} is not {parent}"
+    if pr.get("state") != "open" and not pr.get("merged_at"):
+        return "is closed without being merged"
+    return None
+
+
+def verify_pull_requests(client: GitHubClient, repo: str, issue_number: int,
+                         pr_numbers: List[int]) -> Dict[str, Any]:
+    """
+    Resolve PR numbers taken from child comments through the API.
+
+    All PRs are requested as one concurrent batch.
+
+    Returns:
+        Dict with "open" (PR numbers safe to merge), "merged" (already
+        merged child PRs) and "rejected" ({number: reason})
+    """
+    responses = client.batch(Request("GET", f"repos/{repo}/pulls/{number}") for number in pr_numbers)
+    verified: Dict[str, Any] = {"open": [], "merged": [], "rejected": {}}
+    for number, response in zip(pr_numbers, responses):
+        if isinstance(response, GitHubAPIError) and response.status == 404:
+            verified["rejected"][number] = "not found"
+            continue
+        if isinstance(response, Exception):
+            raise response
+        pr = response.json() or {}
+        problem = pull_request_problem(pr, repo, issue_number)
+        if problem is not None:
+            verified["rejected"][number] = problem
+        elif pr.get("merged_at"):
+            verified["merged"].append(number)
+        else:
+            verified["open"].append(number)
+    return verified
+
+
+def apply_verification(result: Dict[str, Any], verified: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Restrict a merge decision to verified PRs.
+
+    Any rejected PR turns the decision into an LLM analysis with no PRs to
+    merge, so a stray PR number in a comment is never merged automatically.
+    """
+    result["pr_numbers"] = verified["open"]
+    result["merged_pr_numbers"] = verified["merged"]
+    if verified["rejected"]:
+        result["rejected_prs"] = {str(number): reason for number, reason in verified["rejected"].items()}
+        result["decision"] = "llm_analysis"
+        result["needs_llm"] = True
+        result["needs_llm_reason"] = "; ".join(f"PR #{number} {reason}"
+                                               for number, reason in verified["rejected"].items())
+        result["pr_numbers"] = []
+        logger.warning("Rejected PR numbers from child comments", extra=fields(rejected=result["rejected_prs"]))
+    return result
+
+
+def render_summary(result: Dict[str, Any]) -> str:
+    """Render a pipeline result as the '🤖 Completion Analysis' issue comment."""
+    lines = [
+        "## 🤖 Completion Analysis",
+        "",
+        f"**Summary**: {result['child_count']} child reports analyzed "
+        f"({', '.join(f'{count} {status}' for status, count in result['status_counts'].items() if count)})",
+        "",
+        "### Child Agent Reports:"
+    ]
+    for child in result["children"]:
+        label = f"Child {child['child_id']}" if child["child_id"] else "Child (no id)"
+        pr = f" - PR #{child['pr_number']}" if child["pr_number"] is not None else ""
+        lines.append(f"- {STATUS_ICONS[child['status']]} {label}: {child['status']}{pr}")
+    if result["needs_llm"]:
+        rationale = f"LLM analysis required: {result['needs_llm_reason']}."
+    else:
+        rationale = "Decided automatically from the child status reports; no LLM analysis was needed."
+    lines.extend([
+        "",
+        "### Decision:",
+        f"{result['decision']} (confidence {result['confidence']:.2f})",
+        "",
+        "### Rationale:",
+        rationale
+    ])
+    return "\n".join(lines)
+
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description='Count, classify and decide on child completions')
+    parser.add_argument('--comments', type=str,
+                        help="JSON string of issue comments, or '-' to stream them from stdin")
+    parser.add_argument('--comments-file', type=str,
+                        help="Path to a JSON file of issue comments ('-' for stdin)")
+    parser.add_argument('--issue-body', type=str, help='Issue body text')
+    parser.add_argument('--threshold', type=int, default=3, help='Completion threshold')
+    parser.add_argument('--issue-number', type=int,
+                        help='Parent issue; PR numbers to merge are verified against it through the API')
+    parser.add_argument('--repo', type=str, help='owner/name for --issue-number (default: $GITHUB_REPOSITORY)')
+    parser.add_argument('--confidence-threshold', type=float, default=DEFAULT_CONFIDENCE_THRESHOLD,
+                        help='Minimum confidence to decide without Claude')
+    parser.add_argument('--summary-file', type=str, help='Write the analysis comment markdown here')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAXSIZE,
+                        help='Classification results kept in the in-process cache')
+    parser.add_argument('--disk-cache', action='store_true',
+                        help='Also cache classifications under $RUNNER_TOOL_CACHE across runs')
+    parser.add_argument('--debug', action='store_true', help='Enable debug logging (per-child logs sampled)')
+    parser.add_argument('--trace', action='store_true', help='Enable trace logging')
+
+    args = parser.parse_args()
+
+    configure_logging(debug=args.debug, trace=args.trace)
+
+    repo = None
+    if args.issue_number is not None:
+        repo = args.repo or os.environ.get('GITHUB_REPOSITORY')
+        if not repo:
+            parser.error("--issue-number needs --repo or GITHUB_REPOSITORY=owner/name")
+
+    cache = enable_classification_cache(args.cache_size, resolve_disk_dir(args.disk_cache))
+
+    source = args.comments_file
+    if source is None and args.comments == '-':
+        source = '-'
+
+    try:
+        if source is not None:
+            stream = open_source(source)
+            try:
+                result = run_completion_pipeline(iter_json_array(stream), args.issue_body,
+                                                 args.threshold, args.confidence_threshold)
+            finally:
+                if stream is not sys.stdin:
+                    stream.close()
+        else:
+            comments = json.loads(args.comments) if args.comments else []
+            result = run_completion_pipeline(comments, args.issue_body,
+                                             args.threshold, args.confidence_threshold)
+    except (json.JSONDecodeError, OSError) as e:
+        logger.error("Failed to parse comments JSON: %s", e)
+        print(json.dumps({
+            "error": f"Failed to parse comments JSON: {e}",
+            "threshold_met": False,
+            "decision": "wait",
+            "needs_llm": False
+        }))
+        return 1
+
+    if repo is not None and result["pr_numbers"]:
+        try:
+            with timed(logger, "verify_prs") as stage:
+                with GitHubClient.from_env() as client:
+                    verified = verify_pull_requests(client, repo, args.issue_number, result["pr_numbers"])
+                stage["rejected"] = len(verified["rejected"])
+        except GitHubAPIError as e:
+            logger.error("Failed to verify PRs: %s", e)
+            print(json.dumps({
+                "error": f"Failed to verify PRs: {e}",
+                "threshold_met": result["threshold_met"],
+                "decision": "llm_analysis",
+                "needs_llm": True
+            }))
+            return 1
+        apply_verification(result, verified)
+
+    if args.summary_file:
+        with open(args.summary_file, 'w', encoding='utf-8') as f:
+            f.write(render_summary(result))
+
+    result["classification_cache"] = cache.stats()
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,48 +6,417 @@ count_completions.py - Count child agent completion markers in GitHub issue comm
 import sys
 import argparse
 import json
+import os
 import re
 import logging
-from typing import Dict, Any, Optional
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+from github_client import GitHubAPIError, GitHubClient
+from io_utils import iter_json_array, open_source
+from log_utils import configure_logging, fields, item_tracer, timed
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+# Records in flight per worker process in batch mode
+BATCH_WINDOW_PER_WORKER = 8
+
+# Comments per page when fetching from the REST API (GitHub's maximum)
+COMMENTS_PAGE_SIZE = 100
+
+# Child completion marker; any whitespace between the emoji and 'Child'
+CHILD_MARKER_RE = re.compile(r'🤖\s*Child')
+
+# Child id right after the marker: "🤖 Child C1", "🤖 Child: child-3", "🤖 Child #2"
+CHILD_ID_RE = re.compile(r'🤖\s*Child\s*[:#-]?\s*(?i:C|child-?)?(?P<number>\d+)\b')
+
+# PR reference in a child marker comment: "PR #12" or a .../pull/12 link
+PR_NUMBER_RE = re.compile(r'(?:\bPR\s*#|/pull/)(?P<number>\d+)', re.IGNORECASE)
+
+# Expected-count rules in priority order: when several match, the first rule
+# in this list wins. Each rule captures its count in a group named after it.
+EXPECTED_COUNT_RULES = [
+    ('expected_children', r'expected\s+children:\s*(?P<expected_children>\d+)'),
+    ('child_count', r'child\s+count:\s*(?P<child_count>\d+)'),
+    ('child_agents', r'(?P<child_agents>\d+)\s+child\s+agents?'),
+    ('tasks_in_child', r'(?P<tasks_in_child>\d+)\s+tasks?\s+in\s+child'),
+    ('these_tasks_in_child', r'these\s+(?P<these_tasks_in_child>\w+)\s+tasks?\s+in\s+child'),
+    ('parallel', r'(?P<parallel>\d+)\s+(?:different|parallel)\s+.*\s+in\s+parallel'),
+    ('execute_these_tasks', r'Execute\s+these\s+(?P<execute_these_tasks>\w+)\s+tasks?'),
+    ('different_items', r'(?P<different_items>\d+)\s+different\s+\w+'),
+    ('evaluate_different', r'Evaluate\s+(?P<evaluate_different>\d+)\s+different'),
+]
+EXPECTED_COUNT_PRIORITY = {name: index for index, (name, _) in enumerate(EXPECTED_COUNT_RULES)}
+
+# One pass over the text: the outer lookaheads make every match zero-width so
+# overlapping rule hits are all seen, and the leading character class (the
+# first characters of every rule) skips positions where no rule can start.
+EXPECTED_COUNT_RE = re.compile(
+    r'(?=[ect\d])(?=' + '|'.join(pattern for _, pattern in EXPECTED_COUNT_RULES) + ')',
+    re.IGNORECASE
+)
+
+# Hidden marker carrying the incremental counting cursor between router
+# runs; it is kept in the issue's status comment
+CURSOR_MARKER_NAME = 'gitai-completion-cursor'
+CURSOR_MARKER_RE = re.compile(r'<!--\s*' + CURSOR_MARKER_NAME + r':\s*(.*?)\s*-->')
+CURSOR_CHILD_ID_RE = re.compile(r'C\d+')
+STATUS_MARKER = "<!-- gitai-status-comment -->"
+ANALYSIS_MARKER = "🤖 Completion Analysis"
+
+
+def fetch_issue_comments(client: GitHubClient, repo: str, issue_number: int,
+                         stats: Optional[Dict[str, Any]] = None,
+                         since: Optional[str] = None) -> Iterator[Any]:
+    """
+    Stream an issue's comments from the REST API, pages fetched concurrently.
+
+    Comments arrive in page order, so they can be counted while later pages
+    are still downloading; closing the iterator stops further page requests.
+
+    Args:
+        client: GitHub client
+        repo: owner/name
+        issue_number: Issue number
+        stats: Optional dict updated with "pages" and "fetched" page counts
+        since: Only comments updated at or after this ISO 8601 timestamp
+
+    Returns:
+        Iterator over the comments
+    """
+    params: Dict[str, Any] = {"per_page": COMMENTS_PAGE_SIZE}
+    if since:
+        params["since"] = since
+    return client.paginate_concurrent(f"repos/{repo}/issues/{issue_number}/comments", params, stats=stats)
+
 
-def count_child_markers(comments: list) -> int:
+def count_child_markers(comments: Iterable[Any], limit: Optional[int] = None) -> int:
     """
     Count the number of comments containing the '🤖 Child' marker.
 
     Args:
-        comments: List of GitHub issue comments
+        comments: GitHub issue comments; any iterable works, so a stream
+            from iter_json_array is counted while it is still being read
+        limit: Stop reading comments once this many markers are found
 
     Returns:
-        Number of comments with child markers
+        Number of comments with child markers (at most limit)
     """
     if not comments:
         logger.debug("No comments provided")
         return 0
 
     count = 0
-    logger.debug(f"Processing {len(comments)} comments")
+    search = CHILD_MARKER_RE.search
+    tracer = item_tracer(logger)
     for comment in comments:
         if isinstance(comment, dict) and 'body' in comment:
             body = comment['body']
-            # Check for the child marker with flexible spacing
-            if '🤖' in body and 'Child' in body:
-                # More flexible matching for variations
-                if '🤖 Child' in body or '🤖  Child' in body or '🤖Child' in body:
-                    count += 1
-                    logger.debug(f"Found child marker in comment: {body[:50]}...")
-
-    logger.info(f"Found {count} child markers in comments")
+            # Same check as has_child_marker, inlined for the hot loop
+            if '🤖' in body and 'Child' in body and ('🤖 Child' in body or search(body)):
+                count += 1
+                if tracer:
+                    tracer.log("Found child marker in comment: %.50s...", body)
+                if limit is not None and count >= limit:
+                    logger.debug("Reached %d child markers; not reading further comments", limit)
+                    break
+
+    logger.info("Found %d child markers in comments", count)
     return count
 
 
+def has_child_marker(body: str) -> bool:
+    """Check whether a comment body contains the '🤖 Child' marker."""
+    # Substring checks are cheaper than a regex call in CPython, so they act as
+    # a pre-filter and catch the common spelling; the regex decides the rest
+    if '🤖' in body and 'Child' in body:
+        return '🤖 Child' in body or CHILD_MARKER_RE.search(body) is not None
+    return False
+
+
+@dataclass
+class ChildCompletionIndex:
+    """Child completion markers indexed by child id"""
+    children: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    duplicates: Dict[str, int] = field(default_factory=dict)
+    anonymous_markers: int = 0
+    marker_count: int = 0
+    anonymous: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def unique_count(self) -> int:
+        """Distinct completed children; markers without an id count individually."""
+        return len(self.children) + self.anonymous_markers
+
+    def child_ids(self) -> List[str]:
+        """Child ids in numeric order (C1, C2, ..., C10)."""
+        return sorted(self.children, key=lambda child_id: int(child_id[1:]))
+
+
+def parse_child_marker(body: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse the child id and PR number out of a child marker comment.
+
+    Args:
+        body: Comment body text
+
+    Returns:
+        Dict with child_id (e.g. 'C1', or None if absent) and pr_number
+        (or None), or None if the body has no child marker
+    """
+    if not has_child_marker(body):
+        return None
+
+    id_match = CHILD_ID_RE.search(body)
+    pr_match = PR_NUMBER_RE.search(body)
+    return {
+        "child_id": f"C{int(id_match.group('number'))}" if id_match else None,
+        "pr_number": int(pr_match.group('number')) if pr_match else None
+    }
+
+
+def index_child_markers(comments: Iterable[Any], keep_bodies: bool = False) -> ChildCompletionIndex:
+    """
+    Index child markers by child id so repeated reports count once.
+
+    A child that posts progress twice, or a retried child, shows up in
+    duplicates instead of inflating the count. The latest comment for each
+    child (by comment id, else by position) is kept.
+
+    Args:
+        comments: GitHub issue comments (any iterable)
+        keep_bodies: Keep each child's latest comment body under "body", and
+            collect markers without an id in the anonymous list
+
+    Returns:
+        ChildCompletionIndex with unique children, duplicates and anonymous markers
+    """
+    index = ChildCompletionIndex()
+    tracer = item_tracer(logger)
+
+    for comment in comments:
+        if not isinstance(comment, dict) or not comment.get('body'):
+            continue
+        marker = parse_child_marker(comment['body'])
+        if marker is None:
+            continue
+
+        index.marker_count += 1
+        child_id = marker["child_id"]
+        entry = {
+            "comment_id": comment.get('id'),
+            "pr_number": marker["pr_number"],
+            "created_at": comment.get('created_at')
+        }
+        if keep_bodies:
+            entry["body"] = comment['body']
+
+        if child_id is None:
+            index.anonymous_markers += 1
+            if keep_bodies:
+                index.anonymous.append(entry)
+            if tracer:
+                tracer.log("Child marker without an id in comment %s", comment.get('id'))
+            continue
+
+        previous = index.children.get(child_id)
+        if previous is None:
+            index.children[child_id] = entry
+            continue
+
+        index.duplicates[child_id] = index.duplicates.get(child_id, 0) + 1
+        if tracer:
+            tracer.log("Duplicate marker for child %s in comment %s", child_id, comment.get('id'))
+        if (previous["comment_id"] is None or entry["comment_id"] is None
+                or entry["comment_id"] >= previous["comment_id"]):
+            # Keep the PR number from an earlier report if the latest omits it
+            if entry["pr_number"] is None:
+                entry["pr_number"] = previous["pr_number"]
+            index.children[child_id] = entry
+
+    logger.info("Indexed %d child markers: %d unique children, %d duplicates, %d without id",
+                index.marker_count, len(index.children), sum(index.duplicates.values()),
+                index.anonymous_markers)
+    return index
+
+
+def parse_cursor_marker(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse a hidden completion cursor marker from comment text.
+
+    The marker is an HTML comment such as
+    ``<!-- gitai-completion-cursor: last_id=123 since=2024-01-01T00:00:00Z count=3 children=C1,C2 anonymous=1 analysis=0 -->``
+    so it lives in GitHub itself rather than in a state file.
+
+    Args:
+        text: Text that may contain a cursor marker
+
+    Returns:
+        Cursor dict (see advance_cursor), or None if absent or malformed
+    """
+    if not text:
+        return None
+
+    match = CURSOR_MARKER_RE.search(text)
+    if not match:
+        logger.debug("No completion cursor marker found")
+        return None
+
+    values = dict(re.findall(r'(\w+)=(\S*)', match.group(1)))
+    children = [child_id for child_id in values.get("children", "").split(",") if child_id]
+    try:
+        if not all(CURSOR_CHILD_ID_RE.fullmatch(child_id) for child_id in children):
+            raise ValueError(f"bad child ids: {children}")
+        cursor = {
+            "last_id": int(values["last_id"]) if values.get("last_id") else None,
+            "since": values.get("since") or None,
+            "count": int(values.get("count", 0)),
+            "children": children,
+            "anonymous": int(values.get("anonymous", 0)),
+            "analysis": values.get("analysis") == "1",
+        }
+    except ValueError:
+        logger.warning("Ignoring malformed completion cursor: %s", match.group(0))
+        return None
+
+    logger.debug("Parsed completion cursor: %s", cursor)
+    return cursor
+
+
+def format_cursor_marker(cursor: Dict[str, Any]) -> str:
+    """Render a cursor dict as a hidden marker for a GitHub comment."""
+    parts = []
+    if cursor.get("last_id") is not None:
+        parts.append(f"last_id={cursor['last_id']}")
+    if cursor.get("since"):
+        parts.append(f"since={cursor['since']}")
+    parts.append(f"count={cursor['count']}")
+    parts.append(f"children={','.join(cursor.get('children', []))}")
+    parts.append(f"anonymous={cursor.get('anonymous', 0)}")
+    parts.append(f"analysis={1 if cursor.get('analysis') else 0}")
+    return f"<!-- {CURSOR_MARKER_NAME}: {' '.join(parts)} -->"
+
+
+def advance_cursor(comments: Iterable[Any], cursor: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Count child markers incrementally, scanning only comments after a cursor.
+
+    GitHub comment ids increase monotonically, so comments with an id at or
+    below the cursor's last_id were already counted and are skipped without
+    looking at their bodies. The comments API's ``since`` parameter filters
+    on updated_at, so the cursor's since is the newest updated_at seen: every
+    comment created after this scan is returned by a ``?since=`` listing,
+    along with older comments that were edited (which the id check skips).
+
+    Args:
+        comments: GitHub issue comments (any iterable), e.g. a ``?since=`` listing
+        cursor: Cursor from a previous run, or None to scan from the start
+
+    Returns:
+        Updated cursor with last_id, since, count (every marker), children
+        (child ids seen), anonymous (markers without an id), analysis (a
+        completion analysis comment was seen) and new_count
+    """
+    cursor = cursor or {}
+    last_id = cursor.get("last_id")
+    since = cursor.get("since")
+    count = cursor.get("count", 0)
+    children = set(cursor.get("children", []))
+    anonymous = cursor.get("anonymous", 0)
+    analysis = bool(cursor.get("analysis"))
+    new_count = 0
+    scanned = 0
+    tracer = item_tracer(logger)
+
+    for comment in comments:
+        if not isinstance(comment, dict):
+            continue
+        updated_at = comment.get('updated_at') or comment.get('created_at')
+        if updated_at and (since is None or updated_at > since):
+            since = updated_at
+        comment_id = comment.get('id')
+        if cursor.get("last_id") is not None and (not isinstance(comment_id, int)
+                                                  or comment_id <= cursor["last_id"]):
+            continue
+
+        scanned += 1
+        if isinstance(comment_id, int) and (last_id is None or comment_id > last_id):
+            last_id = comment_id
+        body = comment.get('body')
+        if not body:
+            continue
+        if ANALYSIS_MARKER in body:
+            analysis = True
+        marker = parse_child_marker(body)
+        if marker is None:
+            continue
+        new_count += 1
+        if marker["child_id"] is None:
+            anonymous += 1
+        else:
+            children.add(marker["child_id"])
+        if tracer:
+            tracer.log("Found child marker in new comment %s", comment_id)
+
+    new_cursor = {
+        "last_id": last_id,
+        "since": since,
+        "count": count + new_count,
+        "children": sorted(children, key=lambda child_id: int(child_id[1:])),
+        "anonymous": anonymous,
+        "analysis": analysis,
+        "new_count": new_count
+    }
+    logger.info("Scanned %d new comments, found %d new child markers (total %d)",
+                scanned, new_count, new_cursor['count'])
+    return new_cursor
+
+
+def cursor_child_count(cursor: Dict[str, Any], dedupe: bool = False) -> int:
+    """Child count of a cursor; with dedupe each child id counts once."""
+    if dedupe:
+        return len(cursor["children"]) + cursor["anonymous"]
+    return cursor["count"]
+
+
+def find_status_comment(client: GitHubClient, repo: str, issue_number: int) -> Optional[Dict[str, Any]]:
+    """
+    The issue's status comment, looked up on the first page of comments.
+
+    The status comment is created when the issue is first routed, so it is
+    on the first page; if it is not, the cursor is simply not persisted.
+    """
+    page = client.get_json(f"repos/{repo}/issues/{issue_number}/comments", {"per_page": COMMENTS_PAGE_SIZE})
+    for comment in page or []:
+        if isinstance(comment, dict) and STATUS_MARKER in (comment.get('body') or ''):
+            return comment
+    return None
+
+
+def save_cursor_marker(client: GitHubClient, repo: str, comment_id: int, marker: str) -> bool:
+    """
+    Write a cursor marker into the status comment, replacing the old one.
+
+    The body is fetched again right before the PATCH, so a status update
+    made while the comments were being counted is not overwritten.
+
+    Returns:
+        True if the comment was updated, False if it already had the marker
+    """
+    path = f"repos/{repo}/issues/comments/{comment_id}"
+    current = (client.get_json(path) or {}).get('body') or ''
+    if CURSOR_MARKER_RE.search(current):
+        body = CURSOR_MARKER_RE.sub(lambda match: marker, current, count=1)
+    else:
+        body = f"{current}\n{marker}"
+    if body == current:
+        return False
+    client.request("PATCH", path, json_body={"body": body})
+    return True
+
+
 def word_to_number(word: str) -> Optional[int]:
     """Convert word numbers to integers."""
     word_map = {
@@ -58,6 +427,52 @@ def word_to_number(word: str) -> Optional[int]:
     return word_map.get(word.lower())
 
 
+def match_expected_count(issue_body: str) -> Optional[Tuple[int, str]]:
+    """
+    Find the expected child count and the rule that produced it.
+
+    Scans the text once with EXPECTED_COUNT_RE, keeping the leftmost hit of
+    each rule, then applies the rules in priority order. A rule whose hit is
+    not a usable number (e.g. "these many tasks in child") is skipped.
+
+    Args:
+        issue_body: GitHub issue body text
+
+    Returns:
+        Tuple of (count, rule name) if found, None otherwise
+    """
+    if not issue_body:
+        return None
+
+    first_hits: Dict[str, str] = {}
+    for match in EXPECTED_COUNT_RE.finditer(issue_body):
+        rule = match.lastgroup
+        if rule not in first_hits:
+            first_hits[rule] = match.group(rule)
+            # Nothing can outrank the first rule, so stop scanning early
+            if EXPECTED_COUNT_PRIORITY[rule] == 0:
+                break
+
+    for rule, _ in EXPECTED_COUNT_RULES:
+        count_str = first_hits.get(rule)
+        if count_str is None:
+            continue
+        # Try to parse as integer first
+        try:
+            count = int(count_str)
+        except ValueError:
+            # Try to convert word to number
+            count = word_to_number(count_str)
+            if count is None:
+                continue
+
+        # Only return non-negative numbers
+        if count >= 0:
+            return count, rule
+
+    return None
+
+
 def extract_expected_count(issue_body: str) -> Optional[int]:
     """
     Extract the expected child count from the parent issue body.
@@ -78,100 +493,332 @@ def extract_expected_count(issue_body: str) -> Optional[int]:
         logger.debug("No issue body provided")
         return None
 
-    logger.debug(f"Extracting expected count from issue body: {issue_body[:100]}...")
-
-    # Patterns to search for (case-insensitive)
-    patterns = [
-        r'expected\s+children:\s*(\d+)',
-        r'child\s+count:\s*(\d+)',
-        r'(\d+)\s+child\s+agents?',
-        r'(\d+)\s+tasks?\s+in\s+child',
-        r'these\s+(\w+)\s+tasks?\s+in\s+child',  # Captures word numbers
-        r'(\d+)\s+(?:different|parallel)\s+.*\s+in\s+parallel',
-        r'Execute\s+these\s+(\w+)\s+tasks?',  # Captures word numbers
-        r'(\d+)\s+different\s+\w+',
-        r'Evaluate\s+(\d+)\s+different',  # For "Evaluate 2 different"
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, issue_body, re.IGNORECASE)
-        if match:
-            count_str = match.group(1)
-            # Try to parse as integer first
-            try:
-                count = int(count_str)
-            except ValueError:
-                # Try to convert word to number
-                count = word_to_number(count_str)
-                if count is None:
-                    continue
-
-            # Only return non-negative numbers
-            if count >= 0:
-                logger.info(f"Extracted expected count: {count} using pattern: {pattern}")
-                return count
-
-    logger.debug("No expected count found in issue body")
-    return None
+    logger.debug("Extracting expected count from issue body: %.100s...", issue_body)
 
+    match = match_expected_count(issue_body)
+    if match is None:
+        logger.debug("No expected count found in issue body")
+        return None
 
-def main():
-    """Main entry point for the script."""
-    parser = argparse.ArgumentParser(description='Count child agent completion markers')
-    parser.add_argument('--comments', type=str, help='JSON string of issue comments')
-    parser.add_argument('--issue-body', type=str, help='Issue body text')
-    parser.add_argument('--threshold', type=int, default=3, help='Completion threshold')
-    parser.add_argument('--debug', action='store_true', help='Enable debug logging')
+    count, rule = match
+    logger.info("Extracted expected count: %d using rule: %s", count, rule)
+    return count
 
-    args = parser.parse_args()
 
-    # Set debug level if requested
-    if args.debug:
-        logger.setLevel(logging.DEBUG)
-        logging.getLogger().setLevel(logging.DEBUG)
+def evaluate_completion(comments: Iterable[Any],
+                        issue_body: Optional[str] = None,
+                        threshold: int = 3,
+                        dedupe: bool = False,
+                        cursor: Optional[Dict[str, Any]] = None,
+                        stop_early: bool = False) -> Dict[str, Any]:
+    """
+    Count child markers for one issue and decide whether the threshold is met.
 
-    # Parse comments JSON
-    comments = []
-    if args.comments:
-        try:
-            comments = json.loads(args.comments)
-            logger.debug(f"Successfully parsed {len(comments)} comments")
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse comments JSON: {e}")
-            print(json.dumps({
-                "error": f"Failed to parse comments JSON: {e}",
-                "child_count": 0,
-                "expected_count": None,
-                "threshold_met": False
-            }))
-            return 1
-
-    # Count child markers
-    child_count = count_child_markers(comments)
+    Args:
+        comments: GitHub issue comments (any iterable)
+        issue_body: Parent issue body used to extract the expected count
+        threshold: Completion threshold
+        dedupe: Count each child id once (see index_child_markers)
+        cursor: Cursor from a previous run (see advance_cursor); enables
+            incremental mode, also with dedupe
+        stop_early: Stop reading comments once the threshold or expected
+            count is met; child_count is then capped at count_limit
 
+    Returns:
+        Result dictionary as printed by the CLI
+    """
     # Extract expected count from issue body
     expected_count = None
-    if args.issue_body:
-        expected_count = extract_expected_count(args.issue_body)
+    expected_rule = None
+    if issue_body:
+        with timed(logger, "expected_count", logging.DEBUG) as stage:
+            match = match_expected_count(issue_body)
+            if match is not None:
+                expected_count, expected_rule = match
+                stage["rule"] = expected_rule
+                logger.info("Extracted expected count: %d using rule: %s", expected_count, expected_rule)
+
+    count_limit = None
+    if stop_early:
+        if dedupe or cursor is not None:
+            raise ValueError("stop_early only applies to plain counting")
+        count_limit = threshold if expected_count is None else min(threshold, expected_count)
+
+    child_index = None
+    new_cursor = None
+    with timed(logger, "count_markers", logging.DEBUG) as stage:
+        if dedupe and cursor is None:
+            child_index = index_child_markers(comments)
+            child_count = child_index.unique_count
+        elif cursor is not None:
+            new_cursor = advance_cursor(comments, cursor)
+            child_count = cursor_child_count(new_cursor, dedupe)
+        else:
+            child_count = count_child_markers(comments, count_limit)
+        stage["child_count"] = child_count
 
     # Check if threshold is met
-    threshold_met = child_count >= args.threshold
-    logger.info(f"Checking threshold: {child_count} >= {args.threshold} = {threshold_met}")
+    threshold_met = child_count >= threshold
+    logger.info("Checking threshold: %d >= %d = %s", child_count, threshold, threshold_met)
 
     # If we have an expected count, also check against that
     if expected_count is not None:
         expected_met = child_count >= expected_count
-        logger.info(f"Checking expected: {child_count} >= {expected_count} = {expected_met}")
+        logger.info("Checking expected: %d >= %d = %s", child_count, expected_count, expected_met)
         threshold_met = threshold_met or expected_met
 
     result = {
         "child_count": child_count,
         "expected_count": expected_count,
+        "expected_rule": expected_rule,
         "threshold_met": threshold_met,
-        "threshold": args.threshold
+        "threshold": threshold
     }
 
-    logger.info(f"Final result: child_count={child_count}, threshold_met={threshold_met}")
+    if child_index is not None:
+        result["marker_count"] = child_index.marker_count
+        result["unique_children"] = child_index.child_ids()
+        result["duplicates"] = child_index.duplicates
+        result["anonymous_markers"] = child_index.anonymous_markers
+        result["children"] = {child_id: child_index.children[child_id]
+                              for child_id in child_index.child_ids()}
+
+    if count_limit is not None:
+        result["count_limit"] = count_limit
+
+    if new_cursor is not None:
+        result["new_count"] = new_cursor.pop("new_count")
+        result["analysis_exists"] = new_cursor["analysis"]
+        result["cursor"] = new_cursor
+        result["cursor_marker"] = format_cursor_marker(new_cursor)
+
+    logger.info("Final result", extra=fields(child_count=child_count, threshold_met=threshold_met))
+    return result
+
+
+def evaluate_batch_record(record: Any, threshold: int = 3, dedupe: bool = False) -> Dict[str, Any]:
+    """
+    Evaluate one batch record of the form {issue_number, issue_body, comments}.
+
+    A record may override the threshold with its own "threshold" key. Bad
+    records produce an error result instead of raising, so one malformed
+    issue does not stop a backfill.
+    """
+    if not isinstance(record, dict):
+        return {"issue_number": None, "error": "Batch record must be a JSON object"}
+
+    issue_number = record.get("issue_number")
+    comments = record.get("comments") or []
+    if not isinstance(comments, list):
+        return {"issue_number": issue_number, "error": "comments must be a JSON array"}
+
+    result = evaluate_completion(
+        comments,
+        issue_body=record.get("issue_body"),
+        threshold=record.get("threshold", threshold),
+        dedupe=dedupe
+    )
+    return {"issue_number": issue_number, **result}
+
+
+def _evaluate_batch_line(line_number: int, line: str, threshold: int, dedupe: bool) -> Dict[str, Any]:
+    """Decode and evaluate one JSONL line (module level so process pools can pickle it)."""
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        return {"issue_number": None, "line": line_number, "error": f"Failed to parse batch record: {e}"}
+    return evaluate_batch_record(record, threshold, dedupe)
+
+
+def iter_batch_results(lines: Iterable[str],
+                       threshold: int = 3,
+                       dedupe: bool = False,
+                       workers: int = 1) -> Iterator[Dict[str, Any]]:
+    """
+    Evaluate a JSONL stream of issue records, yielding results in input order.
+
+    With workers > 1 records are fanned out across a process pool. Only a
+    bounded window of records is in flight at once, so memory stays flat
+    however long the backlog is.
+
+    Args:
+        lines: JSONL lines, one {issue_number, issue_body, comments} record each
+        threshold: Default completion threshold
+        dedupe: Count each child id once
+        workers: Number of worker processes (1 evaluates in-process)
+
+    Yields:
+        One result dictionary per non-blank input line
+    """
+    records = ((number, line) for number, line in enumerate(lines, 1) if line.strip())
+
+    if workers <= 1:
+        for number, line in records:
+            yield _evaluate_batch_line(number, line, threshold, dedupe)
+        return
+
+    window = workers * BATCH_WINDOW_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: deque = deque()
+        for number, line in records:
+            pending.append(executor.submit(_evaluate_batch_line, number, line, threshold, dedupe))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def run_batch(source: str, threshold: int = 3, dedupe: bool = False, workers: int = 1) -> int:
+    """Run batch mode over a JSONL file ('-' for stdin), printing one result line per issue."""
+    failures = 0
+    processed = 0
+    try:
+        stream = open_source(source)
+    except OSError as e:
+        logger.error("Failed to open batch input: %s", e)
+        print(json.dumps({"error": f"Failed to open batch input: {e}"}))
+        return 1
+
+    try:
+        with timed(logger, "batch", workers=workers) as stage:
+            for result in iter_batch_results(stream, threshold, dedupe, workers):
+                processed += 1
+                if "error" in result:
+                    failures += 1
+                    logger.error("Batch record failed: %s", result['error'])
+                print(json.dumps(result), flush=True)
+            stage["issues"] = processed
+            stage["failed"] = failures
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    return 1 if failures else 0
+
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description='Count child agent completion markers')
+    parser.add_argument('--comments', type=str,
+                        help="JSON string of issue comments, or '-' to stream them from stdin")
+    parser.add_argument('--comments-file', type=str,
+                        help="Path to a JSON file of issue comments ('-' for stdin)")
+    parser.add_argument('--fetch-issue', type=int,
+                        help='Fetch the comments of this issue from the REST API (GH_TOKEN/GITHUB_TOKEN)')
+    parser.add_argument('--repo', type=str, help='owner/name for --fetch-issue (default: $GITHUB_REPOSITORY)')
+    parser.add_argument('--http-cache', action='store_true',
+                        help='With --fetch-issue, revalidate against responses cached under $RUNNER_TOOL_CACHE')
+    parser.add_argument('--stop-early', action='store_true',
+                        help='Stop reading comments once the threshold or expected count is met')
+    parser.add_argument('--issue-body', type=str, help='Issue body text')
+    parser.add_argument('--threshold', type=int, default=3, help='Completion threshold')
+    parser.add_argument('--cursor', type=str,
+                        help='Text containing a hidden completion cursor marker (enables incremental mode)')
+    parser.add_argument('--persist-cursor', action='store_true',
+                        help='With --fetch-issue, resume from the cursor in the status comment, fetch only '
+                             'comments updated since, and write the new cursor back')
+    parser.add_argument('--dedupe', action='store_true',
+                        help='Count each child id once and report duplicates')
+    parser.add_argument('--batch', type=str,
+                        help="JSONL file of {issue_number, issue_body, comments} records ('-' for stdin)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes for --batch (default: evaluate in-process)')
+    parser.add_argument('--debug', action='store_true', help='Enable debug logging (per-comment logs sampled)')
+    parser.add_argument('--trace', action='store_true', help='Enable trace logging (every per-comment log)')
+
+    args = parser.parse_args()
+
+    configure_logging(debug=args.debug, trace=args.trace)
+
+    if args.batch is not None:
+        return run_batch(args.batch, args.threshold, args.dedupe, args.workers)
+
+    if args.persist_cursor and args.fetch_issue is None:
+        parser.error("--persist-cursor needs --fetch-issue")
+    if args.persist_cursor and args.cursor is not None:
+        parser.error("--persist-cursor reads the cursor from the status comment; drop --cursor")
+
+    # Incremental mode resumes from a cursor (an empty one when the marker is absent)
+    cursor = None
+    if args.cursor is not None:
+        cursor = parse_cursor_marker(args.cursor) or {}
+    elif args.persist_cursor:
+        cursor = {}
+
+    if args.stop_early and (cursor is not None or args.dedupe):
+        parser.error("--stop-early cannot be combined with --dedupe or incremental mode")
+
+    repo = None
+    if args.fetch_issue is not None:
+        repo = args.repo or os.environ.get('GITHUB_REPOSITORY')
+        if not repo:
+            parser.error("--fetch-issue needs --repo or GITHUB_REPOSITORY=owner/name")
+
+    # Work out where the comments come from; file and stdin input are
+    # streamed so large paginated payloads never pass through argv
+    source = args.comments_file
+    if source is None and args.comments == '-':
+        source = '-'
+
+    # Parse comments JSON and evaluate the issue
+    try:
+        if repo is not None:
+            stats: Dict[str, Any] = {}
+            with GitHubClient.from_env(http_cache=args.http_cache) as client:
+                status_comment = None
+                if args.persist_cursor:
+                    status_comment = find_status_comment(client, repo, args.fetch_issue)
+                    if status_comment is not None:
+                        cursor = parse_cursor_marker(status_comment.get('body')) or {}
+                    else:
+                        logger.info("No status comment on the first page; the cursor will not be saved")
+                since = cursor.get("since") if cursor else None
+                comments = fetch_issue_comments(client, repo, args.fetch_issue, stats, since)
+                try:
+                    result = evaluate_completion(comments, args.issue_body, args.threshold,
+                                                 args.dedupe, cursor, args.stop_early)
+                finally:
+                    comments.close()
+                if args.persist_cursor:
+                    result["cursor_persisted"] = status_comment is not None
+                    if status_comment is not None:
+                        save_cursor_marker(client, repo, status_comment['id'], result["cursor_marker"])
+            result["pages_fetched"] = stats.get("fetched", 0)
+            result["pages_total"] = stats.get("pages", 0)
+        elif source is not None:
+            stream = open_source(source)
+            try:
+                result = evaluate_completion(iter_json_array(stream), args.issue_body,
+                                             args.threshold, args.dedupe, cursor, args.stop_early)
+            finally:
+                if stream is not sys.stdin:
+                    stream.close()
+        else:
+            comments = []
+            if args.comments:
+                comments = json.loads(args.comments)
+                logger.debug("Successfully parsed %d comments", len(comments))
+            result = evaluate_completion(comments, args.issue_body, args.threshold, args.dedupe,
+                                         cursor, args.stop_early)
+    except GitHubAPIError as e:
+        logger.error("Failed to fetch comments: %s", e)
+        print(json.dumps({
+            "error": f"Failed to fetch comments: {e}",
+            "child_count": 0,
+            "expected_count": None,
+            "threshold_met": False
+        }))
+        return 1
+    except (json.JSONDecodeError, OSError) as e:
+        logger.error("Failed to parse comments JSON: %s", e)
+        print(json.dumps({
+            "error": f"Failed to parse comments JSON: {e}",
+            "child_count": 0,
+            "expected_count": None,
+            "threshold_met": False
+        }))
+        return 1
+
     print(json.dumps(result))
     return 0
 
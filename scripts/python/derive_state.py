@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+derive_state.py - Derive issue state from one branch, PR and issue snapshot
+
+derive_state.sh ran gh and git several times per issue. Here the snapshot is
+built once: remote refs from a single `git for-each-ref` call (made by bash;
+Python never runs git or gh), plus the repository's pull requests and issues
+from JSON files or one set of API pages. NO_PARENT_BRANCH / SINGLE_TASK /
+CHILDREN_* states for any number of issues are then derived in memory.
+"""
+
+import sys
+import argparse
+import json
+import logging
+import os
+from collections import Counter, defaultdict
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from branch_index import BranchIndex, parent_branch
+from github_client import GitHubAPIError, GitHubClient, normalize_pull_request
+from io_utils import read_json_items, read_lines
+from log_utils import configure_logging, timed
+
+logger = logging.getLogger(__name__)
+
+STATE_ISSUE_CLOSED = "ISSUE_CLOSED"
+STATE_ISSUE_NOT_FOUND = "ISSUE_NOT_FOUND"
+STATE_NO_PARENT_BRANCH = "NO_PARENT_BRANCH"
+STATE_SINGLE_TASK = "SINGLE_TASK"
+STATE_CHILDREN_SPAWNING = "CHILDREN_SPAWNING"
+STATE_CHILDREN_RUNNING = "CHILDREN_RUNNING"
+STATE_CHILDREN_COMPLETE = "CHILDREN_COMPLETE"
+
+# Files the stateless architecture forbids
+STATE_FILE_NAMES = ("STATE.json",)
+STATE_FILE_SUFFIX = ".state"
+
+API_PAGE_SIZE = 100
+
+
+class Snapshot:
+    """
+    Branches, pull requests and issues captured once, indexed for lookups.
+
+    Args:
+        refs: Remote refs (anything that is not a gitaiteams branch is ignored)
+        pull_requests: Pull requests from gh or the REST API
+        issues: Issues from gh or the REST API; None skips the issue check
+    """
+
+    def __init__(self, refs: Iterable[str], pull_requests: Iterable[Dict[str, Any]],
+                 issues: Optional[Iterable[Dict[str, Any]]] = None):
+        self.branches = BranchIndex(refs)
+
+        self.pr_states: Dict[str, Counter] = defaultdict(Counter)
+        for pr in pull_requests:
+            pr = normalize_pull_request(pr)
+            if pr["base"]:
+                self.pr_states[pr["base"]][pr["state"]] += 1
+
+        self.issue_states: Optional[Dict[int, str]] = None
+        if issues is not None:
+            self.issue_states = {}
+            for issue in issues:
+                # The REST issues endpoint lists pull requests too
+                if "pull_request" in issue or issue.get("number") is None:
+                    continue
+                self.issue_states[int(issue["number"])] = str(issue.get("state", "")).upper()
+
+    def issue_numbers(self) -> List[int]:
+        """Issues with a parent or child branch."""
+        return self.branches.issue_numbers()
+
+    def derive(self, issue_number: int) -> Dict[str, Any]:
+        """
+        Derive the state of one issue.
+
+        Args:
+            issue_number: Issue number
+
+        Returns:
+            Dict with the state, branch and PR counts and any constitution
+            violations for the issue
+        """
+        branch = parent_branch(issue_number)
+        child_count = self.branches.child_count(issue_number)
+        parent_exists = self.branches.has_parent(issue_number)
+        prs = self.pr_states.get(branch, Counter())
+        open_prs = prs["OPEN"]
+        merged_prs = prs["MERGED"]
+
+        issue_state = None
+        if self.issue_states is not None:
+            issue_state = self.issue_states.get(issue_number)
+
+        if self.issue_states is not None and issue_state is None:
+            state = STATE_ISSUE_NOT_FOUND
+        elif issue_state == "CLOSED":
+            state = STATE_ISSUE_CLOSED
+        elif not parent_exists:
+            state = STATE_NO_PARENT_BRANCH
+        elif child_count == 0:
+            state = STATE_SINGLE_TASK
+        elif merged_prs == child_count:
+            state = STATE_CHILDREN_COMPLETE
+        elif open_prs + merged_prs == child_count:
+            state = STATE_CHILDREN_RUNNING
+        else:
+            state = STATE_CHILDREN_SPAWNING
+
+        return {
+            "issue": issue_number,
+            "state": state,
+            "issue_state": issue_state,
+            "parent_branch": branch,
+            "parent_exists": parent_exists,
+            "children": child_count,
+            "child_branches": self.branches.child_branches(issue_number),
+            "open_prs": open_prs,
+            "merged_prs": merged_prs,
+            "pending_children": max(child_count - open_prs - merged_prs, 0),
+            "violations": self.branches.violations_for(issue_number),
+        }
+
+    def derive_many(self, issue_numbers: Iterable[int]) -> List[Dict[str, Any]]:
+        """Derive the state of several issues from this snapshot."""
+        return [self.derive(number) for number in issue_numbers]
+
+
+def find_state_files(root: str, limit: int = 5) -> List[str]:
+    """
+    Find files the stateless architecture forbids (STATE.json, *.state).
+
+    Args:
+        root: Directory to search (.git is skipped)
+        limit: Stop after this many files
+
+    Returns:
+        Paths of the files found
+    """
+    found = []
+    for directory, subdirs, files in os.walk(root):
+        if ".git" in subdirs:
+            subdirs.remove(".git")
+        for name in files:
+            if name in STATE_FILE_NAMES or name.endswith(STATE_FILE_SUFFIX):
+                found.append(os.path.join(directory, name))
+                if len(found) >= limit:
+                    return found
+    return found
+
+
+def fetch_snapshot_sources(repo: str, client: GitHubClient) -> Tuple[List[str], List[Any], List[Any]]:
+    """
+    Fetch gitaiteams refs, pull requests and issues from the REST API.
+
+    Args:
+        repo: owner/name
+        client: GitHub client; its pooled connection is reused across pages
+
+    Returns:
+        Tuple of (refs, pull requests, issues)
+    """
+    base = f"repos/{repo}"
+    page = {"per_page": API_PAGE_SIZE}
+    refs = [ref["ref"] for ref in client.paginate(f"{base}/git/matching-refs/heads/gitaiteams/")]
+    pull_requests = list(client.paginate(f"{base}/pulls", {"state": "all", **page}))
+    issues = list(client.paginate(f"{base}/issues", {"state": "all", **page}))
+    return refs, pull_requests, issues
+
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description='Derive issue state from a branch/PR/issue snapshot')
+    parser.add_argument('issues', type=int, nargs='*',
+                        help='Issue numbers (default: every issue with a gitaiteams branch)')
+    parser.add_argument('--refs', type=str,
+                        help="File of `git for-each-ref --format='%%(refname:short)'` output ('-' for stdin)")
+    parser.add_argument('--prs', type=str,
+                        help="JSON file of pull requests from `gh pr list --state all --json "
+                             "number,state,headRefName,baseRefName` ('-' for stdin)")
+    parser.add_argument('--issue-list', type=str,
+                        help="JSON file of issues from `gh issue list --state all --json number,state`")
+    parser.add_argument('--api', action='store_true',
+                        help='Fetch whatever was not given as a file from the REST API '
+                             '(GITHUB_REPOSITORY, GH_TOKEN/GITHUB_TOKEN)')
+    parser.add_argument('--http-cache', action='store_true',
+                        help='With --api, revalidate against responses cached under $RUNNER_TOOL_CACHE')
+    parser.add_argument('--state-files-root', type=str,
+                        help='Also check this directory for forbidden state files')
+    parser.add_argument('--debug', action='store_true', help='Enable debug logging')
+
+    args = parser.parse_args()
+
+    configure_logging(debug=args.debug)
+
+    if not args.api and (args.refs is None or args.prs is None):
+        parser.error("--refs and --prs are required unless --api is given")
+
+    try:
+        with timed(logger, "load_snapshot") as stage:
+            refs = read_lines(args.refs) if args.refs else None
+            pull_requests = read_json_items(args.prs) if args.prs else None
+            issues = read_json_items(args.issue_list) if args.issue_list else None
+            if args.api and (refs is None or pull_requests is None or issues is None):
+                repo = os.environ.get('GITHUB_REPOSITORY')
+                if not repo:
+                    parser.error("--api needs GITHUB_REPOSITORY=owner/name")
+                with GitHubClient.from_env(http_cache=args.http_cache) as client:
+                    api_refs, api_prs, api_issues = fetch_snapshot_sources(repo, client)
+                refs = api_refs if refs is None else refs
+                pull_requests = api_prs if pull_requests is None else pull_requests
+                issues = api_issues if issues is None else issues
+            snapshot = Snapshot(refs, pull_requests, issues)
+            stage["refs"] = len(refs)
+            stage["pull_requests"] = len(pull_requests)
+    except (json.JSONDecodeError, OSError, GitHubAPIError) as e:
+        logger.error("Failed to load snapshot: %s", e)
+        print(json.dumps({"error": f"Failed to load snapshot: {e}", "issues": []}))
+        return 1
+
+    with timed(logger, "derive_states") as stage:
+        numbers = args.issues or snapshot.issue_numbers()
+        result: Dict[str, Any] = {"issues": snapshot.derive_many(numbers)}
+        stage["issues"] = len(numbers)
+
+    if args.state_files_root:
+        state_files = find_state_files(args.state_files_root)
+        result["state_files"] = state_files
+        result["stateless"] = not state_files
+
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+disk_cache.py - Shared on-disk layout for the runner tool-cache caches
+
+http_cache.py and classification_cache.py keep entries in a directory under
+$RUNNER_TOOL_CACHE/gitai-teams so later runs on the same runner can reuse
+them. A DiskCacheDir holds what they have in common: one file per key,
+sharded by the first two hex digits, written to a temporary file and
+renamed so concurrent runs never read a partial entry, and least recently
+used eviction by mtime (a hit refreshes it).
+
+The directory total (bytes or entries) is scanned once per process and
+then kept as a running figure; only when it passes the bound is the
+directory rescanned and trimmed to DISK_LOW_WATER of the bound, so the next
+writes do not rescan straight away. These caches hold derived data that can
+be recomputed at any time; they are not workflow state and may be deleted
+freely.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_ROOT = 'gitai-teams'
+# Eviction trims a cache to this fraction of its bound
+DISK_LOW_WATER = 0.9
+
+
+def default_disk_dir(name: str) -> Optional[str]:
+    """
+    Directory for a named cache under the runner's tool cache.
+
+    Args:
+        name: Cache name, e.g. "http"
+
+    Returns:
+        The directory path, or None when RUNNER_TOOL_CACHE is not set
+    """
+    tool_cache = os.environ.get('RUNNER_TOOL_CACHE')
+    if not tool_cache:
+        return None
+    return os.path.join(tool_cache, CACHE_ROOT, name)
+
+
+def resolve_disk_dir(name: str, requested: bool, env_var: str) -> Optional[str]:
+    """
+    Directory for a named cache, if the script run opted in to it.
+
+    Args:
+        name: Cache name, e.g. "http"
+        requested: True when the script was asked for the disk cache
+        env_var: Environment variable that also opts in when set to 1
+
+    Returns:
+        The directory path, or None to keep the cache in memory only
+    """
+    if not requested and os.environ.get(env_var) != '1':
+        return None
+    disk_dir = default_disk_dir(name)
+    if disk_dir is None:
+        logger.warning("RUNNER_TOOL_CACHE is not set; %s disk cache disabled", name)
+    return disk_dir
+
+
+class DiskCacheDir:
+    """
+    A sharded cache directory with atomic writes and LRU eviction.
+
+    Safe to share between threads of one process; the running total and
+    eviction are guarded by a lock.
+
+    Args:
+        disk_dir: Cache directory
+        suffix: File name suffix of entries
+        limit: Evict least recently used entries beyond this total
+        by_bytes: Bound the total size in bytes rather than the entry count
+    """
+
+    def __init__(self, disk_dir: str, suffix: str, limit: int, by_bytes: bool = False):
+        self.disk_dir = disk_dir
+        self.suffix = suffix
+        self.limit = limit
+        self.by_bytes = by_bytes
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # Directory total: None until the first write scans the directory
+        self._total: Optional[int] = None
+
+    def path(self, key: str) -> str:
+        """File holding a key's entry."""
+        return os.path.join(self.disk_dir, key[:2], f"{key}{self.suffix}")
+
+    @staticmethod
+    def touch(path: str) -> None:
+        """Mark an entry as used for LRU eviction."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def write(self, key: str, data: bytes) -> bool:
+        """
+        Store a key's entry atomically, evicting if the bound is passed.
+
+        Write errors are logged and ignored; the cache is an optimization.
+
+        Returns:
+            True when the entry was written
+        """
+        path = self.path(key)
+        try:
+            replaced = os.path.getsize(path)
+            existed = True
+        except OSError:
+            replaced = 0
+            existed = False
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.debug("Could not write cache entry %s: %s", path, e)
+            return False
+
+        with self._lock:
+            if self._total is None:
+                self._total = self._scan()[1]
+            elif self.by_bytes:
+                self._total += len(data) - replaced
+            elif not existed:
+                self._total += 1
+            if self._total > self.limit:
+                self._evict()
+        return True
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries once the total passes the
+        limit, down to DISK_LOW_WATER of it.
+
+        The directory is rescanned, so entries written by other runs are
+        counted too.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            return self._evict()
+
+    def _evict(self) -> int:
+        entries, total = self._scan()
+        removed = 0
+        if total > self.limit:
+            entries.sort()
+            target = int(self.limit * DISK_LOW_WATER)
+            for _, weight, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.debug("Could not evict cache entry %s: %s", path, e)
+                    continue
+                total -= weight
+                removed += 1
+        self._total = total
+        self.evictions += removed
+        return removed
+
+    def _scan(self) -> Tuple[List[Tuple[float, int, str]], int]:
+        """(mtime, weight, path) of every entry and their total weight."""
+        entries = []
+        total = 0
+        try:
+            for shard in os.scandir(self.disk_dir):
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith(self.suffix):
+                        stat = entry.stat()
+                        weight = stat.st_size if self.by_bytes else 1
+                        entries.append((stat.st_mtime, weight, entry.path))
+                        total += weight
+        except OSError as e:
+            logger.debug("Could not scan cache directory %s: %s", self.disk_dir, e)
+        return entries, total
@@ -4,10 +4,43 @@ T025: Comparison table generator
 Creates formatted markdown tables for comparing items
 """
 
+import itertools
 import json
+import logging
+import math
+import shutil
 import sys
+import tempfile
+from array import array
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Set, TextIO, Tuple
+
+try:
+    import numpy
+except ImportError:  # optional; numeric columns fall back to array('d')
+    numpy = None
+
+from log_utils import configure_logging, timed
+from markdown_writer import MarkdownWriter, cell_text, escape_cell, truncate
+
+logger = logging.getLogger(__name__)
+
+
+# Placeholder for cells an item has no value for, displayed as MISSING_CELL;
+# an object rather than "-" so a genuine "-" value is not taken as missing
+MISSING = object()
+MISSING_CELL = "-"
+MAX_COLUMN_WIDTH = 50
+FLATTEN_MAX_DEPTH = 1
+_SCALAR_TYPES = frozenset((str, int, float, bool))
+
+# Column types detected by infer_column_type
+COLUMN_NUMERIC = "numeric"
+COLUMN_BOOL = "bool"
+COLUMN_LIST = "list"
+COLUMN_TEXT = "text"
+DIFF_SUFFIX = " Δ%"
 
 
 @dataclass
@@ -16,15 +49,67 @@ class ComparisonTable:
     headers: List[str]
     rows: List[List[str]]
     title: str
+    schema: Optional[Dict[str, str]] = None
+
 
+class ColumnarTable:
+    """
+    Column store for flattened comparison items.
 
-def generate_comparison_table(data: List[Dict[str, Any]], title: str = "Comparison") -> ComparisonTable:
+    Each header is interned once and mapped to a column index; every column
+    holds one raw value per row, with MISSING where an item has no value for
+    that header. Values are formatted column by column when rows are built.
+    """
+    __slots__ = ('header_index', 'columns', 'row_count')
+
+    def __init__(self):
+        self.header_index: Dict[str, int] = {}
+        self.columns: List[List[Any]] = []
+        self.row_count = 0
+
+    def add_row(self, flat_item: Dict[str, Any]) -> None:
+        """Append one flattened item, adding columns for new headers."""
+        header_index = self.header_index
+        columns = self.columns
+        row_count = self.row_count
+        for key, value in flat_item.items():
+            index = header_index.get(key)
+            if index is None:
+                index = header_index[sys.intern(key) if type(key) is str else key] = len(columns)
+                columns.append([MISSING] * row_count)
+            columns[index].append(value)
+
+        row_count += 1
+        if len(flat_item) < len(columns):
+            for column in columns:
+                if len(column) < row_count:
+                    column.append(MISSING)
+        self.row_count = row_count
+
+    def sorted_headers(self) -> List[str]:
+        """Headers in display (sorted) order."""
+        return sorted(self.header_index)
+
+    def rows(self, headers: List[str]) -> List[List[str]]:
+        """Formatted rows with cells in the given header order."""
+        formatted = [[format_cell(value) for value in self.columns[self.header_index[h]]] for h in headers]
+        if not formatted:
+            return [[] for _ in range(self.row_count)]
+        return [list(row) for row in zip(*formatted)]
+
+
+def generate_comparison_table(data: List[Dict[str, Any]], title: str = "Comparison",
+                              max_depth: Optional[int] = FLATTEN_MAX_DEPTH) -> ComparisonTable:
     """
     Generate a comparison table from data.
 
+    Each item is flattened once into a ColumnarTable, whose columns are
+    then formatted into the returned rows.
+
     Args:
         data: List of dictionaries to compare
         title: Title for the comparison table
+        max_depth: Levels of nested dicts to flatten (see flatten_dict)
 
     Returns:
         ComparisonTable object
@@ -36,40 +121,260 @@ def generate_comparison_table(data: List[Dict[str, Any]], title: str = "Comparis
             title=title
         )
 
-    # Extract all unique keys for headers
-    all_keys = set()
+    columns = ColumnarTable()
     for item in data:
-        all_keys.update(flatten_dict(item).keys())
+        columns.add_row(flatten_dict(item, max_depth=max_depth))
 
     # Sort headers for consistency
-    headers = sorted(all_keys)
-
-    # Build rows
-    rows = []
-    for item in data:
-        flat_item = flatten_dict(item)
-        row = []
-        for header in headers:
-            value = flat_item.get(header, "-")
-            # Format value for display
-            if isinstance(value, list):
-                value = ", ".join(str(v) for v in value[:3])
-                if len(value) > 3:
-                    value += "..."
-            elif isinstance(value, dict):
-                value = json.dumps(value)[:50] + "..." if len(json.dumps(value)) > 50 else json.dumps(value)
-            elif len(str(value)) > 100:
-                value = str(value)[:97] + "..."
-            row.append(str(value))
-        rows.append(row)
+    headers = columns.sorted_headers()
 
     return ComparisonTable(
         headers=headers,
-        rows=rows,
+        rows=columns.rows(headers),
         title=title
     )
 
 
+def format_cell(value: Any) -> str:
+    """
+    Format a flattened value for display in a comparison table.
+
+    Each value is stringified (or JSON encoded) once.
+    """
+    if value is MISSING:
+        return MISSING_CELL
+    if isinstance(value, list):
+        text = ", ".join(str(v) for v in value[:3])
+        if len(text) > 3:
+            text += "..."
+        return text
+    if isinstance(value, dict):
+        return truncate(json.dumps(value), 50)
+    text = cell_text(value)
+    if len(text) > 100:
+        return text[:97] + "..."
+    return text
+
+
+def is_missing(value: Any) -> bool:
+    """Whether a typed cell has no value: absent, or a JSON null."""
+    return value is MISSING or value is None
+
+
+def infer_column_type(values: Iterable[Any]) -> str:
+    """
+    Detect the type of a comparison column from its flattened values.
+
+    Missing and null cells are ignored; columns mixing types, or with no
+    values at all, are text.
+
+    Returns:
+        One of COLUMN_NUMERIC, COLUMN_BOOL, COLUMN_LIST or COLUMN_TEXT
+    """
+    types = {type(value) for value in values if not is_missing(value)}
+    if not types or str in types:
+        return COLUMN_TEXT
+    if types == {bool}:
+        return COLUMN_BOOL
+    if types <= {int, float}:
+        return COLUMN_NUMERIC
+    if types == {list}:
+        return COLUMN_LIST
+    return COLUMN_TEXT
+
+
+def typed_cell_text(value: Any) -> str:
+    """Display text for a typed cell; matches format_cell on the joined value."""
+    if isinstance(value, list):
+        joined = join_scalar_list(value)
+        value = str(value) if joined is None else joined
+    return format_cell(value)
+
+
+def column_floats(values: List[Any]) -> Any:
+    """
+    A numeric column as float64 values, NaN for missing and null cells.
+
+    Returns:
+        A numpy float64 array when numpy is installed, else array('d')
+    """
+    floats = array('d', [math.nan if is_missing(value) else float(value) for value in values])
+    if numpy is not None:
+        return numpy.frombuffer(floats, dtype=numpy.float64)
+    return floats
+
+
+def best_value_rows(floats: Any, lower_is_better: bool = False) -> Set[int]:
+    """
+    Rows holding the best value of a numeric column.
+
+    Args:
+        floats: Column from column_floats
+        lower_is_better: Best is the minimum instead of the maximum
+
+    Returns:
+        Row indexes; empty when the column has no values or they all tie
+    """
+    if numpy is not None:
+        present = floats[~numpy.isnan(floats)]
+        if not len(present) or present.min() == present.max():
+            return set()
+        best = present.min() if lower_is_better else present.max()
+        return set(numpy.flatnonzero(floats == best).tolist())
+
+    present = [value for value in floats if value == value]
+    if not present or min(present) == max(present):
+        return set()
+    best = min(present) if lower_is_better else max(present)
+    return {index for index, value in enumerate(floats) if value == best}
+
+
+def relative_differences(floats: Any, baseline: int) -> List[float]:
+    """
+    Percentage difference of each value from the baseline row's value.
+
+    Args:
+        floats: Column from column_floats
+        baseline: Row index of the baseline
+
+    Returns:
+        One float per row; NaN where there is no value or the baseline
+        is missing or zero
+    """
+    base = floats[baseline]
+    if base == 0 or base != base:
+        return [math.nan] * len(floats)
+    if numpy is not None:
+        return ((floats - base) / abs(base) * 100.0).tolist()
+    scale = 100.0 / abs(base)
+    return [(value - base) * scale for value in floats]
+
+
+def format_relative(difference: float) -> str:
+    """Display text for a relative difference, e.g. +12.5%"""
+    if math.isnan(difference):
+        return MISSING_CELL
+    return f"{difference:+.1f}%"
+
+
+def sort_permutation(values: List[Any], column_type: str, descending: bool = False) -> List[int]:
+    """
+    Row order that sorts a column, keeping ties in input order.
+
+    Numbers sort numerically and everything else by display text; missing
+    and null cells always come last.
+
+    Args:
+        values: Column values
+        column_type: Type from infer_column_type
+        descending: Sort from largest to smallest
+
+    Returns:
+        Row indexes in sorted order
+    """
+    if column_type == COLUMN_NUMERIC:
+        floats = column_floats(values)
+        if numpy is not None:
+            # NaN (missing) sorts last in both directions
+            return numpy.argsort(-floats if descending else floats, kind='stable').tolist()
+        keys = list(floats)
+    else:
+        keys = [typed_cell_text(value).casefold() for value in values]
+
+    present = [i for i, value in enumerate(values) if not is_missing(value)]
+    missing = [i for i, value in enumerate(values) if is_missing(value)]
+    present.sort(key=keys.__getitem__, reverse=descending)
+    return present + missing
+
+
+def generate_typed_comparison(data: List[Dict[str, Any]], title: str = "Comparison",
+                              sort_by: Optional[str] = None, descending: bool = False,
+                              highlight_best: bool = False, lower_is_better: Iterable[str] = (),
+                              diff_baseline: Optional[int] = None,
+                              max_depth: Optional[int] = FLATTEN_MAX_DEPTH) -> ComparisonTable:
+    """
+    Generate a comparison table with typed columns.
+
+    Column types are inferred once from the flattened values, which are
+    kept as numbers, booleans and lists rather than strings. Numeric
+    columns can then be sorted, have their best value highlighted in bold
+    and get a relative-difference column against a baseline row.
+
+    Args:
+        data: List of dictionaries to compare
+        title: Title for the comparison table
+        sort_by: Column to sort rows by
+        descending: Sort from largest to smallest
+        highlight_best: Bold the best value in each numeric column
+        lower_is_better: Numeric columns where the minimum is best
+        diff_baseline: Row index (in data) to compute relative differences against
+        max_depth: Levels of nested dicts to flatten (see flatten_dict)
+
+    Returns:
+        ComparisonTable whose schema maps each input column to its type
+
+    Raises:
+        ValueError: If sort_by is not a column or diff_baseline is not a row
+    """
+    if not data:
+        return ComparisonTable(headers=[], rows=[], title=title, schema={})
+
+    columns = ColumnarTable()
+    for item in data:
+        columns.add_row(flatten_dict(item, max_depth=max_depth, join_lists=False))
+
+    headers = columns.sorted_headers()
+    values = {header: columns.columns[columns.header_index[header]] for header in headers}
+    schema = {header: infer_column_type(values[header]) for header in headers}
+
+    if sort_by is not None and sort_by not in schema:
+        raise ValueError(f"Unknown sort column: {sort_by}")
+    if diff_baseline is not None and not 0 <= diff_baseline < columns.row_count:
+        raise ValueError(f"Baseline row {diff_baseline} is out of range")
+    lower = set(lower_is_better)
+
+    # Format each column once, in input row order
+    out_headers = []
+    out_columns = []
+    for header in headers:
+        column = values[header]
+        texts = [typed_cell_text(value) for value in column]
+        out_headers.append(header)
+        out_columns.append(texts)
+
+        if schema[header] != COLUMN_NUMERIC or not (highlight_best or diff_baseline is not None):
+            continue
+        floats = column_floats(column)
+        if highlight_best:
+            for index in best_value_rows(floats, header in lower):
+                texts[index] = f"**{texts[index]}**"
+        if diff_baseline is not None:
+            out_headers.append(header + DIFF_SUFFIX)
+            out_columns.append([format_relative(d) for d in relative_differences(floats, diff_baseline)])
+
+    if sort_by is not None:
+        order = sort_permutation(values[sort_by], schema[sort_by], descending)
+    else:
+        order = range(columns.row_count)
+
+    return ComparisonTable(
+        headers=out_headers,
+        rows=[[texts[index] for texts in out_columns] for index in order],
+        title=title,
+        schema=schema
+    )
+
+
+def numeric_headers(table: ComparisonTable) -> Set[str]:
+    """Headers of a typed table that hold numbers (numeric and difference columns)."""
+    schema = table.schema or {}
+    return {
+        header for header in table.headers
+        if schema.get(header) == COLUMN_NUMERIC
+        or (header.endswith(DIFF_SUFFIX) and schema.get(header[:-len(DIFF_SUFFIX)]) == COLUMN_NUMERIC)
+    }
+
+
 def extract_comparison_data(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Extract comparison data from child results.
@@ -98,7 +403,7 @@ def extract_comparison_data(results: List[Dict[str, Any]]) -> List[Dict[str, Any
                     if isinstance(value, dict) and "score" in value:
                         entry[key] = value["score"]
                         if "note" in value:
-                            entry[f"{key}_note"] = value["note"]
+                            entry[key_path(key, "note")] = value["note"]
                     else:
                         entry[key] = value
         else:
@@ -112,13 +417,15 @@ def extract_comparison_data(results: List[Dict[str, Any]]) -> List[Dict[str, Any
     return comparison_data
 
 
-def format_as_markdown_table(headers: List[str], rows: List[List[str]]) -> str:
+def format_as_markdown_table(headers: List[str], rows: List[List[str]],
+                             right_align: Iterable[str] = ()) -> str:
     """
     Format headers and rows as a markdown table.
 
     Args:
         headers: List of column headers
         rows: List of row data
+        right_align: Headers of columns to right-align (e.g. numeric_headers)
 
     Returns:
         Formatted markdown table string
@@ -126,86 +433,235 @@ def format_as_markdown_table(headers: List[str], rows: List[List[str]]) -> str:
     if not headers:
         return ""
 
-    lines = []
-
     # Escape pipe characters in content
-    safe_headers = [h.replace("|", "\\|") for h in headers]
-    safe_rows = []
-    for row in rows:
-        safe_row = [cell.replace("|", "\\|") for cell in row]
-        safe_rows.append(safe_row)
+    safe_headers = [escape_cell(h) for h in headers]
+    safe_rows = [[escape_cell(cell) for cell in row] for row in rows]
 
     # Calculate column widths for better formatting
     col_widths = [len(h) for h in safe_headers]
+    columns = len(col_widths)
     for row in safe_rows:
-        for i, cell in enumerate(row):
-            if i < len(col_widths):
-                col_widths[i] = max(col_widths[i], len(cell))
+        for i, cell in enumerate(row[:columns]):
+            if len(cell) > col_widths[i]:
+                col_widths[i] = len(cell)
 
     # Limit column width to prevent extremely wide tables
-    max_width = 50
-    col_widths = [min(w, max_width) for w in col_widths]
+    col_widths = [min(w, MAX_COLUMN_WIDTH) for w in col_widths]
+
+    right_align = set(right_align)
+    right = {i for i, h in enumerate(headers) if h in right_align} or None
 
-    # Build header row
-    header_row = "| " + " | ".join(
-        h.ljust(w)[:w] for h, w in zip(safe_headers, col_widths)
-    ) + " |"
-    lines.append(header_row)
+    writer = MarkdownWriter()
 
-    # Build separator row
-    separator = "|" + "|".join("-" * (w + 2) for w in col_widths) + "|"
-    lines.append(separator)
+    # Header row and separator
+    writer.table_row(h.ljust(w)[:w] for h, w in zip(safe_headers, col_widths))
+    writer.table_separator(col_widths, right or ())
 
-    # Build data rows
+    # Data rows
     for row in safe_rows:
-        padded_row = []
-        for i, cell in enumerate(row):
-            if i < len(col_widths):
-                # Truncate if necessary
-                if len(cell) > col_widths[i]:
-                    cell = cell[:col_widths[i]-3] + "..."
-                padded_row.append(cell.ljust(col_widths[i]))
-            else:
-                padded_row.append(cell)
+        writer.table_row(pad_cells(row, col_widths, right))
+
+    return writer.getvalue()
+
+
+def pad_cells(row: List[str], col_widths: List[int], right: Optional[Set[int]] = None) -> List[str]:
+    """Pad (or truncate with an ellipsis) escaped cells to their column widths."""
+    padded_row = []
+    for i, cell in enumerate(row):
+        if i < len(col_widths):
+            width = col_widths[i]
+            # Truncate if necessary
+            if len(cell) > width:
+                cell = cell[:width - 3] + "..."
+            padded_row.append(cell.rjust(width) if right and i in right else cell.ljust(width))
+        else:
+            padded_row.append(cell)
+    return padded_row
+
+
+def iter_jsonl_items(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    """
+    Yield flattened comparison rows from a JSONL stream, one item per line.
+
+    Child results (items with "framework" or "metrics") go through
+    extract_comparison_data one at a time. Blank lines are skipped.
 
-        row_str = "| " + " | ".join(padded_row) + " |"
-        lines.append(row_str)
+    Raises:
+        json.JSONDecodeError: If a line is not valid JSON
+        ValueError: If a line is not a JSON object
+    """
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        if not isinstance(item, dict):
+            raise ValueError(f"line {line_number}: expected a JSON object")
+        if "framework" in item or "metrics" in item:
+            item = extract_comparison_data([item])[0]
+        yield flatten_dict(item)
+
+
+def scan_columns(flat_items: Iterable[Dict[str, Any]],
+                 fixed_width: Optional[int] = None) -> Tuple[List[str], List[int]]:
+    """
+    Collect headers and column widths without keeping the rows.
+
+    Widths match format_as_markdown_table: the longest escaped cell (or
+    header) per column, capped at MAX_COLUMN_WIDTH.
+
+    Args:
+        flat_items: Flattened rows, e.g. from iter_jsonl_items
+        fixed_width: Use this width for every column instead of measuring
+
+    Returns:
+        Tuple of (sorted headers, column widths)
+    """
+    widths: Dict[str, int] = {}
+    counts: Dict[str, int] = {}
+    total = 0
+    for flat_item in flat_items:
+        total += 1
+        for key, value in flat_item.items():
+            counts[key] = counts.get(key, 0) + 1
+            if fixed_width is None:
+                width = len(escape_cell(format_cell(value)))
+                if width > widths.get(key, 0):
+                    widths[key] = width
+
+    headers = sorted(counts)
+    if fixed_width is not None:
+        return headers, [fixed_width] * len(headers)
+
+    col_widths = []
+    for header in headers:
+        width = max(len(escape_cell(header)), widths.get(header, 0))
+        if counts[header] < total:
+            # Rows without this column show MISSING_CELL
+            width = max(width, len(MISSING_CELL))
+        col_widths.append(min(width, MAX_COLUMN_WIDTH))
+    return headers, col_widths
+
+
+def stream_markdown_table(flat_items: Iterable[Dict[str, Any]], headers: List[str],
+                          col_widths: List[int], out: TextIO) -> int:
+    """
+    Write a markdown table row by row with precomputed column widths.
 
-    return "\n".join(lines)
+    Only one row is formatted at a time. Keys not in headers are left out.
 
+    Args:
+        flat_items: Flattened rows
+        headers: Column headers, e.g. from scan_columns
+        col_widths: Column widths, e.g. from scan_columns
+        out: Text stream to write to (no trailing newline)
 
-def flatten_dict(d: Dict[str, Any], parent_key: str = "", sep: str = "_") -> Dict[str, Any]:
+    Returns:
+        Number of data rows written
+    """
+    writer = MarkdownWriter(out)
+    writer.table_row(escape_cell(h).ljust(w)[:w] for h, w in zip(headers, col_widths))
+    writer.table_separator(col_widths)
+
+    rows = 0
+    for flat_item in flat_items:
+        get = flat_item.get
+        writer.table_row(pad_cells(
+            [escape_cell(format_cell(get(header, MISSING))) for header in headers],
+            col_widths
+        ))
+        rows += 1
+    return rows
+
+
+@lru_cache(maxsize=4096)
+def flattened_keys(parent_key: str, keys: Tuple, sep: str = "_") -> Tuple:
+    """
+    Flattened key paths for a dict's keys under parent_key.
+
+    Cached per (parent_key, keys) schema: child results mostly share their
+    keys, so each path string is built once and the same string objects are
+    reused for every row.
+
+    Args:
+        parent_key: Path of the enclosing dict ("" at the top level)
+        keys: The dict's keys, in order
+        sep: Separator between parent and child keys
+
+    Returns:
+        Tuple of key paths, one per key
+    """
+    if not parent_key:
+        return keys
+    return tuple(f"{parent_key}{sep}{k}" for k in keys)
+
+
+def key_path(parent_key: str, key: str, sep: str = "_") -> str:
+    """Flattened path of a single key, e.g. key_path("speed", "note") -> "speed_note"."""
+    return flattened_keys(parent_key, (key,), sep)[0]
+
+
+def join_scalar_list(values: List[Any]) -> Optional[str]:
+    """
+    Join a list of scalars into a comma-separated string.
+
+    Args:
+        values: List value to flatten
+
+    Returns:
+        The joined string, or None if the list holds non-scalar items
+    """
+    try:
+        # Fast path: lists of strings need no per-item checks
+        return ", ".join(values)
+    except TypeError:
+        pass
+    if all(map(_SCALAR_TYPES.__contains__, map(type, values))) or \
+            all(isinstance(item, (str, int, float)) for item in values):
+        return ", ".join(map(str, values))
+    return None
+
+
+def flatten_dict(d: Dict[str, Any], parent_key: str = "", sep: str = "_",
+                 max_depth: Optional[int] = FLATTEN_MAX_DEPTH, join_lists: bool = True) -> Dict[str, Any]:
     """
     Flatten nested dictionary.
 
+    Nested dicts are walked iteratively in key order. Dicts nested deeper
+    than max_depth are stringified, lists of scalars become comma-separated
+    strings and other lists are stringified.
+
     Args:
         d: Dictionary to flatten
-        parent_key: Parent key for nested items
+        parent_key: Parent key for nested items (counts as one level of nesting)
         sep: Separator between parent and child keys
+        max_depth: Levels of nested dicts to flatten, or None for no limit
+        join_lists: Join scalar lists into strings; False keeps them as lists
 
     Returns:
         Flattened dictionary
     """
-    items = []
-    for k, v in d.items():
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
-
-        if isinstance(v, dict):
-            # Don't flatten too deep
-            if parent_key:
-                items.append((new_key, str(v)))
+    flat: Dict[str, Any] = {}
+    stack = [(zip(flattened_keys(parent_key, tuple(d), sep), d.values()), 1 if parent_key else 0)]
+    while stack:
+        items, depth = stack[-1]
+        for key, value in items:
+            if isinstance(value, dict):
+                if max_depth is None or depth < max_depth:
+                    # Descend now; this level resumes once the child is done
+                    stack.append((zip(flattened_keys(key, tuple(value), sep), value.values()), depth + 1))
+                    break
+                flat[key] = str(value)
+            elif isinstance(value, list):
+                joined = join_scalar_list(value)
+                if joined is None:
+                    flat[key] = str(value)
+                else:
+                    flat[key] = joined if join_lists else value
             else:
-                items.extend(flatten_dict(v, new_key, sep=sep).items())
-        elif isinstance(v, list):
-            # Convert lists to comma-separated strings
-            if all(isinstance(item, (str, int, float)) for item in v):
-                items.append((new_key, ", ".join(str(item) for item in v)))
-            else:
-                items.append((new_key, str(v)))
+                flat[key] = value
         else:
-            items.append((new_key, v))
-
-    return dict(items)
+            stack.pop()
+    return flat
 
 
 def generate_pros_cons_table(data: List[Dict[str, Any]]) -> str:
@@ -242,22 +698,122 @@ def generate_pros_cons_table(data: List[Dict[str, Any]]) -> str:
     return format_as_markdown_table(headers, rows)
 
 
+def write_jsonl_comparison(stream: TextIO, out: TextIO, title: str = "Comparison",
+                           sample: Optional[int] = None, fixed_width: Optional[int] = None) -> int:
+    """
+    Write a comparison table for a JSONL stream of items without loading it.
+
+    By default the stream is read twice: once to collect headers and column
+    widths, then again to write rows, so it must be seekable. With sample,
+    headers and widths come from the first sample items and the stream is
+    read once; columns that first appear later are left out and longer
+    cells are truncated to the sampled widths.
+
+    Args:
+        stream: JSONL text stream, one comparison item per line
+        out: Text stream for the markdown output
+        title: Title for the comparison table
+        sample: Number of leading items used for headers and widths
+        fixed_width: Use this width for every column instead of measuring
+
+    Returns:
+        Number of data rows written
+    """
+    if sample is not None:
+        items = iter_jsonl_items(stream)
+        head = list(itertools.islice(items, sample))
+        headers, col_widths = scan_columns(head, fixed_width)
+        rows = itertools.chain(head, items)
+    else:
+        with timed(logger, "scan_columns") as stage:
+            headers, col_widths = scan_columns(iter_jsonl_items(stream), fixed_width)
+            stage["columns"] = len(headers)
+        stream.seek(0)
+        rows = iter_jsonl_items(stream)
+
+    out.write(f"## {title}\n\n")
+    if not headers:
+        out.write("No data to compare\n")
+        return 0
+
+    with timed(logger, "stream_table") as stage:
+        count = stream_markdown_table(rows, headers, col_widths, out)
+        stage["rows"] = count
+    out.write("\n")
+    return count
+
+
 def main():
     """Main entry point for CLI usage"""
-    if len(sys.argv) < 2:
-        print("Usage: python generate_comparison.py <data.json> [title]")
-        print("   or: python generate_comparison.py --stdin [title]")
+    args = sys.argv[1:]
+    options = {}
+    # Integer options and their minimum values
+    for option, minimum in (("--sample", 1), ("--fixed-width", 1), ("--diff", 0)):
+        if option in args:
+            index = args.index(option)
+            if index + 1 >= len(args) or not args[index + 1].isdigit() or int(args[index + 1]) < minimum:
+                print(f"{option} requires an integer >= {minimum}")
+                sys.exit(1)
+            options[option] = int(args[index + 1])
+            del args[index:index + 2]
+    for option in ("--sort", "--lower-is-better"):
+        if option in args:
+            index = args.index(option)
+            if index + 1 >= len(args):
+                print(f"{option} requires a column name")
+                sys.exit(1)
+            options[option] = args[index + 1]
+            del args[index:index + 2]
+    for flag in ("--desc", "--highlight"):
+        if flag in args:
+            options[flag] = True
+            args.remove(flag)
+    typed = any(option in options for option in ("--sort", "--desc", "--highlight", "--diff"))
+
+    if not args or (args[0] == "--jsonl" and len(args) < 2) or (args[0] == "--jsonl" and typed):
+        print("Usage: python generate_comparison.py <data.json> [title] [typed options]")
+        print("   or: python generate_comparison.py --stdin [title] [typed options]")
+        print("   or: python generate_comparison.py --jsonl <items.jsonl|-> [title] "
+              "[--sample N] [--fixed-width N]")
+        print("Typed options: [--sort COLUMN [--desc]] [--highlight [--lower-is-better COL,COL]] "
+              "[--diff BASELINE_ROW]")
         sys.exit(1)
 
+    # Quiet by default; GITAI_LOG_LEVEL/GITAI_TRACE enable stage timings on stderr
+    configure_logging(level=logging.WARNING)
+
+    if args[0] == "--jsonl":
+        # Rows are written as they are read; only one item is in memory at a time
+        title = args[2] if len(args) > 2 else "Comparison"
+        source = args[1]
+        sample = options.get("--sample")
+        if source == "-" and sample is None:
+            # stdin cannot be re-read, so spool it to a temporary file
+            stream = tempfile.TemporaryFile('w+', encoding='utf-8')
+            shutil.copyfileobj(sys.stdin, stream)
+            stream.seek(0)
+        elif source == "-":
+            stream = sys.stdin
+        else:
+            stream = open(source, 'r', encoding='utf-8')
+        try:
+            write_jsonl_comparison(stream, sys.stdout, title, sample=sample,
+                                   fixed_width=options.get("--fixed-width"))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        return
+
     # Get title if provided
-    title = sys.argv[2] if len(sys.argv) > 2 else "Comparison"
+    title = args[1] if len(args) > 1 else "Comparison"
 
     # Read input
-    if sys.argv[1] == "--stdin":
-        data = json.load(sys.stdin)
-    else:
-        with open(sys.argv[1], 'r') as f:
-            data = json.load(f)
+    with timed(logger, "load_data"):
+        if args[0] == "--stdin":
+            data = json.load(sys.stdin)
+        else:
+            with open(args[0], 'r') as f:
+                data = json.load(f)
 
     # Ensure data is a list
     if not isinstance(data, list):
@@ -268,13 +824,30 @@ def main():
         data = extract_comparison_data(data)
 
     # Generate comparison table
-    table = generate_comparison_table(data, title)
+    with timed(logger, "build_table", items=len(data)) as stage:
+        if typed:
+            lower = options.get("--lower-is-better")
+            try:
+                table = generate_typed_comparison(
+                    data, title,
+                    sort_by=options.get("--sort"),
+                    descending=options.get("--desc", False),
+                    highlight_best=options.get("--highlight", False),
+                    lower_is_better=lower.split(",") if lower else (),
+                    diff_baseline=options.get("--diff")
+                )
+            except ValueError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+        else:
+            table = generate_comparison_table(data, title)
+        stage["columns"] = len(table.headers)
 
     # Output the table
     print(f"## {table.title}")
     print()
     if table.headers and table.rows:
-        print(format_as_markdown_table(table.headers, table.rows))
+        print(format_as_markdown_table(table.headers, table.rows, numeric_headers(table)))
     else:
         print("No data to compare")
 
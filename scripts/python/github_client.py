@@ -0,0 +1,567 @@
+#!/usr/bin/env python3
+"""
+github_client.py - Pooled GitHub REST client for the orchestration scripts
+
+Each `gh` call from bash starts a process, authenticates and opens a new TLS
+connection. GitHubClient keeps a small pool of keep-alive http.client
+connections instead, and adds:
+
+- batching: batch() / gather() run many requests concurrently with asyncio,
+  bounded by the pool size
+- conditional requests: GET responses with an ETag or Last-Modified are
+  cached (in memory by default, on disk with http_cache.py) and revalidated
+  with If-None-Match / If-Modified-Since; a 304 is answered from the cache
+- rate-limit-aware backoff: 403/429 responses that signal a rate limit wait
+  for Retry-After or X-RateLimit-Reset, 5xx responses and dropped
+  connections retry with exponential backoff
+
+Only REST calls are made; git operations stay in bash (constitution).
+"""
+
+import sys
+import argparse
+import asyncio
+import http.client
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Union
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from http_cache import DiskResponseCache, resolve_disk_dir
+from log_utils import configure_logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = "https://api.github.com"
+DEFAULT_POOL_SIZE = 4
+DEFAULT_TIMEOUT = 30.0
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0
+MAX_BACKOFF = 60.0
+USER_AGENT = "gitai-teams-scripts"
+
+LINK_NEXT_RE = re.compile(r'<([^>]+)>;\s*rel="next"')
+LINK_LAST_RE = re.compile(r'<([^>]+)>;\s*rel="last"')
+
+# Methods that are safe to resend after a connection error
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "PUT", "DELETE", "OPTIONS"))
+
+# Errors meaning a kept-alive connection was closed by the server
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class GitHubAPIError(Exception):
+    """A request failed with an error status."""
+
+    def __init__(self, status: int, url: str, body: bytes):
+        self.status = status
+        self.url = url
+        self.body = body
+        message = body.decode('utf-8', 'replace')[:200]
+        super().__init__(f"{status} for {url}: {message}")
+
+
+@dataclass
+class Response:
+    """A REST response; header names are lowercase."""
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    url: str
+    from_cache: bool = False
+
+    def json(self) -> Any:
+        """Decoded JSON body (None when the body is empty)."""
+        return json.loads(self.body) if self.body else None
+
+    @property
+    def next_url(self) -> Optional[str]:
+        """URL of the next page from the Link header, if any."""
+        match = LINK_NEXT_RE.search(self.headers.get("link", ""))
+        return match.group(1) if match else None
+
+    @property
+    def last_page(self) -> Optional[int]:
+        """Page number of the Link header's rel="last" URL, if any."""
+        match = LINK_LAST_RE.search(self.headers.get("link", ""))
+        if not match:
+            return None
+        pages = parse_qs(urlsplit(match.group(1)).query).get("page")
+        return int(pages[0]) if pages and pages[0].isdigit() else None
+
+
+@dataclass
+class Request:
+    """One call for batch()/gather()."""
+    method: str
+    path: str
+    params: Optional[Dict[str, Any]] = None
+    json_body: Any = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class MemoryResponseCache:
+    """
+    In-process store of GET responses for conditional requests.
+
+    Any object with the same get/put/revalidated methods can be passed to
+    GitHubClient; get() must return something with status, headers and body,
+    or None, and revalidated() is called when a 304 confirms an entry.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Response] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[Response]:
+        with self._lock:
+            return self._entries.get(url)
+
+    def put(self, url: str, response: Response) -> None:
+        with self._lock:
+            self._entries[url] = response
+
+    def revalidated(self, url: str) -> None:
+        pass
+
+
+class ConnectionPool:
+    """
+    Keep-alive http.client connections to one host.
+
+    At most size connections are open at once; acquire() blocks until one
+    is free and hands out idle connections before opening new ones.
+    """
+
+    def __init__(self, base_url: str, size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_TIMEOUT):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {base_url}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.size = size
+        self.timeout = timeout
+        self.opened = 0
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def acquire(self) -> "tuple[http.client.HTTPConnection, bool]":
+        """
+        Take a connection.
+
+        Returns:
+            (connection, reused) where reused is True for a kept-alive one
+        """
+        self._slots.acquire()
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+            self.opened += 1
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout), False
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+
+    def release(self, connection: http.client.HTTPConnection, reusable: bool) -> None:
+        """Return a connection; closed unless it can be kept alive."""
+        if reusable:
+            with self._lock:
+                self._idle.append(connection)
+        else:
+            connection.close()
+        self._slots.release()
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+def normalize_pull_request(pr: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Common shape for `gh pr list --json` and REST API pull requests.
+
+    Returns:
+        Dict with number, state (OPEN, MERGED or CLOSED), head and base
+    """
+    if "headRefName" in pr:
+        return {
+            "number": pr.get("number"),
+            "state": str(pr.get("state", "")).upper(),
+            "head": pr.get("headRefName"),
+            "base": pr.get("baseRefName"),
+        }
+    state = "MERGED" if pr.get("merged_at") else str(pr.get("state", "")).upper()
+    return {
+        "number": pr.get("number"),
+        "state": state,
+        "head": (pr.get("head") or {}).get("ref"),
+        "base": (pr.get("base") or {}).get("ref"),
+    }
+
+
+class GitHubClient:
+    """
+    GitHub REST client over a keep-alive connection pool.
+
+    Args:
+        token: API token (None for unauthenticated requests)
+        api_url: API base URL
+        pool_size: Maximum concurrent connections (and batch concurrency)
+        cache: Response cache for conditional GETs (MemoryResponseCache
+            by default; None disables conditional requests)
+        max_retries: Retries for rate limits, 5xx and dropped connections
+        max_wait: Longest single rate-limit or backoff wait, in seconds
+        sleep: Sleep function (replaced in tests)
+    """
+
+    def __init__(self, token: Optional[str] = None, api_url: str = DEFAULT_API_URL,
+                 pool_size: int = DEFAULT_POOL_SIZE, cache: Any = "memory",
+                 max_retries: int = MAX_RETRIES, max_wait: float = MAX_BACKOFF,
+                 timeout: float = DEFAULT_TIMEOUT, sleep: Callable[[float], None] = time.sleep):
+        self.token = token
+        self.api_url = api_url.rstrip('/')
+        self.pool = ConnectionPool(self.api_url, pool_size, timeout)
+        self.cache = MemoryResponseCache() if cache == "memory" else cache
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self.rate_limit_remaining: Optional[int] = None
+        self.rate_limit_reset: Optional[int] = None
+        self.not_modified = 0
+        self._sleep = sleep
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def from_env(cls, http_cache: bool = False, **kwargs) -> "GitHubClient":
+        """
+        Client using GH_TOKEN/GITHUB_TOKEN and GITHUB_API_URL.
+
+        Args:
+            http_cache: Keep responses in the on-disk cache under
+                $RUNNER_TOOL_CACHE (GITAI_HTTP_DISK_CACHE=1 also opts in)
+            **kwargs: Other GitHubClient arguments
+        """
+        token = os.environ.get('GH_TOKEN') or os.environ.get('GITHUB_TOKEN')
+        api_url = os.environ.get('GITHUB_API_URL', DEFAULT_API_URL)
+        if "cache" not in kwargs:
+            disk_dir = resolve_disk_dir(http_cache)
+            if disk_dir is not None:
+                kwargs["cache"] = DiskResponseCache(disk_dir)
+        return cls(token=token, api_url=api_url, **kwargs)
+
+    def close(self) -> None:
+        """Close pooled connections and the batch executor."""
+        logger.debug("Closing GitHub client: %d responses revalidated with 304", self.not_modified)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.pool.close()
+
+    def __enter__(self) -> "GitHubClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def url(self, path: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Absolute URL for an API path (absolute URLs are kept as they are)."""
+        url = path if path.startswith(("http://", "https://")) else f"{self.api_url}/{path.lstrip('/')}"
+        if params:
+            url += ("&" if "?" in url else "?") + urlencode(params)
+        return url
+
+    def request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                json_body: Any = None, headers: Optional[Dict[str, str]] = None) -> Response:
+        """
+        Send one request, with conditional GETs, retries and rate-limit waits.
+
+        Args:
+            method: HTTP method
+            path: API path (e.g. "repos/o/r/issues") or absolute URL
+            params: Query parameters
+            json_body: JSON request body
+            headers: Extra request headers
+
+        Returns:
+            The Response (from_cache is True when a 304 was answered from the cache)
+
+        Raises:
+            GitHubAPIError: For error statuses once retries are used up
+        """
+        method = method.upper()
+        url = self.url(path, params)
+        parts = urlsplit(url)
+        if parts.hostname != self.pool.host or parts.port != self.pool.port:
+            raise ValueError(f"URL is not on {self.api_url}: {url}")
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+
+        request_headers = {
+            "Accept": "application/vnd.github+json",
+            "User-Agent": USER_AGENT,
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+        if self.token:
+            request_headers["Authorization"] = f"Bearer {self.token}"
+        body = None
+        if json_body is not None:
+            body = json.dumps(json_body).encode('utf-8')
+            request_headers["Content-Type"] = "application/json"
+        if headers:
+            request_headers.update(headers)
+
+        cached = self.cache.get(url) if method == "GET" and self.cache is not None else None
+        if cached is not None:
+            if "etag" in cached.headers:
+                request_headers["If-None-Match"] = cached.headers["etag"]
+            if "last-modified" in cached.headers:
+                request_headers["If-Modified-Since"] = cached.headers["last-modified"]
+
+        attempt = 0
+        while True:
+            try:
+                response = self._send(method, target, url, body, request_headers)
+            except (http.client.HTTPException, OSError) as e:
+                if attempt >= self.max_retries or not self._may_resend(method, e):
+                    raise
+                attempt += 1
+                delay = self._backoff(attempt)
+                logger.debug("%s %s failed (%s); retry %d in %.1fs", method, url, e, attempt, delay)
+                self._sleep(delay)
+                continue
+
+            self._track_rate_limit(response)
+
+            if response.status == 304 and cached is not None:
+                self.not_modified += 1
+                self.cache.revalidated(url)
+                return Response(cached.status, cached.headers, cached.body, url, from_cache=True)
+
+            delay = self._retry_delay(response, attempt)
+            if delay is not None and attempt < self.max_retries:
+                attempt += 1
+                logger.warning("%s %s returned %d; retry %d in %.1fs",
+                               method, url, response.status, attempt, delay)
+                self._sleep(delay)
+                continue
+
+            if response.status >= 400:
+                raise GitHubAPIError(response.status, url, response.body)
+
+            if method == "GET" and self.cache is not None and \
+                    ("etag" in response.headers or "last-modified" in response.headers):
+                self.cache.put(url, response)
+            return response
+
+    def _send(self, method: str, target: str, url: str, body: Optional[bytes],
+              headers: Dict[str, str]) -> Response:
+        connection, reused = self.pool.acquire()
+        reusable = False
+        try:
+            try:
+                connection.request(method, target, body=body, headers=headers)
+                raw = connection.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                # The server closed the idle connection; nothing was processed
+                connection.close()
+                connection.request(method, target, body=body, headers=headers)
+                raw = connection.getresponse()
+            data = raw.read()
+            reusable = not raw.will_close
+            return Response(raw.status, {k.lower(): v for k, v in raw.getheaders()}, data, url)
+        finally:
+            self.pool.release(connection, reusable)
+
+    @staticmethod
+    def _may_resend(method: str, error: Exception) -> bool:
+        return method in IDEMPOTENT_METHODS or isinstance(error, ConnectionRefusedError)
+
+    def _backoff(self, attempt: int) -> float:
+        return min(BACKOFF_BASE * 2 ** (attempt - 1), self.max_wait)
+
+    def _track_rate_limit(self, response: Response) -> None:
+        remaining = response.headers.get("x-ratelimit-remaining")
+        reset = response.headers.get("x-ratelimit-reset")
+        if remaining is not None and remaining.isdigit():
+            self.rate_limit_remaining = int(remaining)
+        if reset is not None and reset.isdigit():
+            self.rate_limit_reset = int(reset)
+
+    def _retry_delay(self, response: Response, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying, or None if the response is final."""
+        status = response.status
+        headers = response.headers
+        if status in (403, 429):
+            retry_after = headers.get("retry-after")
+            if retry_after is not None and retry_after.isdigit():
+                return min(float(retry_after), self.max_wait)
+            if headers.get("x-ratelimit-remaining") == "0":
+                reset = headers.get("x-ratelimit-reset", "")
+                wait = int(reset) - time.time() + 1 if reset.isdigit() else self._backoff(attempt + 1)
+                return min(max(wait, 0.0), self.max_wait)
+            if status == 429:
+                return self._backoff(attempt + 1)
+            return None
+        if status >= 500:
+            return self._backoff(attempt + 1)
+        return None
+
+    def get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """GET a path and decode its JSON body."""
+        return self.request("GET", path, params=params).json()
+
+    def paginate(self, path: str, params: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+        """
+        Yield items from every page of a list endpoint, following Link rel="next".
+
+        Args:
+            path: API path or URL
+            params: Query parameters for the first page (e.g. per_page)
+        """
+        url: Optional[str] = self.url(path, params)
+        while url:
+            response = self.request("GET", url)
+            yield from _page_items(response.json())
+            url = response.next_url
+
+    def paginate_concurrent(self, path: str, params: Optional[Dict[str, Any]] = None,
+                            window: Optional[int] = None,
+                            stats: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+        """
+        paginate(), fetching the remaining pages concurrently once the first
+        page's Link rel="last" gives the page count.
+
+        Items are yielded in page order as pages arrive, with at most window
+        pages requested ahead of the consumer. Closing the iterator early
+        (e.g. once the caller has seen enough) cancels the pages not yet sent.
+        Without a rel="last" link, pages are followed one by one.
+
+        Args:
+            path: API path (without a page parameter)
+            params: Query parameters (e.g. per_page)
+            window: Pages in flight (default: pool size)
+            stats: Optional dict updated with "pages" (total, when known) and
+                "fetched" (pages received)
+        """
+        stats = stats if stats is not None else {}
+        params = dict(params or {})
+        first = self.request("GET", path, params=params)
+        last = first.last_page
+        stats["pages"] = last or 1
+        stats["fetched"] = 1
+        yield from _page_items(first.json())
+
+        if last is None:
+            url = first.next_url
+            while url:
+                response = self.request("GET", url)
+                stats["fetched"] += 1
+                yield from _page_items(response.json())
+                url = response.next_url
+            return
+
+        window = window or self.pool.size
+        pending: deque = deque()
+        next_page = 2
+        with ThreadPoolExecutor(max_workers=window, thread_name_prefix="github-pages") as executor:
+            try:
+                while next_page <= last or pending:
+                    while next_page <= last and len(pending) < window:
+                        url = self.url(path, {**params, "page": next_page})
+                        pending.append(executor.submit(self.request, "GET", url))
+                        next_page += 1
+                    response = pending.popleft().result()
+                    stats["fetched"] += 1
+                    yield from _page_items(response.json())
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    async def arequest(self, method: str, path: str, **kwargs) -> Response:
+        """request() for asyncio callers; runs on the client's worker threads."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.pool.size,
+                                                thread_name_prefix="github-client")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: self.request(method, path, **kwargs))
+
+    async def gather(self, requests: Iterable[Request]) -> List[Union[Response, Exception]]:
+        """
+        Send requests concurrently (at most pool_size at a time).
+
+        Returns:
+            One Response or exception per request, in request order
+        """
+        return await asyncio.gather(
+            *(self.arequest(r.method, r.path, params=r.params, json_body=r.json_body, headers=r.headers)
+              for r in requests),
+            return_exceptions=True
+        )
+
+    def batch(self, requests: Iterable[Request]) -> List[Union[Response, Exception]]:
+        """Synchronous gather(), for callers without an event loop."""
+        return asyncio.run(self.gather(list(requests)))
+
+
+def _page_items(page: Any) -> List[Any]:
+    """Items of one page of a list endpoint."""
+    if isinstance(page, list):
+        return page
+    return [] if page is None else [page]
+
+
+def main():
+    """Main entry point: a minimal `gh api` replacement printing JSON."""
+    parser = argparse.ArgumentParser(description='Call the GitHub REST API over a pooled connection')
+    parser.add_argument('paths', nargs='+', help='API paths; several GET paths are fetched concurrently')
+    parser.add_argument('--method', '-X', default='GET', help='HTTP method (default: GET)')
+    parser.add_argument('--input', type=str, help="JSON request body file ('-' for stdin)")
+    parser.add_argument('--paginate', action='store_true', help='Follow Link headers and merge pages')
+    parser.add_argument('--http-cache', action='store_true',
+                        help='Revalidate against responses cached under $RUNNER_TOOL_CACHE')
+    parser.add_argument('--debug', action='store_true', help='Enable debug logging')
+    args = parser.parse_args()
+
+    configure_logging(debug=args.debug)
+
+    body = None
+    if args.input == '-':
+        body = json.load(sys.stdin)
+    elif args.input:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            body = json.load(f)
+
+    with GitHubClient.from_env(http_cache=args.http_cache) as client:
+        try:
+            if args.paginate:
+                results = [list(client.paginate_concurrent(path)) for path in args.paths]
+            elif len(args.paths) == 1:
+                results = [client.request(args.method, args.paths[0], json_body=body).json()]
+            else:
+                responses = client.batch(Request(args.method, path, json_body=body) for path in args.paths)
+                for response in responses:
+                    if isinstance(response, Exception):
+                        raise response
+                results = [response.json() for response in responses]
+        except (GitHubAPIError, http.client.HTTPException, OSError) as e:
+            logger.error("GitHub API request failed: %s", e)
+            print(json.dumps({"error": str(e)}))
+            return 1
+
+    print(json.dumps(results[0] if len(results) == 1 else results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
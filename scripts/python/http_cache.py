@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+http_cache.py - On-disk cache of GitHub REST responses for conditional requests
+
+The router and the completion analyzer read the same issue, comments and PR
+lists within seconds of each other. GitHubClient revalidates cached GETs with
+If-None-Match / If-Modified-Since; a 304 does not count against the hourly
+rate limit, and the body is served from here instead of being downloaded.
+
+A DiskResponseCache keeps one file per URL (keyed by sha256 of the URL)
+in a disk_cache.DiskCacheDir bounded by total size, holding the status,
+headers and body of the last 200 response. Entries are only ever served
+after the server confirms them with a 304.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Dict, NamedTuple, Optional
+
+import disk_cache
+from disk_cache import DiskCacheDir
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = "1"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DISK_CACHE_NAME = 'http'
+ENTRY_SUFFIX = '.http'
+
+
+class CachedResponse(NamedTuple):
+    """A stored response; header names are lowercase."""
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+
+def default_disk_dir() -> Optional[str]:
+    """The HTTP cache directory under the runner's tool cache, if set."""
+    return disk_cache.default_disk_dir(DISK_CACHE_NAME)
+
+
+def resolve_disk_dir(requested: bool) -> Optional[str]:
+    """
+    HTTP cache directory for a script run, if the disk cache is opted in.
+
+    Args:
+        requested: True when the script was asked for the disk cache
+            (GITAI_HTTP_DISK_CACHE=1 also opts in)
+
+    Returns:
+        The directory path, or None to keep responses in memory only
+    """
+    return disk_cache.resolve_disk_dir(DISK_CACHE_NAME, requested, 'GITAI_HTTP_DISK_CACHE')
+
+
+class DiskResponseCache:
+    """
+    Response cache for GitHubClient that persists across runs.
+
+    Each entry is a file holding one JSON metadata line (url, status,
+    headers) followed by the raw body, written atomically so concurrent runs
+    never read a partial entry. hits counts entries the server revalidated
+    with a 304, not entries merely read from disk.
+
+    Args:
+        disk_dir: Cache directory
+        max_bytes: Evict least recently used entries beyond this total size
+    """
+
+    def __init__(self, disk_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.disk_dir = disk_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.store = DiskCacheDir(disk_dir, ENTRY_SUFFIX, max_bytes, by_bytes=True)
+        # GitHubClient batches call in from worker threads
+        self._lock = threading.Lock()
+
+    @property
+    def evictions(self) -> int:
+        return self.store.evictions
+
+    def key(self, url: str) -> str:
+        """Hash identifying a URL's entry."""
+        return hashlib.sha256(f"{CACHE_VERSION}\0{url}".encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return self.store.path(key)
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """
+        Stored response for a URL.
+
+        Returns:
+            The CachedResponse, or None when there is no usable entry
+        """
+        path = self._path(self.key(url))
+        try:
+            with open(path, 'rb') as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+            if meta.get("url") != url:
+                raise ValueError("entry is for another URL")
+        except FileNotFoundError:
+            self._count_miss()
+            return None
+        except (OSError, ValueError, AttributeError) as e:
+            logger.debug("Ignoring unreadable HTTP cache entry %s: %s", path, e)
+            self._count_miss()
+            return None
+        return CachedResponse(meta["status"], meta["headers"], body)
+
+    def revalidated(self, url: str) -> None:
+        """Record that the server confirmed a URL's entry with a 304."""
+        with self._lock:
+            self.hits += 1
+        DiskCacheDir.touch(self._path(self.key(url)))
+
+    def put(self, url: str, response: Any) -> None:
+        """
+        Store a response (anything with status, headers and body).
+
+        Write errors are logged and ignored; the cache is an optimization.
+        """
+        meta = json.dumps({"url": url, "status": response.status, "headers": response.headers}).encode('utf-8')
+        if self.store.write(self.key(url), meta + b'\n' + response.body):
+            with self._lock:
+                self.stores += 1
+
+    def evict(self) -> int:
+        """Remove least recently used entries beyond max_bytes; returns the count removed."""
+        return self.store.evict()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for logs."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+            }
+
+    def _count_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
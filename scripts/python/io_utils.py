@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+io_utils.py - Shared readers for the JSON and line inputs the scripts take
+
+Every CLI reads its input from a file path or '-' for stdin: comment arrays,
+`gh api --paginate` listings, subtask lists and `git for-each-ref` output.
+These readers are shared so the scripts do not import each other for them.
+"""
+
+import sys
+import json
+from typing import Any, Iterator, List, TextIO
+
+# Read size used when streaming from a file or stdin
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Characters that can continue a JSON number
+NUMBER_CHARS = frozenset("0123456789.eE+-")
+
+
+def iter_json_array(stream: TextIO, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Incrementally decode the items of a JSON array from a text stream.
+
+    Only one chunk plus the item being decoded is held in memory. Several
+    arrays written back to back (as ``gh api --paginate`` does for list
+    endpoints) are treated as one continuous array.
+
+    Args:
+        stream: Text stream containing one or more JSON arrays
+        chunk_size: Number of characters to read at a time
+
+    Yields:
+        Each decoded array item, in order
+
+    Raises:
+        json.JSONDecodeError: If the stream is not a sequence of JSON arrays
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    in_array = False
+    expect_item = True
+    after_comma = False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    while True:
+        # Skip whitespace, refilling the buffer as needed
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos < len(buf) or not fill():
+                break
+
+        if pos >= len(buf):
+            if in_array:
+                raise json.JSONDecodeError("Unterminated JSON array", buf, pos)
+            return
+
+        char = buf[pos]
+        if not in_array:
+            if char != '[':
+                raise json.JSONDecodeError("Expected JSON array", buf, pos)
+            in_array = True
+            expect_item = True
+            after_comma = False
+            pos += 1
+        elif char == ']' and not after_comma:
+            in_array = False
+            pos += 1
+        elif char == ',' and not expect_item:
+            expect_item = True
+            after_comma = True
+            pos += 1
+        elif expect_item:
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # The item may continue in the next chunk
+                if fill():
+                    continue
+                raise
+            if (end == len(buf) or is_number_prefix(item, buf, end)) and fill():
+                # A trailing scalar such as a number may still be growing
+                continue
+            pos = end
+            expect_item = False
+            after_comma = False
+            yield item
+        else:
+            raise json.JSONDecodeError("Expected ',' or ']'", buf, pos)
+
+
+def is_number_prefix(item: Any, buf: str, end: int) -> bool:
+    """
+    Whether a number decoded up to end may be cut short by the buffer.
+
+    raw_decode stops a number at the first character it cannot take, so
+    "1." or "2e" at the end of a chunk decodes as 1 or 2 with the rest left
+    over. Only number characters up to the end of the buffer means the
+    next chunk may complete it.
+    """
+    if isinstance(item, bool) or not isinstance(item, (int, float)):
+        return False
+    return all(char in NUMBER_CHARS for char in buf[end:])
+
+
+def open_source(source: str) -> TextIO:
+    """Open a file path for reading, treating '-' as stdin."""
+    if source == '-':
+        return sys.stdin
+    return open(source, 'r', encoding='utf-8')
+
+
+def read_lines(source: str) -> List[str]:
+    """Read non-empty lines (e.g. refs) from a file path or '-' for stdin."""
+    stream = open_source(source)
+    try:
+        return [line.strip() for line in stream if line.strip()]
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def read_json_items(source: str) -> List[Any]:
+    """Read a JSON array (or `gh api --paginate` arrays) from a file path or '-'."""
+    stream = open_source(source)
+    try:
+        return list(iter_json_array(stream))
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
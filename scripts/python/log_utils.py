@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+log_utils.py - Shared structured logging for the GitAI Teams Python scripts
+
+All messages use lazy %-style arguments so nothing is formatted unless the
+record is emitted. Per-item messages in hot loops go through an ItemTracer,
+which is falsy when disabled so the loop pays a single truth test:
+
+- default: INFO (or the level passed to configure_logging), no per-item logs
+- debug:   DEBUG, per-item logs sampled every GITAI_LOG_SAMPLE items (100)
+- trace:   TRACE, every per-item log
+
+Levels can also be set from the environment (GITAI_LOG_LEVEL, GITAI_TRACE)
+so scripts without a --debug flag can be traced in a workflow run.
+"""
+
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+# Per-item level below DEBUG
+TRACE = 5
+logging.addLevelName(TRACE, "TRACE")
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DEFAULT_SAMPLE_EVERY = 100
+
+_sample_every = DEFAULT_SAMPLE_EVERY
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formatter that appends the record's structured fields as key=value pairs"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        record_fields = getattr(record, 'fields', None)
+        if record_fields:
+            message += " | " + " ".join(f"{key}={value}" for key, value in record_fields.items())
+        return message
+
+
+class _StderrHandler(logging.StreamHandler):
+    """Stream handler that writes to whatever sys.stderr is at emit time, until setStream is called"""
+
+    def __init__(self) -> None:
+        super().__init__(sys.stderr)
+        self.follow_stderr = True
+
+    def setStream(self, stream):
+        self.follow_stderr = False
+        return super().setStream(stream)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # sys.stderr may have been replaced since configure_logging (e.g. by
+        # pytest's capture); handle() holds the handler lock here
+        if self.follow_stderr:
+            self.stream = sys.stderr
+        super().emit(record)
+
+
+class ItemTracer:
+    """
+    Sampled per-item logger for hot loops.
+
+    Falsy when per-item logging is disabled, so callers guard with
+    ``if tracer: tracer.log(...)`` and skip argument evaluation entirely.
+    """
+    __slots__ = ('logger', 'every', 'level', 'seen')
+
+    def __init__(self, logger: logging.Logger, every: int, level: int = logging.DEBUG):
+        self.logger = logger
+        self.every = every
+        self.level = level
+        self.seen = 0
+
+    def __bool__(self) -> bool:
+        return self.every > 0
+
+    def log(self, msg: str, *args: Any) -> None:
+        """Log one item, keeping only every Nth when sampling."""
+        self.seen += 1
+        if self.level == TRACE:
+            self.logger.log(TRACE, msg, *args)
+        elif (self.seen - 1) % self.every == 0:
+            self.logger.log(self.level, msg, *args, extra=fields(sample=self.seen, sampled_every=self.every))
+
+
+def fields(**values: Any) -> Dict[str, Any]:
+    """Build the ``extra`` argument carrying structured fields for a record."""
+    return {"fields": values}
+
+
+def configure_logging(level: int = logging.INFO,
+                      debug: bool = False,
+                      trace: bool = False,
+                      sample_every: Optional[int] = None) -> None:
+    """
+    Configure root logging for a script entry point.
+
+    Safe to call more than once; the structured handler is only added once.
+
+    Args:
+        level: Default level when neither debug nor trace is requested
+        debug: Enable DEBUG with sampled per-item logs
+        trace: Enable TRACE with every per-item log
+        sample_every: Per-item sampling interval in debug mode
+    """
+    global _sample_every
+
+    env_level = os.environ.get('GITAI_LOG_LEVEL')
+    if env_level:
+        level = logging.getLevelName(env_level.upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+    if trace or os.environ.get('GITAI_TRACE') == '1':
+        level = TRACE
+    elif debug:
+        level = logging.DEBUG
+
+    invalid_sample = None
+    if sample_every is None:
+        env_sample = os.environ.get('GITAI_LOG_SAMPLE')
+        sample_every = DEFAULT_SAMPLE_EVERY
+        if env_sample:
+            try:
+                sample_every = int(env_sample)
+            except ValueError:
+                invalid_sample = env_sample
+    _sample_every = max(sample_every, 1)
+
+    root = logging.getLogger()
+    if not any(isinstance(handler, _StderrHandler) for handler in root.handlers):
+        handler = _StderrHandler()
+        handler.setFormatter(StructuredFormatter(LOG_FORMAT))
+        root.addHandler(handler)
+    root.setLevel(level)
+
+    # Reported once the handler exists, so the warning is not lost
+    if invalid_sample is not None:
+        logging.getLogger(__name__).warning("Ignoring invalid GITAI_LOG_SAMPLE=%r; sampling every %d items",
+                                            invalid_sample, DEFAULT_SAMPLE_EVERY)
+
+
+def item_tracer(logger: logging.Logger) -> ItemTracer:
+    """Return a tracer for per-item logs; create it once, outside the loop."""
+    if logger.isEnabledFor(TRACE):
+        return ItemTracer(logger, 1, TRACE)
+    if logger.isEnabledFor(logging.DEBUG):
+        return ItemTracer(logger, _sample_every)
+    return ItemTracer(logger, 0)
+
+
+@contextmanager
+def timed(logger: logging.Logger, stage: str, level: int = logging.INFO,
+          **stage_fields: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Time a processing stage and log it with its fields and elapsed_ms.
+
+    The yielded dict can be updated inside the block to attach results
+    (e.g. counts) to the stage record.
+    """
+    start = time.perf_counter()
+    try:
+        yield stage_fields
+    finally:
+        if logger.isEnabledFor(level):
+            elapsed_ms = round((time.perf_counter() - start) * 1000, 3)
+            logger.log(level, "Stage %s finished", stage,
+                       extra=fields(stage=stage, **stage_fields, elapsed_ms=elapsed_ms))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+markdown_writer.py - Shared markdown rendering for the result formatters
+
+combine_results.py and generate_comparison.py render lists, sections and
+tables through a MarkdownWriter, which appends chunks to a buffer (or writes
+straight to a stream) instead of building intermediate line lists. Cell
+values are stringified once per cell, and pipe escaping is cached because
+the same short values ("-", "Good", "Yes") repeat across thousands of rows.
+"""
+
+from functools import lru_cache
+from typing import Any, Container, Iterable, List, Optional, TextIO
+
+ELLIPSIS = "..."
+
+
+@lru_cache(maxsize=4096)
+def _escape_pipes(text: str) -> str:
+    return text.replace("|", "\\|")
+
+
+def escape_cell(text: str) -> str:
+    """Escape pipe characters so text can sit inside a table cell."""
+    if "|" not in text:
+        return text
+    if len(text) > 256:
+        # Long cells rarely repeat; keep them out of the cache
+        return text.replace("|", "\\|")
+    return _escape_pipes(text)
+
+
+def truncate(text: str, limit: int, suffix: str = ELLIPSIS) -> str:
+    """Append suffix to the first limit characters when text is longer than limit."""
+    if len(text) > limit:
+        return text[:limit] + suffix
+    return text
+
+
+def cell_text(value: Any, limit: Optional[int] = None) -> str:
+    """
+    Stringify a cell value once, optionally truncated.
+
+    Args:
+        value: Cell value
+        limit: Keep at most this many characters before the ellipsis
+
+    Returns:
+        The cell text
+    """
+    text = value if isinstance(value, str) else str(value)
+    if limit is not None:
+        return truncate(text, limit)
+    return text
+
+
+class MarkdownWriter:
+    """
+    Write-into-buffer markdown builder.
+
+    Lines are separated by a single newline with no trailing newline, the
+    same output as ``"\n".join(lines)``. Without a stream, lines are kept
+    as chunks and joined once by getvalue(); with a stream, each line is
+    written as soon as it is added.
+    """
+    __slots__ = ('_out', '_lines', '_started')
+
+    def __init__(self, out: Optional[TextIO] = None):
+        self._out = out
+        self._lines: List[str] = []
+        self._started = False
+
+    def line(self, text: str = "") -> None:
+        """Add a line containing text."""
+        if self._out is None:
+            self._lines.append(text)
+        else:
+            self._write_line(text)
+
+    def lines(self, texts: Iterable[str]) -> None:
+        """Add each text as its own line."""
+        if self._out is None:
+            self._lines.extend(texts)
+        else:
+            for text in texts:
+                self._write_line(text)
+
+    def heading(self, level: int, text: str) -> None:
+        self.line("#" * level + " " + text)
+
+    def bullet(self, text: str) -> None:
+        self.line("- " + text)
+
+    def table_row(self, cells: Iterable[str]) -> None:
+        """Add a table row from already escaped cell texts."""
+        self.line("| " + " | ".join(cells) + " |")
+
+    def table_separator(self, widths: Iterable[int], right: Container[int] = ()) -> None:
+        """Add the header separator for padded columns, right-aligning the given column indexes."""
+        self.line("|" + "|".join(
+            "-" * (width + 1) + ":" if i in right else "-" * (width + 2)
+            for i, width in enumerate(widths)
+        ) + "|")
+
+    def getvalue(self) -> str:
+        """The rendered markdown (buffered writers only)."""
+        return "\n".join(self._lines)
+
+    def _write_line(self, text: str) -> None:
+        if self._started:
+            self._out.write("\n")
+        else:
+            self._started = True
+        self._out.write(text)
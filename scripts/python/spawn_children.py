@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+spawn_children.py - Dispatch every child agent of an issue concurrently
+
+spawn_child.sh sends one repository_dispatch per call and the orchestrator
+calls it once per subtask, so five children cost five process startups and
+five sequential round trips before the last one starts. This takes the whole
+subtask list, validates it the way spawn_child.sh does, and sends the
+child_task dispatches concurrently over one pooled GitHubClient.
+
+Each child carries an idempotency key derived from the issue and child
+number, which ai-child-executor uses as its run name. A child is skipped when
+its branch already exists or when an executor run with its key is still
+queued or running (the branch is only pushed late in that run), so rerunning
+the spawner after a partial failure only dispatches the missing children.
+The ref listing comes from `git for-each-ref`, run by bash.
+"""
+
+import sys
+import argparse
+import asyncio
+import http.client
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Set, Tuple
+
+from branch_index import MAX_CHILDREN, BranchIndex, parent_branch
+from github_client import GitHubAPIError, GitHubClient, Request
+from io_utils import iter_json_array, open_source, read_lines
+from log_utils import configure_logging, fields, timed
+
+logger = logging.getLogger(__name__)
+
+DISPATCH_EVENT = "child_task"
+
+# Workflow the dispatches start; its run-name is the idempotency key
+EXECUTOR_WORKFLOW = "ai-child-executor.yml"
+ACTIVE_RUN_STATUSES = ("requested", "waiting", "pending", "queued", "in_progress")
+RUNS_PAGE_SIZE = 100
+
+STATUS_PENDING = "pending"
+STATUS_DISPATCHED = "dispatched"
+STATUS_SKIPPED = "skipped"
+STATUS_FAILED = "failed"
+
+
+@dataclass
+class ChildDispatch:
+    """One child to spawn and the outcome of its dispatch."""
+    child_number: int
+    task: str
+    branch: str
+    idempotency_key: str
+    status: str = STATUS_PENDING
+    reason: Optional[str] = None
+    duration_ms: Optional[float] = None
+
+
+def child_branch_name(issue_number: int, child_number: int) -> str:
+    """Branch a child agent works on."""
+    return f"{parent_branch(issue_number)}-child-{child_number}"
+
+
+def idempotency_key(issue_number: int, child_number: int) -> str:
+    """Key identifying one child of one issue across spawner retries."""
+    return f"gitaiteams-issue-{issue_number}-child-{child_number}"
+
+
+def parse_subtasks(items: Iterable[Any]) -> List[Tuple[int, str]]:
+    """
+    Read subtasks as (child number, task) pairs.
+
+    Args:
+        items: Task strings (numbered 1, 2, ... in order) or objects with
+            "task" and an optional "child_number"
+
+    Returns:
+        List of (child_number, task)
+
+    Raises:
+        ValueError: For entries that are neither
+    """
+    subtasks = []
+    for position, item in enumerate(items, 1):
+        if isinstance(item, str):
+            subtasks.append((position, item))
+        elif isinstance(item, dict) and isinstance(item.get("task"), str):
+            number = item.get("child_number", position)
+            if not isinstance(number, int) or isinstance(number, bool):
+                raise ValueError(f"Subtask {position}: child_number must be an integer")
+            subtasks.append((number, item["task"]))
+        else:
+            raise ValueError(f"Subtask {position}: expected a task string or an object with a task")
+    return subtasks
+
+
+def plan_dispatches(issue_number: int, subtasks: Sequence[Tuple[int, str]],
+                    branch: Optional[str] = None,
+                    index: Optional[BranchIndex] = None) -> List[ChildDispatch]:
+    """
+    Validate subtasks and decide which children to dispatch.
+
+    Args:
+        issue_number: Parent issue number
+        subtasks: (child_number, task) pairs
+        branch: Parent branch (default gitaiteams/issue-N)
+        index: Existing branches; children whose branch exists are skipped
+
+    Returns:
+        One ChildDispatch per subtask, already-spawned ones marked skipped
+
+    Raises:
+        ValueError: When the subtasks break the spawn_child.sh rules
+    """
+    expected = parent_branch(issue_number)
+    branch = branch or expected
+    if branch != expected:
+        raise ValueError(f"Invalid parent branch for issue {issue_number}: {branch} (expected {expected})")
+    if not subtasks:
+        raise ValueError("No subtasks given")
+    if len(subtasks) > MAX_CHILDREN:
+        raise ValueError(f"At most {MAX_CHILDREN} children are allowed, got {len(subtasks)}")
+
+    dispatches = []
+    seen = set()
+    for child_number, task in subtasks:
+        if child_number < 1 or child_number > MAX_CHILDREN:
+            raise ValueError(f"Child number must be between 1 and {MAX_CHILDREN}")
+        if child_number in seen:
+            raise ValueError(f"Duplicate child number: {child_number}")
+        if not task.strip():
+            raise ValueError(f"Child {child_number} has an empty task")
+        seen.add(child_number)
+
+        dispatch = ChildDispatch(child_number, task, child_branch_name(issue_number, child_number),
+                                 idempotency_key(issue_number, child_number))
+        if index is not None and index.child_branch(issue_number, child_number) is not None:
+            dispatch.status = STATUS_SKIPPED
+            dispatch.reason = "child branch exists"
+        dispatches.append(dispatch)
+    return dispatches
+
+
+def in_flight_keys(client: GitHubClient, repo: str) -> Set[str]:
+    """
+    Idempotency keys of executor runs that have not finished yet.
+
+    One listing per active run status, requested as one batch.
+
+    Returns:
+        Run names (idempotency keys) of queued or running executor runs
+    """
+    path = f"repos/{repo}/actions/workflows/{EXECUTOR_WORKFLOW}/runs"
+    responses = client.batch(
+        Request("GET", path, params={"status": status, "event": "repository_dispatch",
+                                     "per_page": RUNS_PAGE_SIZE})
+        for status in ACTIVE_RUN_STATUSES
+    )
+    keys = set()
+    for response in responses:
+        if isinstance(response, Exception):
+            raise response
+        for run in (response.json() or {}).get("workflow_runs", []):
+            if run.get("display_title"):
+                keys.add(run["display_title"])
+    return keys
+
+
+def skip_in_flight(dispatches: Sequence[ChildDispatch], keys: Set[str]) -> None:
+    """Mark pending dispatches whose key has an unfinished executor run as skipped."""
+    for dispatch in dispatches:
+        if dispatch.status == STATUS_PENDING and dispatch.idempotency_key in keys:
+            dispatch.status = STATUS_SKIPPED
+            dispatch.reason = "executor run in flight"
+
+
+def dispatch_payload(issue_number: int, branch: str, dispatch: ChildDispatch,
+                     status_comment_id: Optional[str] = None) -> Dict[str, Any]:
+    """repository_dispatch body for one child (as sent by spawn_child.sh)."""
+    payload = {
+        "issue_number": issue_number,
+        "child_number": dispatch.child_number,
+        "parent_branch": branch,
+        "task": dispatch.task,
+        "idempotency_key": dispatch.idempotency_key,
+    }
+    if status_comment_id:
+        payload["status_comment_id"] = status_comment_id
+    return {"event_type": DISPATCH_EVENT, "client_payload": payload}
+
+
+async def dispatch_children(client: GitHubClient, repo: str, issue_number: int, branch: str,
+                            dispatches: Sequence[ChildDispatch],
+                            status_comment_id: Optional[str] = None) -> None:
+    """
+    Send the pending dispatches concurrently (at most the client's pool size).
+
+    Each ChildDispatch is updated in place with its status, error reason and
+    duration_ms.
+    """
+    path = f"repos/{repo}/dispatches"
+
+    async def send(dispatch: ChildDispatch) -> None:
+        start = time.perf_counter()
+        try:
+            await client.arequest("POST", path,
+                                  json_body=dispatch_payload(issue_number, branch, dispatch, status_comment_id))
+            dispatch.status = STATUS_DISPATCHED
+        except (GitHubAPIError, http.client.HTTPException, OSError) as e:
+            dispatch.status = STATUS_FAILED
+            dispatch.reason = str(e)
+        dispatch.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        logger.info("Dispatch %s", dispatch.status, extra=fields(
+            child=dispatch.child_number, key=dispatch.idempotency_key, duration_ms=dispatch.duration_ms))
+
+    await asyncio.gather(*(send(d) for d in dispatches if d.status == STATUS_PENDING))
+
+
+def spawn_children(client: GitHubClient, repo: str, issue_number: int, branch: str,
+                   dispatches: Sequence[ChildDispatch],
+                   status_comment_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Dispatch planned children and summarize the outcome.
+
+    Children with a queued or running executor run are skipped first. If the
+    runs cannot be listed, a warning is logged and only the branch check
+    made by plan_dispatches applies.
+
+    Returns:
+        Dict with per-child results, dispatched/skipped/failed counts and
+        elapsed_ms for the whole fan-out
+    """
+    start = time.perf_counter()
+    if any(d.status == STATUS_PENDING for d in dispatches):
+        try:
+            skip_in_flight(dispatches, in_flight_keys(client, repo))
+        except (GitHubAPIError, http.client.HTTPException, OSError) as e:
+            logger.warning("Could not list in-flight executor runs: %s", e)
+    asyncio.run(dispatch_children(client, repo, issue_number, branch, dispatches, status_comment_id))
+    return summarize(issue_number, branch, dispatches, (time.perf_counter() - start) * 1000)
+
+
+def summarize(issue_number: int, branch: str, dispatches: Sequence[ChildDispatch],
+              elapsed_ms: float = 0.0) -> Dict[str, Any]:
+    """Result dictionary as printed by the CLI."""
+    statuses = [d.status for d in dispatches]
+    return {
+        "issue": issue_number,
+        "parent_branch": branch,
+        "children": [asdict(d) for d in dispatches],
+        "dispatched": statuses.count(STATUS_DISPATCHED),
+        "skipped": statuses.count(STATUS_SKIPPED),
+        "failed": statuses.count(STATUS_FAILED),
+        "elapsed_ms": round(elapsed_ms, 1),
+    }
+
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description='Dispatch all child agents of an issue concurrently')
+    parser.add_argument('issue', type=int, help='Parent issue number')
+    parser.add_argument('--subtasks', type=str, required=True,
+                        help="JSON array of task strings or {child_number, task} objects ('-' for stdin)")
+    parser.add_argument('--parent-branch', type=str, help='Parent branch (default: gitaiteams/issue-N)')
+    parser.add_argument('--status-comment-id', type=str, help='Status comment id passed to the children')
+    parser.add_argument('--refs', type=str,
+                        help="File of `git for-each-ref --format='%%(refname:short)'` output; "
+                             "children whose branch exists are skipped")
+    parser.add_argument('--parallel', type=int, default=MAX_CHILDREN,
+                        help=f'Dispatches in flight (default: {MAX_CHILDREN})')
+    parser.add_argument('--dry-run', action='store_true', help='Validate and plan without dispatching')
+    parser.add_argument('--debug', action='store_true', help='Enable debug logging')
+
+    args = parser.parse_args()
+
+    configure_logging(debug=args.debug)
+
+    repo = os.environ.get('GITHUB_REPOSITORY')
+    if not repo and not args.dry_run:
+        parser.error("GITHUB_REPOSITORY=owner/name is required")
+    if args.parallel < 1:
+        parser.error("--parallel must be at least 1")
+
+    branch = args.parent_branch or parent_branch(args.issue)
+    try:
+        stream = open_source(args.subtasks)
+        try:
+            subtasks = parse_subtasks(iter_json_array(stream))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        index = BranchIndex(read_lines(args.refs)) if args.refs else None
+        dispatches = plan_dispatches(args.issue, subtasks, branch, index)
+    except (json.JSONDecodeError, OSError, ValueError) as e:
+        logger.error("Cannot spawn children: %s", e)
+        print(json.dumps({"error": f"Error: {e}", "issue": args.issue, "children": []}))
+        return 1
+
+    if args.dry_run:
+        print(json.dumps(summarize(args.issue, branch, dispatches)))
+        return 0
+
+    with timed(logger, "spawn_children") as stage:
+        with GitHubClient.from_env(pool_size=args.parallel) as client:
+            result = spawn_children(client, repo, args.issue, branch, dispatches, args.status_comment_id)
+        stage.update(dispatched=result["dispatched"], skipped=result["skipped"], failed=result["failed"])
+
+    print(json.dumps(result))
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+status_comment.py - Render the issue status comment and update it only on change
+
+update_status_comment.sh fetched the comment body, then ran `gh pr list
+--head` once per child branch before PATCHing the comment, even when nothing
+had changed. Here the comment, the issue's child branches and every PR into
+the parent branch (one `pulls?base=` listing) are requested together in one
+batch, the body is rendered, and the comment is only PATCHed when the
+rendered body differs from the current one.
+"""
+
+import sys
+import argparse
+import http.client
+import json
+import logging
+import os
+import re
+import time
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from branch_index import BRANCH_RE, CHILD_SEGMENT, normalize_ref, parent_branch
+from github_client import GitHubAPIError, GitHubClient, Request, normalize_pull_request
+from log_utils import configure_logging, timed
+from markdown_writer import MarkdownWriter, escape_cell
+
+logger = logging.getLogger(__name__)
+
+STATUS_MARKER = "<!-- gitai-status-comment -->"
+STARTED_RE = re.compile(r'\*\*Started:\*\* (\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} UTC)')
+STARTED_FORMAT = "%Y-%m-%d %H:%M:%S UTC"
+# Hidden `<!-- gitai-name: ... -->` lines other scripts keep in the comment
+# (e.g. the completion cursor); they survive a re-render
+HIDDEN_MARKER_RE = re.compile(r'^<!-- gitai-[\w-]+: .*-->$', re.MULTILINE)
+
+STATUS_EMOJI = {
+    "initializing": "🔄",
+    "analyzing": "🔍",
+    "spawning": "🚀",
+    "processing": "⚙️",
+    "completed": "✅",
+    "error": "❌",
+}
+DEFAULT_STATUS_EMOJI = "ℹ️"
+
+CHILD_STATUS_LABELS = {"MERGED": "✅ Complete", "OPEN": "📝 PR Open"}
+DEFAULT_CHILD_LABEL = "🔄 Running"
+
+# When a child has several PRs, the most advanced state wins
+PR_STATE_PRIORITY = {"MERGED": 2, "OPEN": 1}
+
+CHILD_TABLE_HEADERS = ["Child", "Branch", "Status"]
+PULLS_PAGE_SIZE = 100
+
+
+def child_number(branch: str, issue_number: int) -> Optional[int]:
+    """Child number of a gitaiteams/issue-N-child-M branch of this issue, else None."""
+    name = normalize_ref(branch)
+    match = BRANCH_RE.fullmatch(name) if name else None
+    if not match or int(match.group("issue")) != issue_number:
+        return None
+    nested = match.group("children")
+    if nested.count(CHILD_SEGMENT) != 1:
+        return None
+    return int(nested[len(CHILD_SEGMENT):])
+
+
+def child_pr_states(pull_requests: Iterable[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    PR state per head branch, the most advanced one when a child has several.
+
+    Args:
+        pull_requests: PRs in gh or REST shape
+
+    Returns:
+        head branch -> OPEN, MERGED or CLOSED
+    """
+    states: Dict[str, str] = {}
+    for pr in pull_requests:
+        pr = normalize_pull_request(pr)
+        head = pr["head"]
+        if not head:
+            continue
+        previous = states.get(head)
+        if previous is None or PR_STATE_PRIORITY.get(pr["state"], 0) > PR_STATE_PRIORITY.get(previous, 0):
+            states[head] = pr["state"]
+    return states
+
+
+def child_rows(issue_number: int, branches: Iterable[str],
+               pr_states: Dict[str, str]) -> List[Tuple[int, str, str]]:
+    """
+    Rows of the child status table.
+
+    Args:
+        issue_number: Parent issue number
+        branches: Child branches (refs or PR heads; others are ignored)
+        pr_states: PR state per head branch
+
+    Returns:
+        (child number, branch, status label) tuples ordered by child number
+    """
+    children: Dict[int, str] = {}
+    for ref in list(branches) + list(pr_states):
+        number = child_number(ref, issue_number)
+        if number is not None:
+            children[number] = normalize_ref(ref)
+    return [
+        (number, branch, CHILD_STATUS_LABELS.get(pr_states.get(branch, ""), DEFAULT_CHILD_LABEL))
+        for number, branch in sorted(children.items())
+    ]
+
+
+def render_status_body(status: str, message: str, started: str,
+                       branch: Optional[str] = None,
+                       children: Iterable[Tuple[int, str, str]] = ()) -> str:
+    """
+    Render the status comment the way update_status_comment.sh lays it out.
+
+    Args:
+        status: Status name (initializing, spawning, completed, ...)
+        message: Status message
+        started: Start time shown in the comment
+        branch: Parent branch, if any
+        children: Rows from child_rows
+
+    Returns:
+        The comment body
+    """
+    writer = MarkdownWriter()
+    writer.line(STATUS_MARKER)
+    writer.heading(2, "⏳ GitAI Teams Status")
+    writer.line()
+    writer.line(f"**Status:** {STATUS_EMOJI.get(status, DEFAULT_STATUS_EMOJI)} {status}")
+    writer.line(f"**Started:** {started}")
+    writer.line(f"**Message:** {message}")
+    if branch:
+        writer.line(f"**Branch:** `{branch}`")
+
+    children = list(children)
+    if branch and children:
+        writer.line()
+        writer.heading(3, "📊 Child Task Status")
+        writer.line()
+        writer.table_row(CHILD_TABLE_HEADERS)
+        writer.table_separator(len(header) for header in CHILD_TABLE_HEADERS)
+        for number, child_branch, label in children:
+            writer.table_row([f"C{number}", f"`{escape_cell(child_branch)}`", label])
+    return writer.getvalue()
+
+
+def started_time(body: Optional[str]) -> str:
+    """Start time recorded in an existing comment body, or now."""
+    match = STARTED_RE.search(body or "")
+    if match:
+        return match.group(1)
+    return time.strftime(STARTED_FORMAT, time.gmtime())
+
+
+def fetch_status_sources(client: GitHubClient, repo: str, comment_id: str, issue_number: int,
+                         branch: Optional[str]) -> Tuple[str, List[str], List[Any]]:
+    """
+    Fetch the comment, the issue's child branches and the PRs into the parent
+    branch as one concurrent batch.
+
+    Returns:
+        Tuple of (current body, child refs, pull requests)
+
+    Raises:
+        GitHubAPIError: When the comment cannot be read
+    """
+    requests = [Request("GET", f"repos/{repo}/issues/comments/{comment_id}")]
+    if branch:
+        requests.append(Request("GET", f"repos/{repo}/git/matching-refs/heads/"
+                                       f"{parent_branch(issue_number)}{CHILD_SEGMENT}"))
+        requests.append(Request("GET", f"repos/{repo}/pulls",
+                                params={"base": branch, "state": "all", "per_page": PULLS_PAGE_SIZE}))
+    responses = client.batch(requests)
+
+    comment = responses[0]
+    if isinstance(comment, Exception):
+        raise comment
+    body = (comment.json() or {}).get("body") or ""
+    if not branch:
+        return body, [], []
+
+    ref_response, pulls_response = responses[1], responses[2]
+    for response in (ref_response, pulls_response):
+        if isinstance(response, Exception):
+            raise response
+    refs = [ref["ref"] for ref in ref_response.json() or []]
+    pull_requests = list(pulls_response.json() or [])
+    if pulls_response.next_url:
+        pull_requests.extend(client.paginate(pulls_response.next_url))
+    return body, refs, pull_requests
+
+
+def update_status_comment(client: GitHubClient, repo: str, comment_id: str, issue_number: int,
+                          status: str, message: str, branch: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Re-render the status comment and PATCH it only if the body changed.
+
+    Returns:
+        Dict with comment_id, updated (False when the body was unchanged)
+        and children (rows in the child table)
+    """
+    with timed(logger, "fetch_status_sources") as stage:
+        current, refs, pull_requests = fetch_status_sources(client, repo, comment_id, issue_number, branch)
+        stage["pull_requests"] = len(pull_requests)
+
+    children = child_rows(issue_number, refs, child_pr_states(pull_requests)) if branch else []
+    body = render_status_body(status, message, started_time(current), branch, children)
+    kept_markers = HIDDEN_MARKER_RE.findall(current)
+    if kept_markers:
+        body = "\n".join([body, *kept_markers])
+
+    updated = body != current
+    if updated:
+        client.request("PATCH", f"repos/{repo}/issues/comments/{comment_id}", json_body={"body": body})
+    else:
+        logger.info("Status comment %s unchanged; not updating", comment_id)
+    return {"comment_id": comment_id, "updated": updated, "children": len(children)}
+
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description='Update the issue status comment when it changes')
+    parser.add_argument('issue', type=int, help='Issue number')
+    parser.add_argument('status', type=str, help='Status (initializing, analyzing, spawning, ...)')
+    parser.add_argument('message', type=str, nargs='?', default='Processing...', help='Status message')
+    parser.add_argument('--comment-id', type=str, required=True, help='Status comment id')
+    parser.add_argument('--branch', type=str, help='Parent branch; adds the child status table')
+    parser.add_argument('--repo', type=str, help='owner/name (default: $GITHUB_REPOSITORY)')
+    parser.add_argument('--http-cache', action='store_true',
+                        help='Revalidate against responses cached under $RUNNER_TOOL_CACHE')
+    parser.add_argument('--debug', action='store_true', help='Enable debug logging')
+
+    args = parser.parse_args()
+
+    configure_logging(debug=args.debug)
+
+    repo = args.repo or os.environ.get('GITHUB_REPOSITORY')
+    if not repo:
+        parser.error("--repo or GITHUB_REPOSITORY=owner/name is required")
+
+    try:
+        with GitHubClient.from_env(http_cache=args.http_cache) as client:
+            result = update_status_comment(client, repo, args.comment_id, args.issue,
+                                           args.status, args.message, args.branch)
+    except (GitHubAPIError, http.client.HTTPException, OSError) as e:
+        logger.error("Failed to update status comment: %s", e)
+        print(json.dumps({"error": f"Failed to update status comment: {e}", "comment_id": args.comment_id}))
+        return 1
+
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,9 +5,17 @@ Unit tests for analyze_completions.py
 
 import pytest
 import json
+from array import array
+from itertools import combinations_with_replacement
+
+import analyze_completions
 from analyze_completions import (
+    STATUS_TYPES,
+    classify_batch,
+    count_status_codes,
     detect_status_type,
     determine_merge_strategy,
+    merge_strategy_from_counts,
     parse_claude_response
 )
 
@@ -54,6 +62,25 @@ class TestDetectStatusType:
         assert detect_status_type("Completed but some tests failed") == "partial"
         assert detect_status_type("Failed but mostly done") == "failure"
 
+    def test_percentages(self):
+        """Any percentage other than 100% should mark the status partial."""
+        assert detect_status_type("100% done") == "success"
+        assert detect_status_type("50% then 100% done") == "success"
+        assert detect_status_type("Coverage at 80%, finished") == "partial"
+
+    def test_keyword_inside_longer_keyword(self):
+        """Keywords inside longer keywords should still count."""
+        # 'fail' only occurs inside 'some tests failing'
+        assert detect_status_type("Completed, some tests failing") == "partial"
+        # 'complet' only occurs inside 'completed but'
+        assert detect_status_type("Completed but untested") == "success"
+
+    def test_large_status(self):
+        """Keywords far into a large status should be found."""
+        status = "Log line without keywords.\n" * 5000
+        assert detect_status_type(status) == "unknown"
+        assert detect_status_type(status + "Cannot proceed") == "failure"
+
 
 class TestDetermineMergeStrategy:
     """Test suite for determine_merge_strategy function."""
@@ -113,6 +140,85 @@ class TestDetermineMergeStrategy:
         assert result["confidence"] > 0.5
 
 
+class TestClassifyBatch:
+    """Test suite for classify_batch and the count-based merge strategy."""
+
+    TEXTS = ["Task completed successfully", "❌ Error occurred", "90% done", "Working on it", ""]
+
+    def test_codes_match_detect_status_type(self, monkeypatch):
+        """Without numpy, codes should be an array('B') matching detect_status_type."""
+        monkeypatch.setattr(analyze_completions, "numpy", None)
+        codes = classify_batch(self.TEXTS)
+        assert isinstance(codes, array)
+        assert codes.typecode == 'B'
+        assert [STATUS_TYPES[code] for code in codes] == [detect_status_type(text) for text in self.TEXTS]
+
+    def test_numpy_codes(self):
+        """With numpy installed, codes should be a uint8 ndarray."""
+        numpy = pytest.importorskip("numpy")
+        codes = classify_batch(self.TEXTS)
+        assert isinstance(codes, numpy.ndarray)
+        assert codes.dtype == numpy.uint8
+        assert count_status_codes(codes) == {"success": 1, "failure": 1, "partial": 1, "unknown": 2}
+
+    def test_count_status_codes(self, monkeypatch):
+        """Counts should cover every status type, including absent ones."""
+        monkeypatch.setattr(analyze_completions, "numpy", None)
+        assert count_status_codes(classify_batch(["Done", "Done", "Blocked"])) == {
+            "success": 2, "failure": 1, "partial": 0, "unknown": 0
+        }
+        assert count_status_codes(array('B')) == {"success": 0, "failure": 0, "partial": 0, "unknown": 0}
+
+    def test_strategy_from_counts_matches_list(self):
+        """Count-based strategy should equal determine_merge_strategy for every mix."""
+        for size in range(1, 5):
+            for statuses in combinations_with_replacement(STATUS_TYPES, size):
+                counts = {status: statuses.count(status) for status in STATUS_TYPES}
+                assert merge_strategy_from_counts(counts) == determine_merge_strategy(list(statuses))
+
+    def test_strategy_from_empty_counts(self):
+        """No statuses should require manual review."""
+        assert merge_strategy_from_counts({}) == {"strategy": "manual_review", "confidence": 0}
+
+
+class TestClassificationCache:
+    """Test suite for the memoized classifiers."""
+
+    @pytest.fixture(autouse=True)
+    def restore_cache(self, monkeypatch):
+        monkeypatch.setattr(analyze_completions, "_cache", None)
+
+    def test_repeated_status_is_a_hit(self):
+        """The same status text should only be classified once."""
+        cache = analyze_completions.enable_classification_cache()
+        assert detect_status_type("Task completed successfully") == "success"
+        assert detect_status_type("Task completed successfully") == "success"
+        assert detect_status_type("❌ Error occurred") == "failure"
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 2
+
+    def test_cached_response_is_read_only(self):
+        """A cached parse result cannot be mutated by callers."""
+        analyze_completions.enable_classification_cache()
+        response = "✅ Child 1 done, ✅ Child 2 done"
+        first = parse_claude_response(response)
+        assert first["children"] == ("Child 1", "Child 2")
+        with pytest.raises(TypeError):
+            first["status"] = "failure"
+        assert parse_claude_response(response) is first
+
+    def test_classifiers_do_not_share_entries(self):
+        """Status and response results for the same text should be cached separately."""
+        analyze_completions.enable_classification_cache()
+        assert detect_status_type("done") == "success"
+        assert parse_claude_response("done")["status"] == "success"
+
+    def test_disabled_cache(self):
+        """Without a cache, classification should still work."""
+        analyze_completions.disable_classification_cache()
+        assert detect_status_type("done") == "success"
+
+
 class TestParseClaudeResponse:
     """Test suite for parse_claude_response function."""
 
@@ -185,4 +291,16 @@ class TestParseClaudeResponse:
         response = "Task is 75% complete"
         result = parse_claude_response(response)
         assert result.get("completion_percentage") == 75
-        assert result["confidence"] == 0.75
\ No newline at end of file
+        assert result["confidence"] == 0.75
+
+    def test_confidence_levels(self):
+        """Confidence words should only count alongside 'confidence'."""
+        assert parse_claude_response("Done, high confidence")["confidence"] == 0.9
+        assert parse_claude_response("Done, medium confidence")["confidence"] == 0.6
+        assert parse_claude_response("Done, low confidence")["confidence"] == 0.3
+        assert parse_claude_response("Done, high quality")["confidence"] == 0.7
+
+    def test_error_marker_case_insensitive(self):
+        """The ERROR: marker should match in any case."""
+        assert parse_claude_response("analysis error: timeout")["status"] == "error"
+        assert parse_claude_response("An error occurred")["status"] == "failure"
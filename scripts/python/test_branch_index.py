@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Unit tests for branch_index.py
+"""
+
+import json
+import sys
+
+import branch_index
+from branch_index import BranchIndex, normalize_ref
+
+REFS = [
+    "origin/main",
+    "origin/gitaiteams/issue-1",
+    "origin/gitaiteams/issue-2",
+    "origin/gitaiteams/issue-2-child-2",
+    "origin/gitaiteams/issue-2-child-10",
+    "origin/gitaiteams/issue-2-child-1",
+    "origin/gitaiteams/issue-3-child-1",
+    "origin/gitaiteams/issue-4",
+    "origin/gitaiteams/issue-4-child-1-child-1",
+    "origin/gitaiteams/issue-4-child-1",
+]
+
+
+class TestNormalizeRef:
+    """Test suite for normalize_ref."""
+
+    def test_strips_remote_prefixes(self):
+        """Remote and refs/ prefixes are dropped; other refs are ignored."""
+        assert normalize_ref("origin/gitaiteams/issue-3") == "gitaiteams/issue-3"
+        assert normalize_ref("refs/remotes/origin/gitaiteams/issue-3-child-1") == "gitaiteams/issue-3-child-1"
+        assert normalize_ref("refs/heads/gitaiteams/issue-3") == "gitaiteams/issue-3"
+        assert normalize_ref("origin/main") is None
+
+
+class TestBranchIndex:
+    """Test suite for BranchIndex lookups."""
+
+    def test_parents_and_children(self):
+        """Parents and children are indexed per issue, children in numeric order."""
+        index = BranchIndex(REFS)
+        assert index.issue_numbers() == [1, 2, 3, 4]
+        assert index.has_parent(2)
+        assert not index.has_parent(3)
+        assert index.child_count(2) == 3
+        assert index.child_branches(2) == [
+            "gitaiteams/issue-2-child-1",
+            "gitaiteams/issue-2-child-2",
+            "gitaiteams/issue-2-child-10",
+        ]
+        assert index.child_branch(2, 10) == "gitaiteams/issue-2-child-10"
+        assert index.child_branch(2, 3) is None
+        assert index.child_count(99) == 0
+        assert index.child_branches(99) == []
+
+    def test_lookup(self):
+        """Branches map back to their issue and child numbers."""
+        index = BranchIndex(REFS)
+        assert index.lookup("origin/gitaiteams/issue-2") == (2, None)
+        assert index.lookup("gitaiteams/issue-2-child-10") == (2, 10)
+        assert index.lookup("gitaiteams/issue-3") is None
+        assert index.lookup("gitaiteams/issue-4-child-1-child-1") is None
+        assert index.lookup("main") is None
+
+    def test_grandchildren_are_violations(self):
+        """Grandchildren are reported during construction, not counted as children."""
+        index = BranchIndex(REFS)
+        assert index.child_count(4) == 1
+        assert index.grandchildren(4) == ["gitaiteams/issue-4-child-1-child-1"]
+        assert index.violations == [
+            {"issue": 4, "type": "grandchildren", "branches": ["gitaiteams/issue-4-child-1-child-1"]}
+        ]
+        assert index.violations_for(4) == [
+            {"type": "grandchildren", "branches": ["gitaiteams/issue-4-child-1-child-1"]}
+        ]
+        assert index.violations_for(2) == []
+
+    def test_too_many_children(self):
+        """More than five children is a violation."""
+        refs = [f"origin/gitaiteams/issue-9-child-{i}" for i in range(1, 7)]
+        assert BranchIndex(refs).violations == [
+            {"issue": 9, "type": "too_many_children", "count": 6, "limit": 5}
+        ]
+
+
+class TestMain:
+    """Test suite for the command line interface."""
+
+    def test_main(self, tmp_path, monkeypatch, capsys):
+        """Issue summaries and violations are printed as JSON."""
+        refs = tmp_path / "refs"
+        refs.write_text("\n".join(REFS) + "\n")
+        monkeypatch.setattr(sys, "argv", ["branch_index.py", "--refs", str(refs), "2", "4"])
+
+        assert branch_index.main() == 0
+        output = json.loads(capsys.readouterr().out)
+        assert output["issues"]["2"]["children"] == 3
+        assert output["issues"]["4"]["parent_exists"] is True
+        assert output["violations"][0]["issue"] == 4
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Unit tests for classification_cache.py
+"""
+
+import os
+
+import pytest
+from classification_cache import ClassificationCache, default_disk_dir, freeze, resolve_disk_dir, thaw
+
+
+def upper(text):
+    return text.upper()
+
+
+class TestClassificationCache:
+    """Test suite for ClassificationCache."""
+
+    def test_hits_and_misses(self):
+        """Repeated texts should be served from the cache."""
+        cache = ClassificationCache("1")
+        assert cache.get_or_compute("status", "a", upper) == "A"
+        assert cache.get_or_compute("status", "a", upper) == "A"
+        assert cache.stats() == {"hits": 1, "disk_hits": 0, "misses": 1, "size": 1, "disk": False}
+
+    def test_lru_eviction(self):
+        """The least recently used entry should be evicted first."""
+        cache = ClassificationCache("1", maxsize=2)
+        cache.get_or_compute("status", "a", upper)
+        cache.get_or_compute("status", "b", upper)
+        cache.get_or_compute("status", "a", upper)
+        cache.get_or_compute("status", "c", upper)
+        assert cache.stats()["size"] == 2
+        cache.get_or_compute("status", "a", upper)
+        assert cache.hits == 2
+        cache.get_or_compute("status", "b", upper)
+        assert cache.misses == 4
+
+    def test_key_depends_on_version_and_kind(self):
+        """Keys should change with the classifier version and kind."""
+        cache = ClassificationCache("1")
+        assert cache.key("status", "a") == ClassificationCache("1").key("status", "a")
+        assert cache.key("status", "a") != ClassificationCache("2").key("status", "a")
+        assert cache.key("status", "a") != cache.key("claude_response", "a")
+
+    def test_results_are_frozen(self):
+        """Cached values are read-only and handed out without copying."""
+        cache = ClassificationCache("1")
+        first = cache.get_or_compute("response", "a", lambda text: {"children": ["x"]})
+        assert first["children"] == ("x",)
+        with pytest.raises(TypeError):
+            first["status"] = "success"
+        assert cache.get_or_compute("response", "a", upper) is first
+
+    def test_thaw(self):
+        """thaw undoes freeze."""
+        value = {"children": ["x"], "details": {"n": [1]}}
+        assert thaw(freeze(value)) == value
+
+    def test_disk_round_trip(self, tmp_path):
+        """A new cache on the same directory should reuse stored results."""
+        ClassificationCache("1", disk_dir=str(tmp_path)).get_or_compute("status", "a", upper)
+        cache = ClassificationCache("1", disk_dir=str(tmp_path))
+        assert cache.get_or_compute("status", "a", lambda text: pytest.fail("recomputed")) == "A"
+        assert cache.stats()["disk_hits"] == 1
+        assert not any(name.endswith('.tmp') for _, _, names in os.walk(tmp_path) for name in names)
+
+    def test_corrupt_disk_entry_is_a_miss(self, tmp_path):
+        """Unreadable entries should be recomputed and rewritten."""
+        cache = ClassificationCache("1", disk_dir=str(tmp_path))
+        key = cache.key("status", "a")
+        os.makedirs(tmp_path / key[:2])
+        (tmp_path / key[:2] / f"{key}.json").write_text("{not json")
+        assert cache.get_or_compute("status", "a", upper) == "A"
+        assert cache.misses == 1
+        assert ClassificationCache("1", disk_dir=str(tmp_path)).get_or_compute("status", "a", str) == "A"
+
+    def test_disk_eviction(self, tmp_path):
+        """Past the bound, least recently used disk entries are removed."""
+        cache = ClassificationCache("1", disk_dir=str(tmp_path), disk_max_entries=10)
+        for i in range(10):
+            cache.get_or_compute("status", str(i), upper)
+            path = tmp_path / cache.key("status", str(i))[:2] / f"{cache.key('status', str(i))}.json"
+            os.utime(path, (i, i))
+        # A disk hit refreshes entry 0
+        ClassificationCache("1", disk_dir=str(tmp_path)).get_or_compute("status", "0", upper)
+        cache.get_or_compute("status", "10", upper)
+
+        assert cache.evictions == 2
+        remaining = {name for _, _, names in os.walk(tmp_path) for name in names}
+        assert f"{cache.key('status', '0')}.json" in remaining
+        assert f"{cache.key('status', '1')}.json" not in remaining
+        assert f"{cache.key('status', '2')}.json" not in remaining
+        assert len(remaining) == 9
+
+
+class TestDiskDir:
+    """Test suite for the disk cache location."""
+
+    def test_under_runner_tool_cache(self, monkeypatch, tmp_path):
+        """The disk cache should live under RUNNER_TOOL_CACHE."""
+        monkeypatch.setenv("RUNNER_TOOL_CACHE", str(tmp_path))
+        assert default_disk_dir().startswith(str(tmp_path))
+
+    def test_opt_in(self, monkeypatch, tmp_path):
+        """The disk cache should only be used when requested."""
+        monkeypatch.setenv("RUNNER_TOOL_CACHE", str(tmp_path))
+        monkeypatch.delenv("GITAI_CLASSIFY_DISK_CACHE", raising=False)
+        assert resolve_disk_dir(False) is None
+        assert resolve_disk_dir(True) == default_disk_dir()
+        monkeypatch.setenv("GITAI_CLASSIFY_DISK_CACHE", "1")
+        assert resolve_disk_dir(False) == default_disk_dir()
+
+    def test_no_tool_cache(self, monkeypatch):
+        """Without RUNNER_TOOL_CACHE the disk cache should be disabled."""
+        monkeypatch.delenv("RUNNER_TOOL_CACHE", raising=False)
+        assert resolve_disk_dir(True) is None
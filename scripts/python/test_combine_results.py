@@ -5,6 +5,7 @@ Tests merging of child agent outputs
 """
 
 import pytest
+import io
 import json
 import sys
 from pathlib import Path
@@ -42,6 +43,26 @@ except ImportError:
         raise NotImplementedError("format_combined_output not yet implemented")
 
 
+import combine_results
+from combine_results import (
+    CHILD_TRUNCATION_NOTICE,
+    MAX_CONTENT_SIZE,
+    TRUNCATION_NOTICE,
+    BudgetedWriter,
+    allocate_fair_share,
+    child_sort_key,
+    find_result_files,
+    load_child_result,
+    load_child_results,
+    format_as_markdown,
+    iter_jsonl_results,
+    main,
+    measure_section,
+    plan_fair_share,
+    stream_child_results
+)
+
+
 class TestCombineResults:
     """Test suite for result combination functionality"""
 
@@ -192,5 +213,233 @@ class TestCombineResults:
         assert len(combined.content) <= 65536
 
 
+def cut_reference(formatted, max_size=MAX_CONTENT_SIZE):
+    """The original format-everything-then-truncate behaviour."""
+    if len(formatted) > max_size:
+        return formatted[:max_size - 100] + TRUNCATION_NOTICE
+    return formatted
+
+
+class Unformattable:
+    """A result value that fails the test if it is ever formatted."""
+
+    def __str__(self):
+        pytest.fail("content past the size budget was formatted")
+
+
+class TestStreamingCombiner:
+    """Test suite for the streaming combiner"""
+
+    def test_matches_format_then_truncate(self):
+        """Streaming output should equal formatting everything and cutting it"""
+        for size in (10, 500, 900, 960, 990, 1000, 1100, 5000):
+            results = [
+                {"child_id": 1, "task": "A", "results": {"text": "a" * size}},
+                {"child_id": 2, "results": {"items": ["x", "y"]}},
+            ]
+            out = io.StringIO()
+            metadata = stream_child_results(results, out, max_size=1000)
+            expected = cut_reference(format_as_markdown(results), max_size=1000)
+            assert out.getvalue() == expected, size
+            assert metadata["truncated"] == (expected != format_as_markdown(results))
+
+    def test_stops_formatting_at_budget(self):
+        """Children after the budget is reached should not be formatted"""
+        def results():
+            yield {"child_id": 1, "results": {"content": "x" * 70000}}
+            yield {"child_id": 2, "results": {"content": Unformattable()}}
+            yield {"child_id": 3, "status": "failed", "error": "boom"}
+
+        metadata = stream_child_results(results(), io.StringIO())
+        assert metadata["truncated"] is True
+        assert metadata["children_count"] == 3
+        assert metadata["successful_children"] == 2
+        assert metadata["failed_children"] == 1
+        assert [child["child_id"] for child in metadata["children"]] == [1, 2, 3]
+
+    def test_no_successful_children(self):
+        """Only failed children should produce the no-results message"""
+        out = io.StringIO()
+        stream_child_results([{"child_id": 1, "status": "failed"}], out)
+        assert out.getvalue() == "No successful results to combine."
+
+    def test_empty_stream(self):
+        """An empty stream should match combine_child_results([])"""
+        out = io.StringIO()
+        assert stream_child_results(iter([]), out) == {"children_count": 0}
+        assert out.getvalue() == ""
+
+    def test_writer_holds_text_past_cut(self):
+        """Text between the cut point and the limit is kept when the total fits"""
+        out = io.StringIO()
+        writer = BudgetedWriter(out, max_size=200)
+        assert writer.write("a" * 150)
+        assert out.getvalue() == "a" * 100
+        writer.close()
+        assert out.getvalue() == "a" * 150
+
+    def test_jsonl_cli(self, tmp_path, monkeypatch, capsys):
+        """--jsonl should stream results from a file"""
+        path = tmp_path / "results.jsonl"
+        path.write_text(
+            json.dumps({"child_id": 1, "task": "A", "results": {"k": "v"}}) + "\n\n"
+            + json.dumps({"child_id": 2, "status": "timeout"}) + "\n"
+        )
+        with open(path) as f:
+            assert [r["child_id"] for r in iter_jsonl_results(f)] == [1, 2]
+
+        monkeypatch.setattr(sys, "argv", ["combine_results.py", "--jsonl", str(path)])
+        main()
+        captured = capsys.readouterr()
+        assert "## Child 1: A" in captured.out
+        metadata = json.loads(captured.err.strip().splitlines()[-1])
+        assert metadata["children_count"] == 2
+        assert metadata["failed_children"] == 1
+
+    def test_jsonl_cli_stdin_fair_share(self, monkeypatch, capsys):
+        """--jsonl - should spool stdin and apply the fair-share budget"""
+        lines = [
+            json.dumps({"child_id": 1, "results": {"content": "x" * 100000}}),
+            json.dumps({"child_id": 2, "results": {"finding": "kept"}}),
+        ]
+        monkeypatch.setattr(sys, "stdin", io.StringIO("\n".join(lines) + "\n"))
+        monkeypatch.setattr(sys, "argv", ["combine_results.py", "--jsonl", "-"])
+        main()
+        captured = capsys.readouterr()
+        assert "kept" in captured.out
+        assert len(captured.out) <= MAX_CONTENT_SIZE + 1
+        metadata = json.loads(captured.err.strip().splitlines()[-1])
+        assert [child["truncated"] for child in metadata["children"]] == [True, False]
+
+
+class TestFairShareBudget:
+    """Test suite for the fair-share output budget"""
+
+    def test_allocate_under_budget(self):
+        """Sections that fit should keep their full size"""
+        assert allocate_fair_share([10, 20, 30], 100) == [10, 20, 30]
+
+    def test_allocate_water_filling(self):
+        """Small sections keep their size; large ones share the rest equally"""
+        assert allocate_fair_share([1000, 10, 20], 530) == [500, 10, 20]
+        assert allocate_fair_share([900, 600, 30], 630) == [300, 300, 30]
+        assert allocate_fair_share([], 100) == []
+
+    def test_measure_section(self):
+        """Measured size should equal the formatted size"""
+        section = {"child_id": 3, "task": "T", "results": {"a": ["x", "y"], "b": {"c": 1}}}
+        assert measure_section(section) == len(format_as_markdown([section]))
+
+    def test_under_budget_output_unchanged(self):
+        """Results within the limit should be formatted exactly as before"""
+        results = [
+            {"child_id": 1, "task": "A", "results": {"k": "v"}},
+            {"child_id": 2, "status": "failed", "error": "boom"},
+            {"child_id": 3, "results": {"items": [1, 2]}},
+        ]
+        combined = combine_child_results(results)
+        assert combined.content == format_as_markdown([r for r in results if "results" in r])
+        assert combined.metadata["truncated"] is False
+        assert not any(child["truncated"] for child in combined.metadata["children"])
+
+    def test_verbose_child_does_not_starve_others(self):
+        """Children after a verbose child should still be shown in full"""
+        results = [
+            {"child_id": 1, "task": "Verbose", "results": {"content": "x" * 200000}},
+            {"child_id": 2, "task": "Short", "results": {"finding": "B is faster"}},
+            {"child_id": 3, "task": "Short too", "results": {"finding": "C is smaller"}},
+        ]
+        combined = combine_child_results(results)
+        assert len(combined.content) <= MAX_CONTENT_SIZE
+        assert "B is faster" in combined.content
+        assert "C is smaller" in combined.content
+        assert CHILD_TRUNCATION_NOTICE in combined.content
+        children = combined.metadata["children"]
+        assert combined.metadata["truncated"] is True
+        assert [child["truncated"] for child in children] == [True, False, False]
+        assert children[0]["output_chars"] == measure_section(results[0] | {"task": "Verbose"})
+        assert children[0]["shown_chars"] < children[0]["output_chars"]
+
+    def test_truncated_child_measured_once_while_streaming(self, monkeypatch):
+        """Streaming should not re-measure a truncated child to report its size"""
+        results = [
+            {"child_id": 1, "task": "Verbose", "results": {"content": ["x" * 100] * 2000}},
+            {"child_id": 2, "task": "Short", "results": {"finding": "B is faster"}},
+        ]
+        allocations = plan_fair_share(results)
+        expected = measure_section(results[0])
+        monkeypatch.setattr(combine_results, "measure_section", None)
+        metadata = stream_child_results(results, io.StringIO(), allocations=allocations)
+        assert metadata["children"][0]["output_chars"] == expected
+
+    def test_verbose_children_share_equally(self):
+        """Equally verbose children should get equal shares"""
+        results = [{"child_id": i, "results": {"content": str(i) * 100000}} for i in range(1, 4)]
+        combined = combine_child_results(results)
+        assert len(combined.content) <= MAX_CONTENT_SIZE
+        shown = [child["shown_chars"] for child in combined.metadata["children"]]
+        assert max(shown) - min(shown) <= 1
+        assert all(str(i) * 100 in combined.content for i in range(1, 4))
+
+    def test_plan_skips_failed_children(self):
+        """Failed children should not take a share of the budget"""
+        results = [{"child_id": 1, "status": "failed"}, {"child_id": 2, "results": {"k": "v"}}]
+        assert plan_fair_share(results) == [None, measure_section({"child_id": 2, "task": "", "results": {"k": "v"}})]
+
+
+class TestArtifactLoading:
+    """Test suite for loading one result artifact per child"""
+
+    def write_artifacts(self, directory, artifacts):
+        for name, content in artifacts.items():
+            (directory / name).write_text(content if isinstance(content, str) else json.dumps(content))
+
+    def test_natural_child_order(self, tmp_path):
+        """Children should be combined in natural child-id order"""
+        self.write_artifacts(tmp_path, {
+            f"child-{i}.json": {"child_id": i, "results": {"k": i}} for i in (10, 2, 1)
+        })
+        results = load_child_results(find_result_files(directory=str(tmp_path)))
+        assert [r["child_id"] for r in results] == [1, 2, 10]
+
+    def test_sort_key(self):
+        """String ids should sort naturally as well"""
+        assert sorted(["C10", "C2", "C1"], key=child_sort_key) == ["C1", "C2", "C10"]
+        assert sorted([3, "2", 1], key=child_sort_key) == [1, "2", 3]
+
+    def test_corrupt_file_becomes_failed_child(self, tmp_path):
+        """A corrupt artifact should not abort the combination"""
+        self.write_artifacts(tmp_path, {
+            "child-1.json": {"child_id": 1, "results": {"k": "v"}},
+            "child-2.json": "{not json",
+            "child-3.json": ["not", "an", "object"],
+        })
+        results = load_child_results(find_result_files(directory=str(tmp_path)))
+        assert [r["child_id"] for r in results] == [1, "2", "3"]
+        assert [r.get("status") for r in results] == [None, "failed", "failed"]
+        combined = combine_child_results(results)
+        assert combined.metadata["successful_children"] == 1
+        assert combined.metadata["failed_children"] == 2
+        assert any("child-2.json" in warning for warning in combined.metadata["warnings"])
+
+    def test_missing_child_id_from_file_name(self, tmp_path):
+        """child_id should default to the number in the file name"""
+        self.write_artifacts(tmp_path, {"result-child-4.json": {"results": {"k": "v"}}})
+        assert load_child_result(str(tmp_path / "result-child-4.json"))["child_id"] == "4"
+
+    def test_glob_cli(self, tmp_path, monkeypatch, capsys):
+        """--glob should load every matching artifact"""
+        self.write_artifacts(tmp_path, {
+            "child-2.json": {"child_id": 2, "task": "Second", "results": {"k": "v"}},
+            "child-1.json": {"child_id": 1, "task": "First", "results": {"k": "v"}},
+            "notes.txt": "ignored",
+        })
+        monkeypatch.setattr(sys, "argv", ["combine_results.py", "--glob", str(tmp_path / "child-*.json")])
+        main()
+        captured = capsys.readouterr()
+        assert captured.out.index("First") < captured.out.index("Second")
+        assert json.loads(captured.err.strip().splitlines()[-1])["children_count"] == 2
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Unit tests for completion_pipeline.py
+"""
+
+import pytest
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import analyze_completions
+from completion_pipeline import (
+    apply_verification,
+    main,
+    pull_request_problem,
+    render_summary,
+    run_completion_pipeline,
+    verify_pull_requests,
+)
+from github_client import GitHubClient
+
+
+def child(comment_id, text):
+    return {"id": comment_id, "body": text}
+
+
+ALL_SUCCESS = [
+    child(1, "🤖 Child C1: Task completed successfully. PR #11"),
+    child(2, "🤖 Child C2: Task completed successfully. PR #12"),
+    child(3, "Regular comment"),
+    child(4, "🤖 Child C3: Done, PR #13 ready"),
+]
+
+
+def rest_pr(number, head, base="gitaiteams/issue-7", state="open", merged=False, repo="o/r"):
+    return {"number": number, "state": state, "merged_at": "2024-05-01T11:00:00Z" if merged else None,
+            "head": {"ref": head, "repo": {"full_name": repo}}, "base": {"ref": base}}
+
+
+class PullsHandler(BaseHTTPRequestHandler):
+    """GET /repos/o/r/pulls/{number} from server.pulls."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        number = self.path.rsplit("/", 1)[-1]
+        pr = self.server.pulls.get(int(number)) if number.isdigit() else None
+        body = json.dumps(pr if pr is not None else {"message": "Not Found"}).encode()
+        self.send_response(200 if pr is not None else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def pulls_server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), PullsHandler)
+    httpd.pulls = {}
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestRunCompletionPipeline:
+    """Test suite for run_completion_pipeline."""
+
+    def test_all_success_skips_llm(self):
+        """Unanimous success with PRs should be decided without Claude."""
+        result = run_completion_pipeline(ALL_SUCCESS)
+        assert result["child_count"] == 3
+        assert result["threshold_met"] is True
+        assert result["decision"] == "merge"
+        assert result["needs_llm"] is False
+        assert result["pr_numbers"] == [11, 12, 13]
+        assert result["status_counts"]["success"] == 3
+
+    def test_below_threshold_waits(self):
+        """Below the threshold nothing should be decided yet."""
+        result = run_completion_pipeline(ALL_SUCCESS[:2])
+        assert result["decision"] == "wait"
+        assert result["needs_llm"] is False
+        assert result["pr_numbers"] == []
+
+    def test_expected_count_meets_threshold(self):
+        """The expected count from the issue body should also satisfy the threshold."""
+        result = run_completion_pipeline(ALL_SUCCESS[:2], issue_body="Expected children: 2")
+        assert result["threshold_met"] is True
+        assert result["expected_count"] == 2
+
+    def test_mixed_statuses_need_llm(self):
+        """Low-confidence mixed results should be flagged for Claude."""
+        comments = ALL_SUCCESS[:2] + [child(5, "🤖 Child C3: Failed with error")]
+        result = run_completion_pipeline(comments)
+        assert result["merge_strategy"] == "merge"
+        assert result["needs_llm"] is True
+        assert result["decision"] == "llm_analysis"
+        assert "confidence" in result["needs_llm_reason"]
+
+    def test_missing_pr_number_needs_llm(self):
+        """A merge without every PR number cannot be done automatically."""
+        comments = ALL_SUCCESS[:2] + [child(5, "🤖 Child C3: Task completed")]
+        result = run_completion_pipeline(comments)
+        assert result["needs_llm"] is True
+        assert "PR number" in result["needs_llm_reason"]
+
+    def test_executor_marker_is_merged(self):
+        """The marker ai-child-executor posts carries the PR number needed to merge."""
+        comments = [child(n, f"🤖 Child C{n} complete: PR #{20 + n} created successfully") for n in (1, 2)]
+        result = run_completion_pipeline(comments, threshold=2)
+        assert result["decision"] == "merge"
+        assert result["needs_llm"] is False
+        assert result["pr_numbers"] == [21, 22]
+
+    def test_latest_report_per_child_is_classified(self):
+        """A retried child should be classified from its latest report."""
+        comments = [child(1, "🤖 Child C1: Failed with error")] + ALL_SUCCESS[:3] + [
+            child(9, "🤖 Child C3: completed, PR #13")]
+        result = run_completion_pipeline(comments)
+        assert result["duplicates"] == {"C1": 1}
+        assert [c["status"] for c in result["children"]] == ["success"] * 3
+
+    def test_lower_confidence_threshold(self):
+        """A lower confidence threshold should let more decisions through."""
+        comments = ALL_SUCCESS[:2] + [child(5, "🤖 Child C3: Failed with error")]
+        result = run_completion_pipeline(comments, confidence_threshold=0.5)
+        assert result["needs_llm"] is False
+        assert result["pr_numbers"] == [11, 12]
+
+
+class TestVerifyPullRequests:
+    """Test suite for resolving PR numbers before merging."""
+
+    def test_pull_request_problem(self):
+        """Only open PRs from a child branch of this repo into the parent branch pass."""
+        assert pull_request_problem(rest_pr(1, "gitaiteams/issue-7-child-1"), "o/r", 7) is None
+        assert pull_request_problem(rest_pr(1, "gitaiteams/issue-7-child-1", state="closed", merged=True),
+                                    "o/r", 7) is None
+        assert "not a child branch" in pull_request_problem(rest_pr(1, "feature/x"), "o/r", 7)
+        assert "not a child branch" in pull_request_problem(rest_pr(1, "gitaiteams/issue-70-child-1"), "o/r", 7)
+        assert "base main" in pull_request_problem(rest_pr(1, "gitaiteams/issue-7-child-1", base="main"),
+                                                   "o/r", 7)
+        assert "x/r" in pull_request_problem(rest_pr(1, "gitaiteams/issue-7-child-1", repo="x/r"), "o/r", 7)
+        assert "closed" in pull_request_problem(rest_pr(1, "gitaiteams/issue-7-child-1", state="closed"),
+                                                "o/r", 7)
+
+    def test_verify_against_api(self, pulls_server):
+        """Each number is looked up; unrelated or unknown PRs are rejected."""
+        pulls_server.pulls = {
+            11: rest_pr(11, "gitaiteams/issue-7-child-1"),
+            12: rest_pr(12, "gitaiteams/issue-7-child-2", state="closed", merged=True),
+            13: rest_pr(13, "release", base="main"),
+        }
+        host, port = pulls_server.server_address
+        with GitHubClient(api_url=f"http://{host}:{port}") as client:
+            verified = verify_pull_requests(client, "o/r", 7, [11, 12, 13, 14])
+        assert verified["open"] == [11]
+        assert verified["merged"] == [12]
+        assert set(verified["rejected"]) == {13, 14}
+        assert verified["rejected"][14] == "not found"
+
+    def test_rejection_needs_llm(self):
+        """A rejected PR cancels the automatic merge."""
+        result = run_completion_pipeline(ALL_SUCCESS)
+        apply_verification(result, {"open": [11, 12], "merged": [], "rejected": {13: "not found"}})
+        assert result["decision"] == "llm_analysis"
+        assert result["needs_llm"] is True
+        assert result["pr_numbers"] == []
+        assert result["rejected_prs"] == {"13": "not found"}
+        assert "PR #13 not found" in result["needs_llm_reason"]
+
+    def test_cli_verifies_prs(self, pulls_server, monkeypatch, capsys):
+        """With --issue-number, only verified PRs are left to merge."""
+        monkeypatch.setattr(analyze_completions, "_cache", None)
+        pulls_server.pulls = {n: rest_pr(n, f"gitaiteams/issue-7-child-{n - 10}") for n in (11, 12, 13)}
+        host, port = pulls_server.server_address
+        monkeypatch.setenv("GITHUB_API_URL", f"http://{host}:{port}")
+        monkeypatch.setattr(sys, "argv", ["completion_pipeline.py", "--comments", json.dumps(ALL_SUCCESS),
+                                          "--issue-number", "7", "--repo", "o/r"])
+        assert main() == 0
+        result = json.loads(capsys.readouterr().out)
+        assert result["decision"] == "merge"
+        assert result["pr_numbers"] == [11, 12, 13]
+
+
+class TestRenderSummary:
+    """Test suite for render_summary."""
+
+    def test_summary_lists_children(self):
+        """The summary comment should list each child and the decision."""
+        summary = render_summary(run_completion_pipeline(ALL_SUCCESS))
+        assert summary.startswith("## 🤖 Completion Analysis")
+        assert "✅ Child C1: success - PR #11" in summary
+        assert "merge (confidence 0.95)" in summary
+        assert "no LLM analysis was needed" in summary
+
+
+class TestMain:
+    """Test suite for the CLI."""
+
+    def test_cli_with_summary_file(self, tmp_path, monkeypatch, capsys):
+        """The CLI should stream a comments file and write the summary."""
+        monkeypatch.setattr(analyze_completions, "_cache", None)
+        comments_path = tmp_path / "comments.json"
+        comments_path.write_text(json.dumps(ALL_SUCCESS))
+        summary_path = tmp_path / "summary.md"
+        monkeypatch.setattr(sys, "argv", ["completion_pipeline.py", "--comments-file", str(comments_path),
+                                          "--summary-file", str(summary_path)])
+        assert main() == 0
+        result = json.loads(capsys.readouterr().out)
+        assert result["decision"] == "merge"
+        assert result["classification_cache"]["misses"] == 3
+        assert "Completion Analysis" in summary_path.read_text()
+
+    def test_cli_disk_cache(self, tmp_path, monkeypatch, capsys):
+        """A second run with the disk cache should not re-classify any child."""
+        monkeypatch.setattr(analyze_completions, "_cache", None)
+        monkeypatch.setenv("RUNNER_TOOL_CACHE", str(tmp_path))
+        monkeypatch.setattr(sys, "argv", ["completion_pipeline.py", "--comments", json.dumps(ALL_SUCCESS),
+                                          "--disk-cache"])
+        assert main() == 0
+        first = json.loads(capsys.readouterr().out)
+        assert main() == 0
+        second = json.loads(capsys.readouterr().out)
+        assert first["classification_cache"]["misses"] == 3
+        assert second["classification_cache"]["disk_hits"] == 3
+        assert second["classification_cache"]["misses"] == 0
+        assert second["children"] == first["children"]
+
+    def test_cli_bad_json(self, monkeypatch, capsys):
+        """Malformed comments should produce an error payload."""
+        monkeypatch.setattr(analyze_completions, "_cache", None)
+        monkeypatch.setattr(sys, "argv", ["completion_pipeline.py", "--comments", "{bad"])
+        assert main() == 1
+        assert json.loads(capsys.readouterr().out)["needs_llm"] is False
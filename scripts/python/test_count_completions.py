@@ -4,8 +4,31 @@ Unit tests for count_completions.py
 """
 
 import pytest
+import io
 import json
-from count_completions import count_child_markers, extract_expected_count
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from count_completions import (
+    EXPECTED_COUNT_RULES,
+    count_child_markers,
+    evaluate_completion,
+    advance_cursor,
+    extract_expected_count,
+    format_cursor_marker,
+    has_child_marker,
+    evaluate_batch_record,
+    index_child_markers,
+    iter_batch_results,
+    match_expected_count,
+    parse_child_marker,
+    parse_cursor_marker,
+    word_to_number,
+    main
+)
+from io_utils import iter_json_array
 
 
 class TestCountChildMarkers:
@@ -118,4 +141,459 @@ class TestExtractExpectedCount:
     def test_zero_is_valid(self):
         """Zero should be a valid count."""
         body = "Expected children: 0"
-        assert extract_expected_count(body) == 0
\ No newline at end of file
+        assert extract_expected_count(body) == 0
+
+
+class TestStreamingInput:
+    """Test suite for counting streamed comments."""
+
+    def test_counting_is_incremental(self):
+        """count_child_markers should consume the stream lazily."""
+        consumed = []
+
+        def comments():
+            for item in iter_json_array(io.StringIO('[{"body": "🤖 Child C1"}, {"body": "x"}]')):
+                consumed.append(item)
+                yield item
+
+        assert count_child_markers(comments()) == 1
+        assert len(consumed) == 2
+
+
+class TestCommentsFileInput:
+    """Test suite for --comments-file and --comments - CLI input."""
+
+    def test_comments_file(self, tmp_path, monkeypatch, capsys):
+        """Comments should be read from a file path."""
+        path = tmp_path / "comments.json"
+        path.write_text(json.dumps([{"body": "🤖 Child C1"}, {"body": "🤖 Child C2"}]))
+        monkeypatch.setattr(sys, "argv", ["count_completions.py", "--comments-file", str(path),
+                                          "--threshold", "2"])
+        assert main() == 0
+        result = json.loads(capsys.readouterr().out)
+        assert result["child_count"] == 2
+        assert result["threshold_met"] is True
+
+    def test_comments_from_stdin(self, monkeypatch, capsys):
+        """'--comments -' should stream comments from stdin."""
+        monkeypatch.setattr(sys, "stdin", io.StringIO('[{"body": "🤖 Child C1"}]'))
+        monkeypatch.setattr(sys, "argv", ["count_completions.py", "--comments", "-"])
+        assert main() == 0
+        assert json.loads(capsys.readouterr().out)["child_count"] == 1
+
+    def test_malformed_file_reports_error(self, tmp_path, monkeypatch, capsys):
+        """A malformed comments file should produce the error payload."""
+        path = tmp_path / "comments.json"
+        path.write_text('[{"body": "🤖 Child C1"},')
+        monkeypatch.setattr(sys, "argv", ["count_completions.py", "--comments-file", str(path)])
+        assert main() == 1
+        result = json.loads(capsys.readouterr().out)
+        assert "error" in result
+        assert result["threshold_met"] is False
+
+
+class TestIncrementalCounting:
+    """Test suite for cursor-based incremental counting."""
+
+    COMMENTS = [
+        {"id": 9, "body": "<!-- gitai-status-comment -->\n## Status", "updated_at": "2024-01-01T00:04:00Z"},
+        {"id": 10, "body": "🤖 Child C1: done", "updated_at": "2024-01-01T00:00:00Z"},
+        {"id": 11, "body": "Regular comment", "updated_at": "2024-01-01T00:01:00Z"},
+        {"id": 12, "body": "🤖 Child C2: done", "updated_at": "2024-01-01T00:02:00Z"},
+        {"id": 13, "body": "🤖 Child C2: done again", "updated_at": "2024-01-01T00:03:00Z"},
+    ]
+
+    def test_full_scan_without_cursor(self):
+        """Without a cursor every comment is scanned; since is the newest updated_at."""
+        cursor = advance_cursor(self.COMMENTS)
+        assert cursor["count"] == 3
+        assert cursor["children"] == ["C1", "C2"]
+        assert cursor["last_id"] == 13
+        assert cursor["since"] == "2024-01-01T00:04:00Z"
+        assert cursor["analysis"] is False
+
+    def test_only_new_comments_counted(self):
+        """Comments at or before last_id are skipped, even if they were edited."""
+        cursor = advance_cursor(self.COMMENTS[:3])
+        edited = dict(self.COMMENTS[1], body="🤖 Child C5: edited", updated_at="2024-01-01T00:05:00Z")
+        new = [edited, self.COMMENTS[3], {"id": 14, "body": "## 🤖 Completion Analysis",
+                                          "updated_at": "2024-01-01T00:06:00Z"}]
+        cursor = advance_cursor(new, cursor)
+        assert cursor["new_count"] == 1
+        assert cursor["count"] == 2
+        assert cursor["children"] == ["C1", "C2"]
+        assert cursor["last_id"] == 14
+        assert cursor["analysis"] is True
+        assert cursor["since"] == "2024-01-01T00:06:00Z"
+
+    def test_no_new_comments_keeps_cursor(self):
+        """With nothing new the cursor is unchanged."""
+        cursor = advance_cursor(self.COMMENTS)
+        again = advance_cursor(self.COMMENTS, dict(cursor))
+        assert again.pop("new_count") == 0
+        cursor.pop("new_count")
+        assert again == cursor
+
+    def test_marker_round_trip(self):
+        """A formatted marker parses back to the same cursor."""
+        cursor = {"last_id": 42, "since": "2024-01-01T00:00:00Z", "count": 3,
+                  "children": ["C1", "C2"], "anonymous": 1, "analysis": True}
+        text = f"## Status\n{format_cursor_marker(cursor)}\nMore text"
+        assert parse_cursor_marker(text) == cursor
+
+    def test_missing_or_malformed_marker(self):
+        """Absent or malformed markers parse to None."""
+        assert parse_cursor_marker("no marker here") is None
+        assert parse_cursor_marker("<!-- gitai-completion-cursor: last_id=abc -->") is None
+        assert parse_cursor_marker("<!-- gitai-completion-cursor: count=1 children=x -->") is None
+
+    def test_dedupe_with_cursor(self):
+        """With dedupe the cursor's child ids count once each."""
+        cursor = parse_cursor_marker("<!-- gitai-completion-cursor: last_id=11 count=1 children=C1 -->")
+        result = evaluate_completion(self.COMMENTS, threshold=2, dedupe=True, cursor=cursor)
+        assert result["child_count"] == 2
+        assert result["new_count"] == 2
+        assert result["threshold_met"] is True
+
+    def test_cli_resumes_from_marker(self, monkeypatch, capsys):
+        """The CLI resumes from a cursor marker and emits the new one."""
+        marker = "<!-- gitai-completion-cursor: last_id=11 count=1 children=C1 -->"
+        monkeypatch.setattr(sys, "argv", ["count_completions.py",
+                                          "--comments", json.dumps(self.COMMENTS),
+                                          "--cursor", marker, "--threshold", "3"])
+        assert main() == 0
+        result = json.loads(capsys.readouterr().out)
+        assert result["child_count"] == 3
+        assert result["new_count"] == 2
+        assert result["threshold_met"] is True
+        assert result["analysis_exists"] is False
+        assert result["cursor"]["last_id"] == 13
+        assert parse_cursor_marker(result["cursor_marker"])["count"] == 3
+
+
+class IssueHandler(BaseHTTPRequestHandler):
+    """Comments of issue 5 (filtered by ?since=) and its status comment (id 9)."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def send_json(self, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == "/repos/o/r/issues/comments/9":
+            self.send_json(self.server.comments[0])
+            return
+        since = parse_qs(parts.query).get("since", [None])[0]
+        self.server.listings.append(since)
+        self.send_json([c for c in self.server.comments if since is None or c["updated_at"] >= since])
+
+    def do_PATCH(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["body"]
+        self.server.comments[0] = dict(self.server.comments[0], body=body, updated_at="2024-01-01T00:09:00Z")
+        self.send_json(self.server.comments[0])
+
+    def log_message(self, *args):
+        pass
+
+
+class TestPersistedCursor:
+    """Test suite for the cursor kept in the status comment between runs."""
+
+    @pytest.fixture
+    def server(self):
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), IssueHandler)
+        httpd.comments = [dict(comment) for comment in TestIncrementalCounting.COMMENTS]
+        httpd.listings = []
+        thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+        thread.start()
+        yield httpd
+        httpd.shutdown()
+        httpd.server_close()
+
+    def run_main(self, server, monkeypatch, capsys):
+        host, port = server.server_address
+        monkeypatch.setenv("GITHUB_API_URL", f"http://{host}:{port}")
+        monkeypatch.setattr(sys, "argv", ["count_completions.py", "--fetch-issue", "5", "--repo", "o/r",
+                                          "--threshold", "3", "--dedupe", "--persist-cursor"])
+        assert main() == 0
+        return json.loads(capsys.readouterr().out)
+
+    def test_cursor_saved_and_resumed(self, server, monkeypatch, capsys):
+        """The first run scans everything; the next one only fetches comments updated since."""
+        first = self.run_main(server, monkeypatch, capsys)
+        assert first["child_count"] == 2
+        assert first["cursor_persisted"] is True
+        assert first["cursor_marker"] in server.comments[0]["body"]
+        assert server.comments[0]["body"].startswith("<!-- gitai-status-comment -->")
+
+        server.comments.append({"id": 15, "body": "🤖 Child C3: done", "updated_at": "2024-01-01T00:10:00Z"})
+        server.listings.clear()
+        second = self.run_main(server, monkeypatch, capsys)
+        assert server.listings[-1] == first["cursor"]["since"]
+        assert second["new_count"] == 1
+        assert second["child_count"] == 3
+        assert second["threshold_met"] is True
+        assert server.comments[0]["body"].count("gitai-completion-cursor") == 1
+
+
+def reference_match(issue_body):
+    """Per-rule re.search reference for the single-pass matcher."""
+    for rule, pattern in EXPECTED_COUNT_RULES:
+        match = re.search(pattern, issue_body, re.IGNORECASE)
+        if match:
+            value = match.group(rule)
+            count = int(value) if value.isdigit() else word_to_number(value)
+            if count is not None:
+                return count, rule
+    return None
+
+
+class TestCompiledMatchers:
+    """Test suite for the precompiled marker and expected-count matchers."""
+
+    def test_reports_rule_that_fired(self):
+        """match_expected_count should name the winning rule."""
+        assert match_expected_count("Expected children: 4") == (4, "expected_children")
+        assert match_expected_count("Please Evaluate 2 different tools") == (2, "different_items")
+        assert match_expected_count("Execute these three tasks now") == (3, "execute_these_tasks")
+        assert match_expected_count("nothing to see") is None
+
+    def test_priority_beats_position(self):
+        """A higher-priority rule later in the text should win."""
+        body = "Compare 7 different libraries.\nChild count: 2"
+        assert match_expected_count(body) == (2, "child_count")
+
+    def test_unusable_word_falls_through(self):
+        """An unparseable word hit should fall through to lower rules."""
+        body = "Run these many tasks in child agents, 3 different approaches"
+        assert match_expected_count(body) == (3, "different_items")
+
+    def test_matches_per_rule_reference(self):
+        """The single pass should agree with one search per rule."""
+        bodies = [
+            "This is a parent issue that will be split into 3 child agents.\nExpected children: 3",
+            "Execute these two tasks in child instances",
+            "Run 4 parallel jobs and run them in parallel, also 2 different things",
+            "Evaluate 5 different frameworks",
+            "unexpected children: 9 and 1 task in child",
+            "x12 child agents",
+            "these ten tasks in child; Execute these one tasks",
+            "",
+        ]
+        for body in bodies:
+            assert match_expected_count(body) == reference_match(body), body
+
+    def test_child_marker_any_whitespace(self):
+        """The marker regex should accept any whitespace after the emoji."""
+        assert has_child_marker("🤖 Child C1")
+        assert has_child_marker("🤖\tChild C1")
+        assert has_child_marker("🤖   Child C1")
+        assert not has_child_marker("🤖 Completion Analysis by Child")
+        assert not has_child_marker("🤖 child lowercase")
+
+
+class TestDeduplicatedCounting:
+    """Test suite for child-id keyed completion counting."""
+
+    def test_parse_child_marker_ids(self):
+        """Child ids and PR numbers should be parsed and normalized."""
+        assert parse_child_marker("🤖 Child C1: done, PR #12") == {"child_id": "C1", "pr_number": 12}
+        assert parse_child_marker("🤖 Child child-3 finished")["child_id"] == "C3"
+        assert parse_child_marker("🤖Child #2 https://github.com/o/r/pull/44") == {"child_id": "C2", "pr_number": 44}
+        assert parse_child_marker("🤖 Child: Task 1 done") == {"child_id": None, "pr_number": None}
+        assert parse_child_marker("Regular comment") is None
+
+    def test_duplicates_count_once(self):
+        """Repeated reports from one child should count once."""
+        comments = [
+            {"id": 1, "body": "🤖 Child C1: progress update"},
+            {"id": 2, "body": "🤖 Child C2: done, PR #21"},
+            {"id": 3, "body": "🤖 Child C1: done, PR #20"},
+            {"id": 4, "body": "Regular comment"},
+        ]
+        index = index_child_markers(comments)
+        assert index.marker_count == 3
+        assert index.unique_count == 2
+        assert index.child_ids() == ["C1", "C2"]
+        assert index.duplicates == {"C1": 1}
+        assert index.children["C1"] == {"comment_id": 3, "pr_number": 20, "created_at": None}
+
+    def test_latest_keeps_earlier_pr_number(self):
+        """A later report without a PR should keep the known PR number."""
+        comments = [
+            {"id": 1, "body": "🤖 Child C1: done, PR #20"},
+            {"id": 2, "body": "🤖 Child C1: retried"},
+        ]
+        assert index_child_markers(comments).children["C1"]["pr_number"] == 20
+
+    def test_anonymous_markers_counted_individually(self):
+        """Markers without an id cannot be deduplicated and count individually."""
+        comments = [{"body": "🤖 Child: done"}, {"body": "🤖 Child: done"}, {"body": "🤖 Child C10 done"}]
+        index = index_child_markers(comments)
+        assert index.anonymous_markers == 2
+        assert index.unique_count == 3
+
+    def test_cli_dedupe(self, monkeypatch, capsys):
+        """--dedupe should base the threshold on unique children."""
+        comments = [{"id": i, "body": "🤖 Child C1: update"} for i in range(1, 4)]
+        monkeypatch.setattr(sys, "argv", ["count_completions.py", "--comments", json.dumps(comments),
+                                          "--threshold", "3", "--dedupe"])
+        assert main() == 0
+        result = json.loads(capsys.readouterr().out)
+        assert result["child_count"] == 1
+        assert result["marker_count"] == 3
+        assert result["threshold_met"] is False
+        assert result["duplicates"] == {"C1": 2}
+        assert result["children"]["C1"]["comment_id"] == 3
+
+
+class TestBatchMode:
+    """Test suite for multi-issue JSONL batch evaluation."""
+
+    RECORDS = [
+        {"issue_number": 1, "issue_body": "Expected children: 2",
+         "comments": [{"body": "🤖 Child C1: done"}, {"body": "🤖 Child C2: done"}]},
+        {"issue_number": 2, "issue_body": "", "comments": [{"body": "🤖 Child C1: done"}]},
+        {"issue_number": 3, "comments": [], "threshold": 0},
+    ]
+
+    def lines(self):
+        return [json.dumps(record) + "\n" for record in self.RECORDS]
+
+    def test_record_result(self):
+        """A record should yield the single-issue result plus its number."""
+        result = evaluate_batch_record(self.RECORDS[0])
+        assert result["issue_number"] == 1
+        assert result["child_count"] == 2
+        assert result["expected_count"] == 2
+        assert result["threshold_met"] is True
+
+    def test_results_in_input_order(self):
+        """Results should come back one per line, in order."""
+        results = list(iter_batch_results(self.lines() + ["\n"]))
+        assert [r["issue_number"] for r in results] == [1, 2, 3]
+        assert [r["threshold_met"] for r in results] == [True, False, True]
+
+    def test_process_pool_matches_serial(self):
+        """Fanning out across processes should not change the results."""
+        lines = self.lines() * 5
+        assert list(iter_batch_results(lines, workers=2)) == list(iter_batch_results(lines))
+
+    def test_bad_records_reported_inline(self):
+        """Malformed lines and records should produce error results."""
+        results = list(iter_batch_results(["{bad json}\n", "[1, 2]\n",
+                                           '{"issue_number": 9, "comments": "x"}\n']))
+        assert results[0]["line"] == 1
+        assert all("error" in r for r in results)
+        assert results[2]["issue_number"] == 9
+
+    def test_cli_batch(self, tmp_path, monkeypatch, capsys):
+        """--batch should print one JSON line per issue."""
+        path = tmp_path / "issues.jsonl"
+        path.write_text("".join(self.lines()))
+        monkeypatch.setattr(sys, "argv", ["count_completions.py", "--batch", str(path), "--dedupe"])
+        assert main() == 0
+        lines = capsys.readouterr().out.strip().splitlines()
+        assert [json.loads(line)["issue_number"] for line in lines] == [1, 2, 3]
+        assert json.loads(lines[0])["unique_children"] == ["C1", "C2"]
+
+
+COMMENT_PAGES = 5
+
+
+class CommentsHandler(BaseHTTPRequestHandler):
+    """Serves issue comments in pages of two, one child marker per page."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        page = int(parse_qs(urlsplit(self.path).query).get("page", ["1"])[0])
+        with self.server.lock:
+            self.server.pages.append(page)
+        comments = [{"id": page * 10, "body": f"🤖 Child C{page}: done"}, {"id": page * 10 + 1, "body": "note"}]
+        body = json.dumps(comments).encode()
+        host, port = self.server.server_address
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Link", f'<http://{host}:{port}{self.path.split("?")[0]}'
+                                 f'?per_page=100&page={COMMENT_PAGES}>; rel="last"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestEarlyStop:
+    """Test suite for stopping once the threshold or expected count is met."""
+
+    def test_limit_stops_reading(self):
+        """count_child_markers should not read past the limit."""
+        read = []
+
+        def comments():
+            for i in range(10):
+                read.append(i)
+                yield {"body": f"🤖 Child C{i}"}
+        assert count_child_markers(comments(), limit=3) == 3
+        assert read == [0, 1, 2]
+
+    def test_stop_at_expected_count(self):
+        """The lower of the threshold and expected count is the limit."""
+        comments = [{"body": f"🤖 Child C{i}"} for i in range(6)]
+        result = evaluate_completion(iter(comments), "Expected children: 2", threshold=4, stop_early=True)
+        assert result["child_count"] == 2
+        assert result["count_limit"] == 2
+        assert result["threshold_met"] is True
+
+    def test_stop_early_needs_plain_counting(self):
+        """Deduplication and cursors need every comment."""
+        with pytest.raises(ValueError):
+            evaluate_completion([], dedupe=True, stop_early=True)
+
+    @pytest.fixture
+    def server(self):
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), CommentsHandler)
+        httpd.pages = []
+        httpd.lock = threading.Lock()
+        thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+        thread.start()
+        yield httpd
+        httpd.shutdown()
+        httpd.server_close()
+
+    def fetch_args(self, server, monkeypatch, *args):
+        host, port = server.server_address
+        monkeypatch.setenv("GITHUB_API_URL", f"http://{host}:{port}")
+        monkeypatch.delenv("GH_TOKEN", raising=False)
+        monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+        monkeypatch.setattr(sys, "argv", ["count_completions.py", "--fetch-issue", "7",
+                                          "--repo", "o/r", *args])
+
+    def test_cli_fetch_all_pages(self, server, monkeypatch, capsys):
+        """--fetch-issue counts markers across every page."""
+        self.fetch_args(server, monkeypatch, "--threshold", "3")
+        assert main() == 0
+        result = json.loads(capsys.readouterr().out)
+        assert result["child_count"] == COMMENT_PAGES
+        assert result["pages_fetched"] == result["pages_total"] == COMMENT_PAGES
+        assert sorted(server.pages) == list(range(1, COMMENT_PAGES + 1))
+
+    def test_cli_fetch_stops_early(self, server, monkeypatch, capsys):
+        """--stop-early stops consuming pages once the threshold is met."""
+        self.fetch_args(server, monkeypatch, "--threshold", "2", "--stop-early")
+        assert main() == 0
+        result = json.loads(capsys.readouterr().out)
+        assert result["child_count"] == 2
+        assert result["threshold_met"] is True
+        assert result["pages_fetched"] == 2
+        assert result["pages_total"] == COMMENT_PAGES
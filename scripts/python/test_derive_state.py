@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Unit tests for derive_state.py
+"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import derive_state
+from derive_state import (
+    STATE_CHILDREN_COMPLETE,
+    STATE_CHILDREN_RUNNING,
+    STATE_CHILDREN_SPAWNING,
+    STATE_ISSUE_CLOSED,
+    STATE_ISSUE_NOT_FOUND,
+    STATE_NO_PARENT_BRANCH,
+    STATE_SINGLE_TASK,
+    Snapshot,
+    fetch_snapshot_sources,
+    find_state_files,
+)
+from github_client import GitHubClient, normalize_pull_request
+
+
+def pr(number, state, base, head=None):
+    """A pull request as printed by gh pr list --json."""
+    return {"number": number, "state": state, "baseRefName": base, "headRefName": head or f"b{number}"}
+
+
+REFS = [
+    "origin/main",
+    "origin/gitaiteams/issue-1",
+    "origin/gitaiteams/issue-2",
+    "origin/gitaiteams/issue-2-child-1",
+    "origin/gitaiteams/issue-2-child-2",
+    "origin/gitaiteams/issue-3",
+    "origin/gitaiteams/issue-3-child-1",
+    "origin/gitaiteams/issue-3-child-2",
+    "origin/gitaiteams/issue-4",
+    "origin/gitaiteams/issue-4-child-1",
+    "origin/gitaiteams/issue-4-child-2",
+    "origin/gitaiteams/issue-4-child-2-child-1",
+]
+
+PULL_REQUESTS = [
+    pr(10, "OPEN", "gitaiteams/issue-2"),
+    pr(11, "MERGED", "gitaiteams/issue-2"),
+    pr(12, "MERGED", "gitaiteams/issue-3"),
+    pr(13, "MERGED", "gitaiteams/issue-3"),
+    pr(14, "OPEN", "gitaiteams/issue-4"),
+    pr(15, "CLOSED", "gitaiteams/issue-4"),
+]
+
+
+class TestNormalization:
+    """Test suite for pull request normalization."""
+
+    def test_normalize_rest_pull_request(self):
+        """REST pull requests report merged ones as MERGED."""
+        rest = {"number": 5, "state": "closed", "merged_at": "2024-01-01T00:00:00Z",
+                "head": {"ref": "gitaiteams/issue-1-child-1"}, "base": {"ref": "gitaiteams/issue-1"}}
+        assert normalize_pull_request(rest) == {
+            "number": 5, "state": "MERGED",
+            "head": "gitaiteams/issue-1-child-1", "base": "gitaiteams/issue-1",
+        }
+        rest["merged_at"] = None
+        assert normalize_pull_request(rest)["state"] == "CLOSED"
+
+
+class TestSnapshot:
+    """Test suite for deriving states from a snapshot."""
+
+    @pytest.fixture
+    def snapshot(self):
+        return Snapshot(REFS, PULL_REQUESTS)
+
+    def test_states(self, snapshot):
+        """Each issue gets the same state derive_state.sh would report."""
+        states = {r["issue"]: r["state"] for r in snapshot.derive_many([1, 2, 3, 4, 5])}
+        assert states == {
+            1: STATE_SINGLE_TASK,
+            2: STATE_CHILDREN_RUNNING,
+            3: STATE_CHILDREN_COMPLETE,
+            4: STATE_CHILDREN_SPAWNING,
+            5: STATE_NO_PARENT_BRANCH,
+        }
+
+    def test_counts(self, snapshot):
+        """Child branches and PR counts are reported per issue."""
+        result = snapshot.derive(4)
+        assert result["children"] == 2
+        assert result["child_branches"] == ["gitaiteams/issue-4-child-1", "gitaiteams/issue-4-child-2"]
+        assert result["open_prs"] == 1
+        assert result["merged_prs"] == 0
+        assert result["pending_children"] == 1
+
+    def test_does_not_match_longer_issue_numbers(self):
+        """Branches for issue 11 are not counted for issue 1."""
+        snapshot = Snapshot(["origin/gitaiteams/issue-1", "origin/gitaiteams/issue-11-child-1"], [])
+        assert snapshot.derive(1)["children"] == 0
+        assert snapshot.issue_numbers() == [1, 11]
+
+    def test_grandchildren_violation(self, snapshot):
+        """Grandchild branches are reported, not counted as children."""
+        result = snapshot.derive(4)
+        assert result["violations"] == [
+            {"type": "grandchildren", "branches": ["gitaiteams/issue-4-child-2-child-1"]}
+        ]
+        assert snapshot.derive(2)["violations"] == []
+
+    def test_too_many_children_violation(self):
+        """More than five children is a constitution violation."""
+        refs = ["origin/gitaiteams/issue-7"] + [f"origin/gitaiteams/issue-7-child-{i}" for i in range(1, 7)]
+        result = Snapshot(refs, []).derive(7)
+        assert result["violations"] == [{"type": "too_many_children", "count": 6, "limit": 5}]
+
+    def test_issue_states(self):
+        """Closed and unknown issues are reported before branch checks."""
+        issues = [{"number": 1, "state": "CLOSED"}, {"number": 2, "state": "open"},
+                  {"number": 3, "state": "open", "pull_request": {}}]
+        snapshot = Snapshot(REFS, PULL_REQUESTS, issues)
+        assert snapshot.derive(1)["state"] == STATE_ISSUE_CLOSED
+        assert snapshot.derive(2)["state"] == STATE_CHILDREN_RUNNING
+        assert snapshot.derive(3)["state"] == STATE_ISSUE_NOT_FOUND
+
+    def test_many_issues_from_one_snapshot(self):
+        """A large snapshot is indexed once and every issue derived from it."""
+        refs = []
+        prs = []
+        for issue in range(1, 2001):
+            refs.append(f"origin/gitaiteams/issue-{issue}")
+            for child in range(1, 4):
+                refs.append(f"origin/gitaiteams/issue-{issue}-child-{child}")
+                prs.append(pr(issue * 10 + child, "MERGED", f"gitaiteams/issue-{issue}"))
+        results = Snapshot(refs, prs).derive_many(range(1, 2001))
+        assert {r["state"] for r in results} == {STATE_CHILDREN_COMPLETE}
+
+
+class TestStateFiles:
+    """Test suite for the stateless architecture check."""
+
+    def test_find_state_files(self, tmp_path):
+        """STATE.json and *.state files are found; .git is skipped."""
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a" / "STATE.json").write_text("{}")
+        (tmp_path / "run.state").write_text("")
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".git" / "x.state").write_text("")
+        (tmp_path / "notes.txt").write_text("")
+        found = sorted(p.replace(str(tmp_path), "") for p in find_state_files(str(tmp_path)))
+        assert found == ["/a/STATE.json", "/run.state"]
+
+
+class RepoHandler(BaseHTTPRequestHandler):
+    """Serves refs, pull requests (two pages) and issues for owner/repo."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        host, port = self.server.server_address
+        link = None
+        if "/git/matching-refs/" in self.path:
+            items = [{"ref": "refs/heads/gitaiteams/issue-2"}, {"ref": "refs/heads/gitaiteams/issue-2-child-1"}]
+        elif "/pulls" in self.path and "page=2" in self.path:
+            items = [{"number": 9, "state": "closed", "merged_at": "2024-01-01T00:00:00Z",
+                      "head": {"ref": "gitaiteams/issue-2-child-1"}, "base": {"ref": "gitaiteams/issue-2"}}]
+        elif "/pulls" in self.path:
+            items = []
+            link = f'<http://{host}:{port}/repos/o/r/pulls?state=all&page=2>; rel="next"'
+        else:
+            items = [{"number": 2, "state": "open"}]
+        body = json.dumps(items).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if link:
+            self.send_header("Link", link)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestFetchSnapshotSources:
+    """Test suite for fetching the snapshot from the REST API."""
+
+    def test_fetches_every_page(self):
+        """Refs, all PR pages and issues are fetched over the client."""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), RepoHandler)
+        thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+        thread.start()
+        try:
+            host, port = server.server_address
+            with GitHubClient(api_url=f"http://{host}:{port}") as client:
+                refs, prs, issues = fetch_snapshot_sources("o/r", client)
+                opened = client.pool.opened
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert Snapshot(refs, prs, issues).derive(2)["state"] == STATE_CHILDREN_COMPLETE
+        assert opened == 1
+
+
+class TestMain:
+    """Test suite for the command line interface."""
+
+    def test_main_from_files(self, tmp_path, monkeypatch, capsys):
+        """Refs and PR files produce JSON states for every issue."""
+        refs = tmp_path / "refs"
+        refs.write_text("\n".join(REFS) + "\n")
+        prs = tmp_path / "prs.json"
+        prs.write_text(json.dumps(PULL_REQUESTS))
+        monkeypatch.setattr(sys, "argv", ["derive_state.py", "--refs", str(refs), "--prs", str(prs)])
+
+        assert derive_state.main() == 0
+        output = json.loads(capsys.readouterr().out)
+        assert [r["issue"] for r in output["issues"]] == [1, 2, 3, 4]
+
+    def test_main_bad_json(self, tmp_path, monkeypatch, capsys):
+        """Unreadable PR JSON is reported as an error object."""
+        refs = tmp_path / "refs"
+        refs.write_text("")
+        prs = tmp_path / "prs.json"
+        prs.write_text("[{")
+        monkeypatch.setattr(sys, "argv", ["derive_state.py", "--refs", str(refs), "--prs", str(prs), "1"])
+
+        assert derive_state.main() == 1
+        assert "error" in json.loads(capsys.readouterr().out)
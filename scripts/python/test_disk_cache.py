@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Unit tests for disk_cache.py
+"""
+
+import os
+import threading
+
+from disk_cache import DiskCacheDir, default_disk_dir, resolve_disk_dir
+
+
+class TestDiskCacheDir:
+    """Test suite for the shared cache directory."""
+
+    def test_atomic_write(self, tmp_path):
+        """Entries are sharded by key and no temporary files are left behind."""
+        store = DiskCacheDir(str(tmp_path), ".json", 10)
+        assert store.write("ab12", b"{}")
+        assert (tmp_path / "ab" / "ab12.json").read_bytes() == b"{}"
+        assert not any(name.endswith(".tmp") for _, _, names in os.walk(tmp_path) for name in names)
+
+    def test_evicts_to_low_water(self, tmp_path):
+        """Past the bound, the oldest entries go until 90% of it is left."""
+        store = DiskCacheDir(str(tmp_path), ".json", 10)
+        for i in range(10):
+            key = f"{i:02d}"
+            store.write(key, b"x")
+            os.utime(store.path(key), (i, i))
+        store.write("10", b"x")
+        assert store.evictions == 2
+        assert not os.path.exists(store.path("00"))
+        assert not os.path.exists(store.path("01"))
+        assert os.path.exists(store.path("02"))
+
+    def test_rewrite_does_not_grow_count(self, tmp_path):
+        """Replacing an entry keeps the running count and byte total exact."""
+        by_count = DiskCacheDir(str(tmp_path / "count"), ".json", 1)
+        by_bytes = DiskCacheDir(str(tmp_path / "bytes"), ".http", 10, by_bytes=True)
+        for _ in range(5):
+            by_count.write("aa", b"x")
+            by_bytes.write("aa", b"x" * 10)
+        assert by_count.evictions == 0
+        assert by_bytes.evictions == 0
+
+    def test_concurrent_writes(self, tmp_path):
+        """Threads sharing a directory keep an exact running count."""
+        store = DiskCacheDir(str(tmp_path), ".json", 1000)
+        threads = [
+            threading.Thread(target=lambda n=n: [store.write(f"{n:02d}{i:03d}", b"x") for i in range(50)])
+            for n in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert store._total == 400
+        assert store.evictions == 0
+
+
+class TestDiskDir:
+    """Test suite for locating a cache directory."""
+
+    def test_under_runner_tool_cache(self, monkeypatch):
+        """Caches live under RUNNER_TOOL_CACHE/gitai-teams."""
+        monkeypatch.setenv("RUNNER_TOOL_CACHE", "/opt/hostedtoolcache")
+        assert default_disk_dir("x") == os.path.join("/opt/hostedtoolcache", "gitai-teams", "x")
+        monkeypatch.delenv("RUNNER_TOOL_CACHE")
+        assert default_disk_dir("x") is None
+
+    def test_opt_in(self, monkeypatch):
+        """A cache is used when requested or enabled by its variable."""
+        monkeypatch.setenv("RUNNER_TOOL_CACHE", "/opt/hostedtoolcache")
+        monkeypatch.delenv("GITAI_X_CACHE", raising=False)
+        assert resolve_disk_dir("x", False, "GITAI_X_CACHE") is None
+        assert resolve_disk_dir("x", True, "GITAI_X_CACHE") == default_disk_dir("x")
+        monkeypatch.setenv("GITAI_X_CACHE", "1")
+        assert resolve_disk_dir("x", False, "GITAI_X_CACHE") == default_disk_dir("x")
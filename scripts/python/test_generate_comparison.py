@@ -40,6 +40,30 @@ except ImportError:
         """Stub function - will be implemented in T025"""
         raise NotImplementedError("format_as_markdown_table not yet implemented")
 
+import io
+import json
+
+import generate_comparison
+from generate_comparison import (
+    COLUMN_BOOL,
+    COLUMN_LIST,
+    COLUMN_NUMERIC,
+    COLUMN_TEXT,
+    MISSING,
+    ColumnarTable,
+    generate_typed_comparison,
+    infer_column_type,
+    numeric_headers,
+    flatten_dict,
+    flattened_keys,
+    join_scalar_list,
+    key_path,
+    iter_jsonl_items,
+    scan_columns,
+    stream_markdown_table,
+    write_jsonl_comparison,
+)
+
 
 class TestGenerateComparison:
     """Test suite for comparison table generation"""
@@ -207,5 +231,297 @@ class TestGenerateComparison:
         assert "Cons" in str(table.headers) or "cons" in str(table.headers)
 
 
+class TestColumnarTable:
+    """Test suite for the columnar comparison table model"""
+
+    def test_sparse_items_fill_missing_cells(self):
+        """Headers added by later items should leave '-' in earlier rows"""
+        columns = ColumnarTable()
+        columns.add_row({"name": "A", "speed": 1})
+        columns.add_row({"name": "B", "size": 2})
+        columns.add_row({"name": "C"})
+
+        headers = columns.sorted_headers()
+        assert headers == ["name", "size", "speed"]
+        assert list(columns.rows(headers)) == [
+            ["A", "-", "1"],
+            ["B", "2", "-"],
+            ["C", "-", "-"],
+        ]
+
+    def test_rows_are_plain_lists(self):
+        """Rows are materialized lists that compare and mutate like lists"""
+        data = [{"name": f"item{i}", "tags": ["a", "b", "c", "d"]} for i in range(2)]
+        table = generate_comparison_table(data)
+
+        assert table.rows == [["item0", "a, b, c, d"], ["item1", "a, b, c, d"]]
+        table.rows.append(["item2", ""])
+        table.rows[0][0] = "first"
+        assert table.rows[0] == ["first", "a, b, c, d"]
+        assert len(table.rows) == 3
+
+    def test_dash_value_is_not_missing(self):
+        """A genuine "-" value is text, not a missing cell"""
+        table = generate_typed_comparison([{"v": "-"}, {"v": 2}, {"w": 1}], sort_by="v")
+        assert table.schema["v"] == COLUMN_TEXT
+        assert [row[0] for row in table.rows] == ["-", "2", "-"]
+        assert [row[1] for row in table.rows] == ["-", "-", "1"]
+
+    def test_matches_per_item_flattening(self):
+        """Columnar rows should match formatting each flattened item directly"""
+        data = [
+            {"name": "A", "metrics": {"score": 9, "notes": "x" * 120}},
+            {"name": "B", "metrics": {"score": 7}, "extra": {"a": {"b": 1}}},
+        ]
+        table = generate_comparison_table(data)
+
+        from generate_comparison import flatten_dict, format_cell
+        expected = []
+        for item in data:
+            flat = flatten_dict(item)
+            expected.append([format_cell(flat.get(h, "-")) for h in table.headers])
+        assert list(table.rows) == expected
+
+    def test_empty_items_keep_row_count(self):
+        """Items without fields should still produce (empty) rows"""
+        table = generate_comparison_table([{}, {}])
+        assert table.headers == []
+        assert list(table.rows) == [[], []]
+
+
+class TestStreamingComparison:
+    """Test suite for the streaming JSONL comparison table"""
+
+    ITEMS = [
+        {"name": "FastAPI", "performance": {"score": 9}, "notes": "a|b"},
+        {"name": "Flask", "ease": "Good"},
+        {"framework": "Django", "metrics": {"speed": {"score": 7, "note": "ok"}}},
+    ]
+
+    def jsonl(self, items):
+        return io.StringIO("\n".join(json.dumps(item) for item in items) + "\n\n")
+
+    def test_iter_jsonl_items_flattens_and_extracts(self):
+        """Items are flattened and child results go through extraction"""
+        rows = list(iter_jsonl_items(self.jsonl(self.ITEMS)))
+        assert rows[0]["performance_score"] == 9
+        assert rows[2] == {"Name": "Django", "speed": 7, "speed_note": "ok"}
+
+    def test_iter_jsonl_items_rejects_non_objects(self):
+        """Lines that are not JSON objects are reported with their line number"""
+        with pytest.raises(ValueError, match="line 2"):
+            list(iter_jsonl_items(io.StringIO('{"a": 1}\n[1, 2]\n')))
+
+    def test_matches_in_memory_table(self):
+        """A full scan should produce the same table as format_as_markdown_table"""
+        items = self.ITEMS[:2]
+        table = generate_comparison_table(items)
+        expected = format_as_markdown_table(table.headers, table.rows)
+
+        out = io.StringIO()
+        assert write_jsonl_comparison(self.jsonl(items), out, "Frameworks") == 2
+        assert out.getvalue() == f"## Frameworks\n\n{expected}\n"
+
+    def test_scan_columns_counts_missing_cells(self):
+        """Columns missing from some rows are at least as wide as the placeholder"""
+        headers, widths = scan_columns([{"": "x"}, {"b": "long value"}])
+        assert headers == ["", "b"]
+        assert widths == [1, 10]
+
+    def test_fixed_width(self):
+        """Fixed widths pad and truncate every column to the same width"""
+        headers, widths = scan_columns([{"name": "a much longer name"}], fixed_width=6)
+        assert widths == [6]
+
+        out = io.StringIO()
+        stream_markdown_table([{"name": "a much longer name"}], headers, widths, out)
+        assert out.getvalue().splitlines() == ["| name   |", "|--------|", "| a m... |"]
+
+    def test_sample_reads_once(self):
+        """With a sample, later columns are dropped and the stream is read once"""
+        items = [{"name": "A"}, {"name": "B", "extra": 1}]
+        stream = self.jsonl(items)
+        stream.seek = None  # a second pass would fail
+
+        out = io.StringIO()
+        assert write_jsonl_comparison(stream, out, sample=1) == 2
+        assert "extra" not in out.getvalue()
+        assert out.getvalue().splitlines()[-1] == "| B    |"
+
+    def test_empty_stream(self):
+        """Empty input reports that there is nothing to compare"""
+        out = io.StringIO()
+        assert write_jsonl_comparison(io.StringIO("\n"), out) == 0
+        assert out.getvalue() == "## Comparison\n\nNo data to compare\n"
+
+
+class TestFlattenDict:
+    """Test suite for the iterative flattener"""
+
+    NESTED = {"a": {"b": {"c": {"d": 1}}, "e": 2}, "f": 3}
+
+    def test_default_depth_matches_previous_behaviour(self):
+        """One level of nesting is flattened; deeper dicts are stringified"""
+        assert flatten_dict(self.NESTED) == {
+            "a_b": "{'c': {'d': 1}}",
+            "a_e": 2,
+            "f": 3,
+        }
+
+    def test_parent_key_counts_as_nesting(self):
+        """Flattening under a parent key stringifies nested dicts"""
+        assert flatten_dict({"x": {"y": 1}, "z": 2}, "p") == {"p_x": "{'y': 1}", "p_z": 2}
+
+    def test_max_depth(self):
+        """max_depth controls how many nested levels are flattened"""
+        assert flatten_dict(self.NESTED, max_depth=None) == {"a_b_c_d": 1, "a_e": 2, "f": 3}
+        assert flatten_dict(self.NESTED, max_depth=2) == {"a_b_c": "{'d': 1}", "a_e": 2, "f": 3}
+        assert flatten_dict(self.NESTED, max_depth=0) == {
+            "a": "{'b': {'c': {'d': 1}}, 'e': 2}",
+            "f": 3,
+        }
+
+    def test_key_order_is_preserved(self):
+        """Keys come out in depth-first order"""
+        flat = flatten_dict({"z": 1, "m": {"b": 2, "a": 3}, "c": 4})
+        assert list(flat) == ["z", "m_b", "m_a", "c"]
+
+    def test_deep_nesting_does_not_recurse(self):
+        """Deeply nested input must not hit the recursion limit"""
+        item = leaf = {}
+        for _ in range(sys.getrecursionlimit() + 100):
+            leaf["n"] = {}
+            leaf = leaf["n"]
+        leaf["v"] = 1
+        flat = flatten_dict(item, max_depth=None)
+        assert list(flat.values()) == [1]
+
+    def test_scalar_lists(self):
+        """Scalar lists are joined; other lists are stringified"""
+        assert join_scalar_list(["a", "b"]) == "a, b"
+        assert join_scalar_list([1, 2.5, True, "x"]) == "1, 2.5, True, x"
+        assert join_scalar_list([]) == ""
+        assert join_scalar_list([1, None]) is None
+        assert flatten_dict({"l": [1, [2]]}) == {"l": "[1, [2]]"}
+
+    def test_key_paths_are_shared_per_schema(self):
+        """Rows with the same schema reuse the same key path strings"""
+        first = flatten_dict({"m": {"speed": 1}})
+        second = flatten_dict({"m": {"speed": 2}})
+        assert next(iter(first)) is next(iter(second))
+        assert flattened_keys("m", ("a", "b")) == ("m_a", "m_b")
+        assert key_path("speed", "note") == "speed_note"
+
+    def test_table_max_depth(self):
+        """generate_comparison_table passes max_depth through to flattening"""
+        table = generate_comparison_table([self.NESTED], max_depth=None)
+        assert table.headers == ["a_b_c_d", "a_e", "f"]
+
+
+class TestTypedComparison:
+    """Test suite for schema inference and typed comparison cells"""
+
+    DATA = [
+        {"name": "FastAPI", "rps": 12000, "latency": 4.5, "async": True, "tags": ["fast", "typed"]},
+        {"name": "Flask", "rps": 3000, "latency": 12.0, "async": False, "tags": ["simple"]},
+        {"name": "Django", "latency": 15.0, "async": False, "tags": ["batteries"]},
+    ]
+
+    @pytest.fixture(params=["numpy", "stdlib"])
+    def backend(self, request, monkeypatch):
+        """Run each test with numpy (when installed) and with the stdlib fallback."""
+        if request.param == "numpy":
+            pytest.importorskip("numpy")
+        else:
+            monkeypatch.setattr(generate_comparison, "numpy", None)
+
+    def column(self, table, header):
+        index = table.headers.index(header)
+        return [row[index] for row in table.rows]
+
+    def test_infer_column_type(self):
+        """Column types are detected from values, ignoring missing cells"""
+        assert infer_column_type([1, 2.5, MISSING]) == COLUMN_NUMERIC
+        assert infer_column_type([True, False]) == COLUMN_BOOL
+        assert infer_column_type([["a"], ["b", "c"]]) == COLUMN_LIST
+        assert infer_column_type([1, "fast"]) == COLUMN_TEXT
+        assert infer_column_type([1, True]) == COLUMN_TEXT
+        assert infer_column_type([MISSING, MISSING]) == COLUMN_TEXT
+        assert infer_column_type([1, "-"]) == COLUMN_TEXT
+
+    def test_null_treated_as_missing(self, backend):
+        """A JSON null in a numeric column is skipped like a missing cell"""
+        assert infer_column_type([2.5, 1.0, None]) == COLUMN_NUMERIC
+        assert infer_column_type([None, None]) == COLUMN_TEXT
+        data = [{"name": "a", "mem": 2.5}, {"name": "b", "mem": 1.0}, {"name": "c", "mem": None}]
+        table = generate_typed_comparison(data, sort_by="mem", highlight_best=True, lower_is_better=["mem"])
+        assert table.schema["mem"] == COLUMN_NUMERIC
+        assert self.column(table, "name") == ["b", "a", "c"]
+        assert self.column(table, "mem") == ["**1.0**", "2.5", "None"]
+
+    def test_schema_and_default_rendering(self, backend):
+        """Without options, typed rows render exactly like the plain table"""
+        table = generate_typed_comparison(self.DATA)
+        assert table.schema == {
+            "async": COLUMN_BOOL,
+            "latency": COLUMN_NUMERIC,
+            "name": COLUMN_TEXT,
+            "rps": COLUMN_NUMERIC,
+            "tags": COLUMN_LIST,
+        }
+        assert table.rows == list(generate_comparison_table(self.DATA).rows)
+
+    def test_sort_numeric(self, backend):
+        """Numeric columns sort by value, with missing cells last"""
+        table = generate_typed_comparison(self.DATA, sort_by="rps")
+        assert self.column(table, "name") == ["Flask", "FastAPI", "Django"]
+        table = generate_typed_comparison(self.DATA, sort_by="rps", descending=True)
+        assert self.column(table, "name") == ["FastAPI", "Flask", "Django"]
+
+    def test_sort_text_keeps_ties_stable(self, backend):
+        """Text columns sort case-insensitively; ties keep input order"""
+        table = generate_typed_comparison(self.DATA, sort_by="name")
+        assert self.column(table, "name") == ["Django", "FastAPI", "Flask"]
+        table = generate_typed_comparison(self.DATA, sort_by="async")
+        assert self.column(table, "name") == ["Flask", "Django", "FastAPI"]
+
+    def test_highlight_best(self, backend):
+        """The best numeric value is bold; lower_is_better picks the minimum"""
+        table = generate_typed_comparison(self.DATA, highlight_best=True, lower_is_better=["latency"])
+        assert self.column(table, "rps") == ["**12000**", "3000", "-"]
+        assert self.column(table, "latency") == ["**4.5**", "12.0", "15.0"]
+
+    def test_highlight_skips_ties(self, backend):
+        """Columns where every value ties have nothing to highlight"""
+        table = generate_typed_comparison([{"x": 1}, {"x": 1}], highlight_best=True)
+        assert self.column(table, "x") == ["1", "1"]
+
+    def test_relative_differences(self, backend):
+        """Difference columns follow numeric columns and compare to the baseline row"""
+        table = generate_typed_comparison(self.DATA, diff_baseline=1)
+        assert table.headers == ["async", "latency", "latency Δ%", "name", "rps", "rps Δ%", "tags"]
+        assert self.column(table, "rps Δ%") == ["+300.0%", "+0.0%", "-"]
+        assert self.column(table, "latency Δ%") == ["-62.5%", "+0.0%", "+25.0%"]
+
+    def test_relative_differences_without_baseline_value(self, backend):
+        """A missing or zero baseline value leaves the differences empty"""
+        table = generate_typed_comparison(self.DATA, diff_baseline=2)
+        assert self.column(table, "rps Δ%") == ["-", "-", "-"]
+
+    def test_invalid_options(self):
+        """Unknown sort columns and baseline rows are rejected"""
+        with pytest.raises(ValueError):
+            generate_typed_comparison(self.DATA, sort_by="missing")
+        with pytest.raises(ValueError):
+            generate_typed_comparison(self.DATA, diff_baseline=3)
+
+    def test_numeric_columns_are_right_aligned(self):
+        """Numeric and difference columns are right-aligned when rendered"""
+        table = generate_typed_comparison(self.DATA[:2], diff_baseline=0)
+        assert numeric_headers(table) == {"latency", "latency Δ%", "rps", "rps Δ%"}
+        markdown = format_as_markdown_table(["rps"], [["5"], ["12000"]], right_align=["rps"])
+        assert markdown.splitlines() == ["| rps   |", "|------:|", "|     5 |", "| 12000 |"]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Unit tests for github_client.py
+"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import github_client
+from github_client import GitHubAPIError, GitHubClient, Request, Response
+from http_cache import DiskResponseCache
+
+
+PAGES = 6
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """A few GitHub-like endpoints; behaviour is driven by the path."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def send_json(self, status, payload, **headers):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name.replace("_", "-"), value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            hits = server.hits[self.path]
+        server.authorization = self.headers.get("Authorization")
+        host, port = server.server_address
+
+        if self.path.startswith("/etag"):
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_json(304, None, ETag='"v1"')
+            else:
+                self.send_json(200, {"version": 1}, ETag='"v1"')
+        elif self.path.startswith("/limited") and hits == 1:
+            self.send_json(403, {"message": "API rate limit exceeded"},
+                           X_RateLimit_Remaining="0", X_RateLimit_Reset="0")
+        elif self.path.startswith("/flaky") and hits == 1:
+            self.send_json(502, {"message": "bad gateway"})
+        elif self.path.startswith("/missing"):
+            self.send_json(404, {"message": "Not Found"})
+        elif self.path.startswith("/pages"):
+            page = int(self.path.rsplit("page=", 1)[1]) if "page=" in self.path else 1
+            link = f'<http://{host}:{port}/pages?page={PAGES}>; rel="last"'
+            self.send_json(200, [{"page": page, "item": i} for i in range(2)], Link=link)
+        elif self.path.startswith("/items"):
+            page = 2 if "page=2" in self.path else 1
+            headers = {}
+            if page == 1:
+                headers["Link"] = f'<http://{host}:{port}/items?page=2>; rel="next"'
+            self.send_json(200, [{"number": page}], **headers)
+        else:
+            self.send_json(200, {"path": self.path}, X_RateLimit_Remaining="4999")
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.send_json(201, {"received": body})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ApiHandler)
+    httpd.hits = {}
+    httpd.lock = threading.Lock()
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def client(server):
+    host, port = server.server_address
+    sleeps = []
+    with GitHubClient(token="secret", api_url=f"http://{host}:{port}", sleep=sleeps.append) as client:
+        client.sleeps = sleeps
+        yield client
+
+
+class TestResponse:
+    """Test suite for Response."""
+
+    def test_last_page(self):
+        """The page count is read from the rel=last URL."""
+        link = '<https://x/items?per_page=100&page=2>; rel="next", <https://x/items?per_page=100&page=9>; rel="last"'
+        assert Response(200, {"link": link}, b"", "").last_page == 9
+        assert Response(200, {}, b"", "").last_page is None
+
+    def test_next_url(self):
+        """The rel=next URL is read from the Link header."""
+        link = '<https://x/items?page=3>; rel="next", <https://x/items?page=9>; rel="last"'
+        assert Response(200, {"link": link}, b"", "").next_url == "https://x/items?page=3"
+        assert Response(200, {}, b"", "").next_url is None
+
+
+class TestGitHubClient:
+    """Test suite for GitHubClient against a local server."""
+
+    def test_keep_alive(self, client, server):
+        """Sequential requests reuse one pooled connection."""
+        for i in range(5):
+            assert client.get_json(f"/thing/{i}") == {"path": f"/thing/{i}"}
+        assert client.pool.opened == 1
+        assert server.authorization == "Bearer secret"
+        assert client.rate_limit_remaining == 4999
+
+    def test_params_and_post(self, client):
+        """Query parameters are encoded and JSON bodies sent."""
+        assert client.get_json("repos/o/r/pulls", {"state": "all"}) == {"path": "/repos/o/r/pulls?state=all"}
+        response = client.request("POST", "repos/o/r/issues/1/comments", json_body={"body": "hi"})
+        assert response.status == 201
+        assert response.json() == {"received": {"body": "hi"}}
+
+    def test_etag_revalidation(self, client, server):
+        """A repeated GET sends If-None-Match and a 304 is served from the cache."""
+        first = client.request("GET", "/etag")
+        second = client.request("GET", "/etag")
+        assert not first.from_cache
+        assert second.from_cache
+        assert second.json() == {"version": 1}
+        assert server.hits["/etag"] == 2
+
+    def test_disk_cache_across_clients(self, server, tmp_path):
+        """A later client revalidates against responses stored on disk."""
+        host, port = server.server_address
+        with GitHubClient(api_url=f"http://{host}:{port}", cache=DiskResponseCache(str(tmp_path))) as first:
+            assert not first.request("GET", "/etag").from_cache
+        with GitHubClient(api_url=f"http://{host}:{port}", cache=DiskResponseCache(str(tmp_path))) as second:
+            response = second.request("GET", "/etag")
+            assert response.from_cache
+            assert response.json() == {"version": 1}
+            assert second.not_modified == 1
+            assert second.cache.hits == 1
+
+    def test_from_env_disk_cache(self, monkeypatch, tmp_path):
+        """from_env uses the disk cache when it is opted in."""
+        monkeypatch.setenv("RUNNER_TOOL_CACHE", str(tmp_path))
+        monkeypatch.delenv("GITAI_HTTP_DISK_CACHE", raising=False)
+        assert not isinstance(GitHubClient.from_env().cache, DiskResponseCache)
+        assert isinstance(GitHubClient.from_env(http_cache=True).cache, DiskResponseCache)
+
+    def test_rate_limit_waits_for_reset(self, client, server):
+        """An exhausted rate limit is waited out and the request retried."""
+        assert client.get_json("/limited") == {"path": "/limited"}
+        assert server.hits["/limited"] == 2
+        assert client.sleeps == [0.0]
+
+    def test_server_error_retried(self, client):
+        """5xx responses are retried with backoff."""
+        assert client.get_json("/flaky") == {"path": "/flaky"}
+        assert client.sleeps == [github_client.BACKOFF_BASE]
+
+    def test_error_status_raises(self, client):
+        """Client errors raise GitHubAPIError without retrying."""
+        with pytest.raises(GitHubAPIError) as excinfo:
+            client.get_json("/missing")
+        assert excinfo.value.status == 404
+        assert client.sleeps == []
+
+    def test_other_hosts_rejected(self, client):
+        """Absolute URLs must point at the client's API host."""
+        with pytest.raises(ValueError):
+            client.request("GET", "http://example.invalid/x")
+
+    def test_paginate(self, client):
+        """Every page is fetched by following rel=next."""
+        assert list(client.paginate("/items")) == [{"number": 1}, {"number": 2}]
+
+    def test_paginate_concurrent(self, client, server):
+        """Pages named by rel=last are fetched concurrently and yielded in order."""
+        stats = {}
+        items = list(client.paginate_concurrent("/pages", stats=stats))
+        assert [item["page"] for item in items] == [p for p in range(1, PAGES + 1) for _ in range(2)]
+        assert stats == {"pages": PAGES, "fetched": PAGES}
+        assert sum(server.hits.values()) == PAGES
+
+    def test_paginate_concurrent_stops_early(self, client, server):
+        """Closing the iterator stops requesting further pages."""
+        stats = {}
+        pages = client.paginate_concurrent("/pages", window=1, stats=stats)
+        assert next(pages)["page"] == 1
+        assert next(pages)["page"] == 1
+        assert next(pages)["page"] == 2
+        pages.close()
+        assert stats["fetched"] == 2
+        assert sum(server.hits.values()) <= 3
+
+    def test_paginate_concurrent_without_last(self, client):
+        """Without rel=last, pages are followed one by one."""
+        assert list(client.paginate_concurrent("/items")) == [{"number": 1}, {"number": 2}]
+
+    def test_batch(self, client):
+        """Batched requests run concurrently and come back in order."""
+        requests = [Request("GET", f"/thing/{i}") for i in range(10)] + [Request("GET", "/missing")]
+        results = client.batch(requests)
+        assert [r.json()["path"] for r in results[:10]] == [f"/thing/{i}" for i in range(10)]
+        assert isinstance(results[10], GitHubAPIError)
+        assert client.pool.opened <= client.pool.size
+
+
+class TestMain:
+    """Test suite for the command line interface."""
+
+    def test_main_paginate(self, server, monkeypatch, capsys):
+        """--paginate prints the merged pages."""
+        host, port = server.server_address
+        monkeypatch.setenv("GITHUB_API_URL", f"http://{host}:{port}")
+        monkeypatch.setattr(sys, "argv", ["github_client.py", "--paginate", "/items"])
+
+        assert github_client.main() == 0
+        assert json.loads(capsys.readouterr().out) == [{"number": 1}, {"number": 2}]
+
+    def test_main_error(self, server, monkeypatch, capsys):
+        """Error statuses are printed as an error object."""
+        host, port = server.server_address
+        monkeypatch.setenv("GITHUB_API_URL", f"http://{host}:{port}")
+        monkeypatch.setattr(sys, "argv", ["github_client.py", "/missing"])
+
+        assert github_client.main() == 1
+        assert "error" in json.loads(capsys.readouterr().out)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Unit tests for http_cache.py
+"""
+
+import os
+import time
+
+from http_cache import CachedResponse, DiskResponseCache, default_disk_dir, resolve_disk_dir
+
+
+def response(body=b'[{"id": 1}]', etag='"abc"'):
+    return CachedResponse(200, {"etag": etag, "content-type": "application/json"}, body)
+
+
+class TestDiskResponseCache:
+    """Test suite for DiskResponseCache."""
+
+    def test_round_trip(self, tmp_path):
+        """A new cache on the same directory reads stored responses."""
+        url = "https://api.github.com/repos/o/r/issues/1/comments?per_page=100"
+        DiskResponseCache(str(tmp_path)).put(url, response())
+        cache = DiskResponseCache(str(tmp_path))
+        assert cache.get(url) == response()
+        assert cache.get(url + "&page=2") is None
+        assert cache.stats() == {"hits": 0, "misses": 1, "stores": 0, "evictions": 0}
+        cache.revalidated(url)
+        assert cache.hits == 1
+        assert not any(name.endswith('.tmp') for _, _, names in os.walk(tmp_path) for name in names)
+
+    def test_put_replaces_entry(self, tmp_path):
+        """Storing a URL again replaces its entry."""
+        cache = DiskResponseCache(str(tmp_path))
+        cache.put("u", response(b"old", '"1"'))
+        cache.put("u", response(b"new", '"2"'))
+        assert cache.get("u").body == b"new"
+        assert cache.get("u").headers["etag"] == '"2"'
+
+    def test_corrupt_entry_ignored(self, tmp_path):
+        """Unreadable entries are treated as misses."""
+        cache = DiskResponseCache(str(tmp_path))
+        cache.put("u", response())
+        path = cache._path(cache.key("u"))
+        with open(path, "wb") as f:
+            f.write(b"{not json\n")
+        assert cache.get("u") is None
+
+    def test_size_based_eviction(self, tmp_path):
+        """Least recently used entries are evicted beyond max_bytes."""
+        cache = DiskResponseCache(str(tmp_path), max_bytes=2500)
+        for i, url in enumerate(["a", "b"]):
+            cache.put(url, response(b"x" * 1000))
+            past = time.time() - 100 + i
+            os.utime(cache._path(cache.key(url)), (past, past))
+        cache.revalidated("a")
+        cache.put("c", response(b"x" * 1000))
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.evictions == 1
+
+    def test_scans_only_when_over_bound(self, tmp_path, monkeypatch):
+        """The directory is scanned once, then only when the running size passes max_bytes."""
+        cache = DiskResponseCache(str(tmp_path), max_bytes=5000)
+        scans = []
+        original = cache.store._scan
+        monkeypatch.setattr(cache.store, "_scan", lambda: scans.append(1) or original())
+        for i in range(4):
+            cache.put(str(i), response(b"x" * 1000))
+        assert len(scans) == 1
+        cache.put("4", response(b"x" * 1000))
+        cache.put("4", response(b"y" * 1000))
+        assert len(scans) == 2
+        assert cache.evictions == 1
+
+    def test_unwritable_directory(self, tmp_path):
+        """Write errors are ignored."""
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        cache = DiskResponseCache(str(blocker / "cache"))
+        cache.put("u", response())
+        assert cache.get("u") is None
+
+
+class TestDiskDir:
+    """Test suite for locating the disk cache."""
+
+    def test_default_disk_dir(self, monkeypatch):
+        """The cache lives under RUNNER_TOOL_CACHE."""
+        monkeypatch.setenv("RUNNER_TOOL_CACHE", "/opt/hostedtoolcache")
+        assert default_disk_dir() == os.path.join("/opt/hostedtoolcache", "gitai-teams", "http")
+        monkeypatch.delenv("RUNNER_TOOL_CACHE")
+        assert default_disk_dir() is None
+
+    def test_opt_in(self, monkeypatch):
+        """The disk cache is used when requested or enabled by environment."""
+        monkeypatch.setenv("RUNNER_TOOL_CACHE", "/opt/hostedtoolcache")
+        monkeypatch.delenv("GITAI_HTTP_DISK_CACHE", raising=False)
+        assert resolve_disk_dir(False) is None
+        assert resolve_disk_dir(True) is not None
+        monkeypatch.setenv("GITAI_HTTP_DISK_CACHE", "1")
+        assert resolve_disk_dir(False) is not None
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Unit tests for io_utils.py
+"""
+
+import io
+import json
+
+import pytest
+
+from io_utils import iter_json_array, read_json_items, read_lines
+
+
+class TestIterJsonArray:
+    """Test suite for the streaming JSON array decoder."""
+
+    def test_items_split_across_chunks(self):
+        """Items spanning chunk boundaries should decode intact."""
+        comments = [{"body": f"🤖 Child C{i}: done", "id": i} for i in range(50)]
+        text = json.dumps(comments)
+        for chunk_size in (1, 3, 16, 4096):
+            assert list(iter_json_array(io.StringIO(text), chunk_size)) == comments
+
+    def test_trailing_number_not_cut_short(self):
+        """A number at a chunk boundary should not be split."""
+        assert list(iter_json_array(io.StringIO("[12345]"), 3)) == [12345]
+
+    def test_number_split_after_dot_or_exponent(self):
+        """A number cut after '.', 'e' or a sign should wait for the next chunk."""
+        assert list(iter_json_array(io.StringIO('[1.5, 2e3]'), 2)) == [1.5, 2000.0]
+
+    def test_every_chunk_size_matches_json_loads(self):
+        """Decoding with any chunk size should match json.loads."""
+        text = '[1.5, 2e3, -0.25, 1E-2, 10, true, false, null, "a,b]", {"n": 3.5e+1}, [7, 8.0]]'
+        expected = json.loads(text)
+        for chunk_size in range(1, len(text) + 1):
+            assert list(iter_json_array(io.StringIO(text), chunk_size)) == expected, chunk_size
+
+    def test_concatenated_pages(self):
+        """Back-to-back arrays from paginated output form one sequence."""
+        text = '[{"body": "a"}]\n[{"body": "b"}][]'
+        assert [c["body"] for c in iter_json_array(io.StringIO(text), 4)] == ["a", "b"]
+
+    def test_empty_input(self):
+        """Empty input should yield nothing."""
+        assert list(iter_json_array(io.StringIO(""))) == []
+
+    def test_malformed_input_raises(self):
+        """Malformed arrays should raise JSONDecodeError."""
+        for bad in ('{"body": "x"}', '[1 2]', '[1,]', '[{"body": "x"}'):
+            with pytest.raises(json.JSONDecodeError):
+                list(iter_json_array(io.StringIO(bad), 2))
+
+
+class TestReaders:
+    """Test suite for the file and stdin readers."""
+
+    def test_read_lines(self, tmp_path):
+        """Blank lines and surrounding whitespace are dropped."""
+        path = tmp_path / "refs"
+        path.write_text("origin/gitaiteams/issue-1\n\n  origin/gitaiteams/issue-1-child-1 \n")
+        assert read_lines(str(path)) == ["origin/gitaiteams/issue-1", "origin/gitaiteams/issue-1-child-1"]
+
+    def test_read_json_items_stdin(self, monkeypatch):
+        """'-' reads paginated arrays from stdin."""
+        monkeypatch.setattr("sys.stdin", io.StringIO('[1, 2]\n[3]'))
+        assert read_json_items("-") == [1, 2, 3]
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Unit tests for log_utils.py
+"""
+
+import io
+import logging
+import sys
+
+import pytest
+import log_utils
+from log_utils import (
+    DEFAULT_SAMPLE_EVERY,
+    TRACE,
+    ItemTracer,
+    StructuredFormatter,
+    configure_logging,
+    fields,
+    item_tracer,
+    timed
+)
+
+
+@pytest.fixture
+def test_logger():
+    """Logger with a clean level that is restored after the test."""
+    logger = logging.getLogger("test_log_utils")
+    root_level = logging.getLogger().level
+    yield logger
+    logger.setLevel(logging.NOTSET)
+    logging.getLogger().setLevel(root_level)
+
+
+class TestStructuredFormatter:
+    """Test suite for StructuredFormatter."""
+
+    def test_appends_fields(self):
+        """Structured fields should be appended as key=value pairs."""
+        record = logging.LogRecord("x", logging.INFO, __file__, 1, "Done %s", ("now",), None)
+        record.fields = {"count": 3, "stage": "count"}
+        assert StructuredFormatter("%(message)s").format(record) == "Done now | count=3 stage=count"
+
+    def test_without_fields(self):
+        """Records without fields should format normally."""
+        record = logging.LogRecord("x", logging.INFO, __file__, 1, "Plain", (), None)
+        assert StructuredFormatter("%(message)s").format(record) == "Plain"
+
+
+class TestItemTracer:
+    """Test suite for per-item tracing."""
+
+    def test_disabled_at_info(self, test_logger):
+        """The tracer should be falsy when DEBUG is off."""
+        test_logger.setLevel(logging.INFO)
+        assert not item_tracer(test_logger)
+
+    def test_sampled_at_debug(self, test_logger, caplog):
+        """In debug mode only every Nth item should be logged."""
+        test_logger.setLevel(logging.DEBUG)
+        tracer = ItemTracer(test_logger, 10)
+        with caplog.at_level(logging.DEBUG, logger="test_log_utils"):
+            for i in range(25):
+                tracer.log("item %d", i)
+        assert [r.getMessage() for r in caplog.records] == ["item 0", "item 10", "item 20"]
+        assert caplog.records[1].fields == {"sample": 11, "sampled_every": 10}
+
+    def test_debug_with_sample_one(self, test_logger, caplog, monkeypatch):
+        """GITAI_LOG_SAMPLE=1 (or below) under debug should log every item at DEBUG."""
+        for sample in ("1", "0", "-3"):
+            monkeypatch.setenv("GITAI_LOG_SAMPLE", sample)
+            configure_logging(debug=True)
+            test_logger.setLevel(logging.DEBUG)
+            tracer = item_tracer(test_logger)
+            caplog.clear()
+            with caplog.at_level(logging.DEBUG, logger="test_log_utils"):
+                for i in range(3):
+                    tracer.log("item %d", i)
+            assert [r.levelno for r in caplog.records] == [logging.DEBUG] * 3
+            assert caplog.records[2].fields == {"sample": 3, "sampled_every": 1}
+
+    def test_every_item_at_trace(self, test_logger, caplog):
+        """In trace mode every item should be logged."""
+        test_logger.setLevel(TRACE)
+        tracer = item_tracer(test_logger)
+        assert tracer.every == 1
+        with caplog.at_level(TRACE, logger="test_log_utils"):
+            for i in range(3):
+                tracer.log("item %d", i)
+        assert len(caplog.records) == 3
+
+    def test_arguments_not_formatted_when_disabled(self, test_logger):
+        """Lazy arguments should never be formatted when disabled."""
+        class Exploding:
+            def __str__(self):
+                raise AssertionError("formatted")
+
+        test_logger.setLevel(logging.INFO)
+        tracer = item_tracer(test_logger)
+        if tracer:
+            tracer.log("%s", Exploding())
+        test_logger.debug("%s", Exploding())
+
+
+class TestTimed:
+    """Test suite for stage timing."""
+
+    def test_logs_stage_fields(self, test_logger, caplog):
+        """A timed stage should log its fields and elapsed_ms."""
+        with caplog.at_level(logging.INFO, logger="test_log_utils"):
+            with timed(test_logger, "count", items=2) as stage:
+                stage["found"] = 1
+        record = caplog.records[-1]
+        assert record.fields["stage"] == "count"
+        assert record.fields["items"] == 2
+        assert record.fields["found"] == 1
+        assert record.fields["elapsed_ms"] >= 0
+
+    def test_skipped_below_level(self, test_logger, caplog):
+        """Stages below the enabled level should not log."""
+        test_logger.setLevel(logging.INFO)
+        with caplog.at_level(logging.INFO, logger="test_log_utils"):
+            with timed(test_logger, "quiet", logging.DEBUG):
+                pass
+        assert not caplog.records
+
+
+class TestConfigureLogging:
+    """Test suite for configure_logging."""
+
+    def test_levels(self, test_logger, monkeypatch):
+        """debug/trace flags and environment should set the root level."""
+        monkeypatch.delenv("GITAI_LOG_LEVEL", raising=False)
+        monkeypatch.delenv("GITAI_TRACE", raising=False)
+        configure_logging()
+        assert logging.getLogger().level == logging.INFO
+        configure_logging(debug=True)
+        assert logging.getLogger().level == logging.DEBUG
+        configure_logging(trace=True)
+        assert logging.getLogger().level == TRACE
+        monkeypatch.setenv("GITAI_LOG_LEVEL", "warning")
+        configure_logging()
+        assert logging.getLogger().level == logging.WARNING
+        monkeypatch.setenv("GITAI_TRACE", "1")
+        configure_logging()
+        assert logging.getLogger().level == TRACE
+
+    def test_handler_added_once(self, test_logger):
+        """Repeated configuration should not duplicate handlers."""
+        configure_logging()
+        count = len(logging.getLogger().handlers)
+        configure_logging(debug=True)
+        assert len(logging.getLogger().handlers) == count
+
+    def test_invalid_sample_env(self, test_logger, monkeypatch, caplog):
+        """A non-numeric GITAI_LOG_SAMPLE falls back to the default with a warning."""
+        monkeypatch.setenv("GITAI_LOG_SAMPLE", "often")
+        configure_logging(debug=True)
+        assert log_utils._sample_every == DEFAULT_SAMPLE_EVERY
+        assert "GITAI_LOG_SAMPLE" in caplog.text
+        monkeypatch.setenv("GITAI_LOG_SAMPLE", "7")
+        configure_logging(debug=True)
+        assert log_utils._sample_every == 7
+
+    def test_handler_follows_stderr(self, test_logger, monkeypatch):
+        """The handler writes to the current sys.stderr until setStream is called."""
+        configure_logging()
+        handler = next(h for h in logging.getLogger().handlers if isinstance(h, log_utils._StderrHandler))
+        captured = io.StringIO()
+        monkeypatch.setattr(sys, "stderr", captured)
+        test_logger.warning("to stderr")
+        assert "to stderr" in captured.getvalue()
+
+        explicit = io.StringIO()
+        old_stream = handler.setStream(explicit)
+        try:
+            test_logger.warning("to explicit")
+            assert "to explicit" in explicit.getvalue()
+            assert "to explicit" not in captured.getvalue()
+        finally:
+            handler.setStream(old_stream)
+            handler.follow_stderr = True
+
+    def test_fields_helper(self):
+        """fields() should wrap values for the extra argument."""
+        assert fields(a=1) == {"fields": {"a": 1}}
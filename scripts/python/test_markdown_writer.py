@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Unit tests for markdown_writer.py
+"""
+
+import io
+
+from markdown_writer import MarkdownWriter, cell_text, escape_cell, truncate
+from combine_results import format_as_table
+from generate_comparison import format_as_markdown_table
+
+
+class TestCellHelpers:
+    """Test suite for cell stringification and escaping."""
+
+    def test_escape_cell(self):
+        """Pipes should be escaped; other text is returned unchanged."""
+        assert escape_cell("a|b") == "a\\|b"
+        assert escape_cell("plain") == "plain"
+
+    def test_escape_long_cell(self):
+        """Long cells are escaped without going through the cache."""
+        text = "x|" * 200
+        assert escape_cell(text) == "x\\|" * 200
+
+    def test_truncate(self):
+        """Text longer than the limit gets an ellipsis."""
+        assert truncate("abcdef", 3) == "abc..."
+        assert truncate("abc", 3) == "abc"
+        assert truncate("abcdef", 2, suffix="~") == "ab~"
+
+    def test_cell_text(self):
+        """Values are stringified and optionally truncated."""
+        assert cell_text(42) == "42"
+        assert cell_text("text") == "text"
+        assert cell_text([1, 2, 3], limit=4) == "[1, ..."
+
+
+class TestMarkdownWriter:
+    """Test suite for MarkdownWriter."""
+
+    def test_buffered_output_matches_join(self):
+        """Buffered output should equal joining the lines with newlines."""
+        writer = MarkdownWriter()
+        writer.heading(2, "Title")
+        writer.line()
+        writer.bullet("item")
+        writer.lines(["a", "b"])
+        assert writer.getvalue() == "\n".join(["## Title", "", "- item", "a", "b"])
+
+    def test_stream_output_matches_buffered(self):
+        """Writing to a stream should produce the same text as buffering."""
+        out = io.StringIO()
+        streamed = MarkdownWriter(out)
+        buffered = MarkdownWriter()
+        for writer in (streamed, buffered):
+            writer.line("first")
+            writer.lines(["", "second"])
+            writer.line("")
+        assert out.getvalue() == buffered.getvalue()
+
+    def test_empty_writer(self):
+        """A writer with no lines renders an empty string."""
+        assert MarkdownWriter().getvalue() == ""
+
+    def test_table_row_and_separator(self):
+        """Table rows and separators use the padded column layout."""
+        writer = MarkdownWriter()
+        writer.table_row(["a", "bb"])
+        writer.table_separator([1, 2])
+        assert writer.getvalue() == "| a | bb |\n|---|----|"
+
+
+class TestFormatterEscaping:
+    """Formatters should escape pipes in cell values."""
+
+    def test_combine_table_escapes_pipes(self):
+        """Pipes in child results must not split table cells."""
+        results = [{"task": "a|b", "results": {"value": "x|y"}}]
+        output = format_as_table(results)
+        assert "| a\\|b | x\\|y |" in output
+
+    def test_comparison_table_escapes_pipes(self):
+        """Pipes in comparison cells are escaped before padding."""
+        output = format_as_markdown_table(["Name"], [["a|b"]])
+        assert output.splitlines()[2] == "| a\\|b |"
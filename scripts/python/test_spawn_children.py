@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Unit tests for spawn_children.py
+"""
+
+import io
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import spawn_children
+from branch_index import BranchIndex
+from github_client import GitHubClient
+from spawn_children import (
+    STATUS_DISPATCHED,
+    STATUS_FAILED,
+    STATUS_PENDING,
+    STATUS_SKIPPED,
+    dispatch_payload,
+    parse_subtasks,
+    plan_dispatches,
+)
+
+DISPATCH_DELAY = 0.05
+
+
+class DispatchHandler(BaseHTTPRequestHandler):
+    """Accepts repository dispatches after a delay; rejects tasks containing 'reject'."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(DISPATCH_DELAY)
+        with self.server.lock:
+            self.server.dispatches.append((self.path, body))
+        status = 422 if "reject" in body["client_payload"]["task"] else 204
+        payload = b'{"message": "Validation Failed"}' if status == 422 else b""
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        # Executor runs: server.runs maps a run status to its run names
+        status = parse_qs(urlsplit(self.path).query)["status"][0]
+        runs = [{"display_title": title, "status": status} for title in self.server.runs.get(status, [])]
+        payload = json.dumps({"total_count": len(runs), "workflow_runs": runs}).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), DispatchHandler)
+    httpd.dispatches = []
+    httpd.runs = {}
+    httpd.lock = threading.Lock()
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestPlanning:
+    """Test suite for subtask parsing and validation."""
+
+    def test_parse_subtasks(self):
+        """Strings are numbered in order; objects may set their number."""
+        assert parse_subtasks(["a", {"task": "b"}, {"child_number": 5, "task": "c"}]) == [
+            (1, "a"), (2, "b"), (5, "c")
+        ]
+        with pytest.raises(ValueError):
+            parse_subtasks([42])
+
+    def test_plan(self):
+        """Each child gets its branch and idempotency key."""
+        dispatches = plan_dispatches(42, [(1, "a"), (2, "b")])
+        assert [d.branch for d in dispatches] == ["gitaiteams/issue-42-child-1", "gitaiteams/issue-42-child-2"]
+        assert dispatches[1].idempotency_key == "gitaiteams-issue-42-child-2"
+        assert {d.status for d in dispatches} == {STATUS_PENDING}
+
+    @pytest.mark.parametrize("subtasks, branch, message", [
+        ([(0, "a")], None, "between 1 and 5"),
+        ([(6, "a")], None, "between 1 and 5"),
+        ([(1, "a"), (1, "b")], None, "Duplicate"),
+        ([(i, "t") for i in range(1, 7)], None, "At most 5"),
+        ([(1, " ")], None, "empty task"),
+        ([], None, "No subtasks"),
+        ([(1, "a")], "main", "Invalid parent branch"),
+        ([(1, "a")], "gitaiteams/issue-4-child-1", "Invalid parent branch"),
+        ([(1, "a")], "gitaiteams/issue-5", "Invalid parent branch"),
+    ])
+    def test_validation(self, subtasks, branch, message):
+        """The spawn_child.sh rules are enforced for the whole list."""
+        with pytest.raises(ValueError, match=message):
+            plan_dispatches(4, subtasks, branch)
+
+    def test_existing_children_skipped(self):
+        """Children whose branch exists are not dispatched again."""
+        index = BranchIndex(["origin/gitaiteams/issue-4", "origin/gitaiteams/issue-4-child-2"])
+        dispatches = plan_dispatches(4, [(1, "a"), (2, "b")], index=index)
+        assert [d.status for d in dispatches] == [STATUS_PENDING, STATUS_SKIPPED]
+
+    def test_payload(self):
+        """The payload matches spawn_child.sh plus the idempotency key."""
+        dispatch = plan_dispatches(4, [(3, "task")])[0]
+        assert dispatch_payload(4, "gitaiteams/issue-4", dispatch, "99") == {
+            "event_type": "child_task",
+            "client_payload": {
+                "issue_number": 4, "child_number": 3, "parent_branch": "gitaiteams/issue-4",
+                "task": "task", "idempotency_key": "gitaiteams-issue-4-child-3", "status_comment_id": "99",
+            },
+        }
+
+
+class TestSpawnChildren:
+    """Test suite for concurrent dispatch against a local server."""
+
+    def test_concurrent_dispatch(self, server):
+        """All children are dispatched concurrently with per-child timings."""
+        host, port = server.server_address
+        dispatches = plan_dispatches(7, [(i, f"task {i}") for i in range(1, 6)])
+        with GitHubClient(api_url=f"http://{host}:{port}", pool_size=5) as client:
+            result = spawn_children.spawn_children(client, "o/r", 7, "gitaiteams/issue-7", dispatches)
+        assert result["dispatched"] == 5
+        assert all(child["duration_ms"] >= DISPATCH_DELAY * 1000 for child in result["children"])
+        assert result["elapsed_ms"] < 5 * DISPATCH_DELAY * 1000
+        assert {body["client_payload"]["child_number"] for _, body in server.dispatches} == {1, 2, 3, 4, 5}
+        assert {path for path, _ in server.dispatches} == {"/repos/o/r/dispatches"}
+
+    def test_in_flight_runs_skipped(self, server):
+        """Children whose executor run is still queued or running are not dispatched again."""
+        host, port = server.server_address
+        server.runs = {"queued": ["gitaiteams-issue-7-child-2"], "in_progress": ["gitaiteams-issue-8-child-1"]}
+        dispatches = plan_dispatches(7, [(1, "a"), (2, "b")])
+        with GitHubClient(api_url=f"http://{host}:{port}") as client:
+            result = spawn_children.spawn_children(client, "o/r", 7, "gitaiteams/issue-7", dispatches)
+        assert [c["status"] for c in result["children"]] == [STATUS_DISPATCHED, STATUS_SKIPPED]
+        assert result["children"][1]["reason"] == "executor run in flight"
+        assert [body["client_payload"]["child_number"] for _, body in server.dispatches] == [1]
+
+    def test_failures_reported(self, server):
+        """A rejected dispatch is reported without stopping the others."""
+        host, port = server.server_address
+        dispatches = plan_dispatches(7, [(1, "ok"), (2, "reject me")])
+        with GitHubClient(api_url=f"http://{host}:{port}") as client:
+            result = spawn_children.spawn_children(client, "o/r", 7, "gitaiteams/issue-7", dispatches)
+        assert [c["status"] for c in result["children"]] == [STATUS_DISPATCHED, STATUS_FAILED]
+        assert "422" in result["children"][1]["reason"]
+
+
+class TestMain:
+    """Test suite for the command line interface."""
+
+    def test_main(self, server, tmp_path, monkeypatch, capsys):
+        """Existing children are skipped and the rest dispatched."""
+        host, port = server.server_address
+        refs = tmp_path / "refs"
+        refs.write_text("origin/gitaiteams/issue-3\norigin/gitaiteams/issue-3-child-1\n")
+        monkeypatch.setenv("GITHUB_API_URL", f"http://{host}:{port}")
+        monkeypatch.setenv("GITHUB_REPOSITORY", "o/r")
+        monkeypatch.setattr(sys, "stdin", io.StringIO('["first", "second"]'))
+        monkeypatch.setattr(sys, "argv", ["spawn_children.py", "3", "--subtasks", "-", "--refs", str(refs)])
+
+        assert spawn_children.main() == 0
+        result = json.loads(capsys.readouterr().out)
+        assert (result["dispatched"], result["skipped"], result["failed"]) == (1, 1, 0)
+        assert [body["client_payload"]["child_number"] for _, body in server.dispatches] == [2]
+
+    def test_main_invalid(self, tmp_path, monkeypatch, capsys):
+        """Validation errors are printed as an error object."""
+        subtasks = tmp_path / "subtasks.json"
+        subtasks.write_text(json.dumps([f"t{i}" for i in range(6)]))
+        monkeypatch.setattr(sys, "argv", ["spawn_children.py", "3", "--subtasks", str(subtasks), "--dry-run"])
+
+        assert spawn_children.main() == 1
+        assert "At most 5" in json.loads(capsys.readouterr().out)["error"]
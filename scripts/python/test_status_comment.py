@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Unit tests for status_comment.py
+"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import status_comment
+from github_client import GitHubClient
+from status_comment import (
+    child_pr_states,
+    child_rows,
+    render_status_body,
+    started_time,
+    update_status_comment,
+)
+
+STARTED = "2024-05-01 10:00:00 UTC"
+
+
+def rest_pr(number, head, state="open", merged=False):
+    return {"number": number, "state": state, "merged_at": "2024-05-01T11:00:00Z" if merged else None,
+            "head": {"ref": head}, "base": {"ref": "gitaiteams/issue-9"}}
+
+
+class RepoHandler(BaseHTTPRequestHandler):
+    """Status comment, child refs and PRs for issue 9 of o/r."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        parts = urlsplit(self.path)
+        with server.lock:
+            server.requests.append(("GET", parts.path))
+        if parts.path == "/repos/o/r/issues/comments/5":
+            self.send_json(200, {"id": 5, "body": server.body})
+        elif parts.path == "/repos/o/r/git/matching-refs/heads/gitaiteams/issue-9-child-":
+            self.send_json(200, [{"ref": f"refs/heads/{b}"} for b in server.branches])
+        elif parts.path == "/repos/o/r/pulls":
+            assert parse_qs(parts.query)["base"] == ["gitaiteams/issue-9"]
+            self.send_json(200, server.pulls)
+        else:
+            self.send_json(404, {"message": "Not Found"})
+
+    def do_PATCH(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            self.server.requests.append(("PATCH", self.path))
+            self.server.body = body["body"]
+        self.send_json(200, {"id": 5, "body": body["body"]})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RepoHandler)
+    httpd.lock = threading.Lock()
+    httpd.requests = []
+    httpd.body = f"<!-- gitai-status-comment -->\n## ⏳ GitAI Teams Status\n\n**Started:** {STARTED}"
+    httpd.branches = ["gitaiteams/issue-9-child-1", "gitaiteams/issue-9-child-2", "gitaiteams/issue-9-child-3"]
+    httpd.pulls = [rest_pr(1, "gitaiteams/issue-9-child-1", "closed", merged=True),
+                   rest_pr(2, "gitaiteams/issue-9-child-2")]
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def client(server):
+    host, port = server.server_address
+    with GitHubClient(api_url=f"http://{host}:{port}") as client:
+        yield client
+
+
+class TestRendering:
+    """Test suite for rendering the status comment."""
+
+    def test_child_pr_states(self):
+        """The most advanced PR state wins per head branch."""
+        states = child_pr_states([rest_pr(1, "a", "closed"), rest_pr(2, "a", "closed", merged=True),
+                                  rest_pr(3, "b", "closed"), rest_pr(4, "b")])
+        assert states == {"a": "MERGED", "b": "OPEN"}
+
+    def test_child_rows(self):
+        """Children come from refs and PR heads, ordered by child number."""
+        rows = child_rows(9, ["refs/heads/gitaiteams/issue-9-child-10", "refs/heads/gitaiteams/issue-9-child-2",
+                              "refs/heads/gitaiteams/issue-91-child-1"],
+                          {"gitaiteams/issue-9-child-1": "MERGED", "gitaiteams/issue-9-child-2": "OPEN"})
+        assert rows == [
+            (1, "gitaiteams/issue-9-child-1", "✅ Complete"),
+            (2, "gitaiteams/issue-9-child-2", "📝 PR Open"),
+            (10, "gitaiteams/issue-9-child-10", "🔄 Running"),
+        ]
+
+    def test_render_matches_bash_layout(self):
+        """The body has the same layout update_status_comment.sh produced."""
+        body = render_status_body("processing", "Child agents executing", STARTED, "gitaiteams/issue-9",
+                                  [(1, "gitaiteams/issue-9-child-1", "✅ Complete")])
+        assert body == (
+            "<!-- gitai-status-comment -->\n"
+            "## ⏳ GitAI Teams Status\n"
+            "\n"
+            "**Status:** ⚙️ processing\n"
+            f"**Started:** {STARTED}\n"
+            "**Message:** Child agents executing\n"
+            "**Branch:** `gitaiteams/issue-9`\n"
+            "\n"
+            "### 📊 Child Task Status\n"
+            "\n"
+            "| Child | Branch | Status |\n"
+            "|-------|--------|--------|\n"
+            "| C1 | `gitaiteams/issue-9-child-1` | ✅ Complete |"
+        )
+
+    def test_no_table_without_branch(self):
+        """Unknown statuses get the default emoji; no branch means no table."""
+        body = render_status_body("waiting", "Hold on", STARTED)
+        assert "**Status:** ℹ️ waiting" in body
+        assert "Child Task Status" not in body
+
+    def test_started_time(self):
+        """The start time is kept from the existing body."""
+        assert started_time(f"**Started:** {STARTED}") == STARTED
+        assert started_time("").endswith(" UTC")
+
+
+class TestUpdateStatusComment:
+    """Test suite for updating the comment against a local server."""
+
+    def test_batched_lookup_and_patch(self, client, server):
+        """One batch fetches comment, refs and PRs; a changed body is PATCHed."""
+        result = update_status_comment(client, "o/r", "5", 9, "processing", "Running", "gitaiteams/issue-9")
+        assert result == {"comment_id": "5", "updated": True, "children": 3}
+        assert sorted(server.requests) == [
+            ("GET", "/repos/o/r/git/matching-refs/heads/gitaiteams/issue-9-child-"),
+            ("GET", "/repos/o/r/issues/comments/5"),
+            ("GET", "/repos/o/r/pulls"),
+            ("PATCH", "/repos/o/r/issues/comments/5"),
+        ]
+        assert f"**Started:** {STARTED}" in server.body
+        assert "| C1 | `gitaiteams/issue-9-child-1` | ✅ Complete |" in server.body
+        assert "| C3 | `gitaiteams/issue-9-child-3` | 🔄 Running |" in server.body
+
+    def test_unchanged_body_not_patched(self, client, server):
+        """Re-rendering an unchanged status does not PATCH."""
+        update_status_comment(client, "o/r", "5", 9, "processing", "Running", "gitaiteams/issue-9")
+        server.requests.clear()
+        result = update_status_comment(client, "o/r", "5", 9, "processing", "Running", "gitaiteams/issue-9")
+        assert result["updated"] is False
+        assert not any(method == "PATCH" for method, _ in server.requests)
+
+        server.pulls.append(rest_pr(3, "gitaiteams/issue-9-child-3"))
+        assert update_status_comment(client, "o/r", "5", 9, "processing", "Running",
+                                     "gitaiteams/issue-9")["updated"] is True
+
+    def test_hidden_markers_kept(self, client, server):
+        """Hidden markers written by other scripts survive a re-render."""
+        marker = "<!-- gitai-completion-cursor: last_id=7 count=1 children=C1 anonymous=0 analysis=0 -->"
+        server.body += "\n" + marker
+        update_status_comment(client, "o/r", "5", 9, "processing", "Running")
+        assert server.body.endswith("\n" + marker)
+        assert "**Status:** ⚙️ processing" in server.body
+
+
+class TestMain:
+    """Test suite for the command line interface."""
+
+    def test_main(self, server, monkeypatch, capsys):
+        """The result is printed as JSON."""
+        host, port = server.server_address
+        monkeypatch.setenv("GITHUB_API_URL", f"http://{host}:{port}")
+        monkeypatch.setattr(sys, "argv", ["status_comment.py", "9", "spawning", "Creating child agents...",
+                                          "--comment-id", "5", "--repo", "o/r"])
+        assert status_comment.main() == 0
+        assert json.loads(capsys.readouterr().out) == {"comment_id": "5", "updated": True, "children": 0}
+        assert "**Status:** 🚀 spawning" in server.body
+
+    def test_main_missing_comment(self, server, monkeypatch, capsys):
+        """A missing comment is reported as an error object."""
+        host, port = server.server_address
+        monkeypatch.setenv("GITHUB_API_URL", f"http://{host}:{port}")
+        monkeypatch.setattr(sys, "argv", ["status_comment.py", "9", "error", "--comment-id", "6", "--repo", "o/r"])
+        assert status_comment.main() == 1
+        assert "error" in json.loads(capsys.readouterr().out)